@@ -1,10 +1,15 @@
 # app/routers/application_router.py
-from fastapi import APIRouter, HTTPException, Depends, Query
-from pymongo.errors import PyMongoError # Import để bắt lỗi MongoDB cụ thể hơn
+from fastapi import APIRouter, HTTPException, Depends, Query, BackgroundTasks
+from fastapi.responses import ORJSONResponse
+from fastapi.concurrency import run_in_threadpool
+from pymongo.errors import PyMongoError, DuplicateKeyError # Import để bắt lỗi MongoDB cụ thể hơn
 import math # Để tính total_pages
 from typing import Optional, List
 
-from app.database.database import db
+from app.crud.application_crud import insert_application, get_application_detail, resolve_school_names, count_applications, list_applications_by_page, list_applications_by_cursor
+from app.crud.application_query import build_application_filter
+from app.utils.pagination import decode_cursor, cached_count
+from app.utils.serialization import dump_trusted
 # Import ApplicationSchema để dùng cho việc tạo hồ sơ (đã có)
 # Import các schema mới cho API lấy danh sách
 from app.schemas.enums import ApplicationStatus
@@ -13,19 +18,27 @@ from app.schemas.application_schema import (
     PaginatedApplicationResponse, 
     ApplicationListItemSchema, 
     PaginationData,
-    ApplicationDetailSchema, # <<< Schema mới
-    StatusDetailSchema     # <<< Schema mới
+    ApplicationDetailSchema # <<< Schema mới
 )
 from datetime import datetime
 from app.utils.auth import Auth 
 from bson import ObjectId # Để làm việc với _id của MongoDB
 from app.utils.code_generate import generate_application_code
+from app.utils.blob_store import externalize_attachments, attachment_refs, map_attachments
+from app.utils.file_access import signed_url
+from app.utils.image_processing import ensure_variants_for_refs
+from app.utils.catalog_cache import get_catalog
+from app.utils.search import build_search_keys
+from app.crud.statistics_crud import record_application_created
 
 router = APIRouter()
 
+# Số lần cấp lại mã hồ sơ khi insert gặp trùng applicationCode
+APPLICATION_CODE_MAX_ATTEMPTS = 3
+
 # API NỘP HỒ SƠ (Đã cập nhật)
 @router.post("/applications", status_code=201, summary="Nộp hồ sơ ứng tuyển")
-async def submit_application(application_payload: ApplicationSchema, current_user=Depends(Auth())):
+async def submit_application(application_payload: ApplicationSchema, background_tasks: BackgroundTasks, current_user=Depends(Auth())):
     """
     API để nhận và lưu hồ sơ ứng tuyển từ client.
     - Mã hồ sơ (`applicationCode`) và trạng thái (`status`) được gán ở đây.
@@ -35,6 +48,12 @@ async def submit_application(application_payload: ApplicationSchema, current_use
         application_data = application_payload.model_dump(by_alias=True, exclude_unset=True)
         application_data["userId"] = ObjectId(user_id)
 
+        # Lưu tệp đính kèm vào blob store, hồ sơ chỉ giữ tham chiếu nhỏ
+        try:
+            application_data.update(await run_in_threadpool(externalize_attachments, application_data))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
         # <<< ĐÂY LÀ PHẦN THÊM THỜI GIAN >>>
         # Lấy thời gian hiện tại theo múi giờ UTC
         now = datetime.utcnow()
@@ -43,12 +62,34 @@ async def submit_application(application_payload: ApplicationSchema, current_use
         application_data["updated_at"] = now
         # <<< KẾT THÚC PHẦN THÊM THỜI GIAN >>>
         
+        # Ghi sẵn tên trường / tên ngành để các API danh sách không phải $lookup sang `schools`
+        catalog = await get_catalog()
+        school = catalog.schools.get(application_data.get("school"))
+        application_data["schoolName"], application_data["majorName"] = resolve_school_names(school, application_data.get("major"))
+
         # --- TẠO CODE VÀ GÁN TRẠNG THÁI THỦ CÔNG ---
-        application_data["applicationCode"] = generate_application_code()
         application_data["status"] = ApplicationStatus.PENDING.name # Gán mã code "PENDING"
+        # Mã được cấp từ bộ đếm nên không trùng; index unique chặn trường hợp hiếm (trùng mã cũ) và thử lại
+        for attempt in range(APPLICATION_CODE_MAX_ATTEMPTS):
+            application_data["applicationCode"] = await generate_application_code(application_data.get("school"))
+            application_data["searchKeys"] = build_search_keys(application_data)
+            try:
+                result = await insert_application(application_data)
+                break
+            except DuplicateKeyError as e:
+                application_data.pop("_id", None)
+                if "applicationCode" not in (e.details or {}).get("keyPattern", {}) or attempt == APPLICATION_CODE_MAX_ATTEMPTS - 1:
+                    raise
         # ---------------------------------------------
-        
-        result = db.applications.insert_one(application_data)
+
+        # Cập nhật bảng tổng hợp thống kê; lỗi ở đây không làm hỏng việc nộp hồ sơ (có thể rebuild)
+        try:
+            await record_application_created(application_data)
+        except Exception as e:
+            print(f"Lỗi khi cập nhật thống kê cho hồ sơ {application_data['applicationCode']}: {e}")
+
+        # Ảnh gửi kèm dạng base64 được chuẩn hóa (review / thumb) sau khi đã trả response
+        background_tasks.add_task(ensure_variants_for_refs, attachment_refs(application_data))
         
         return {
             "message": "Hồ sơ của bạn đã được nộp thành công và đang chờ duyệt.",
@@ -56,6 +97,8 @@ async def submit_application(application_payload: ApplicationSchema, current_use
             "applicationCode": application_data.get("applicationCode"),
             "status": application_data.get("status") 
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Lỗi phía server khi xử lý hồ sơ: {str(e)}")
 
@@ -69,74 +112,54 @@ async def get_user_applications(
     search: Optional[str] = Query(None, description="Tìm kiếm theo mã hồ sơ (không phân biệt chữ hoa/thường)"),
     status: Optional[str] = Query(None, description="Lọc theo trạng thái (PENDING, APPROVED, CANCEL)"),
     date_from: Optional[str] = Query(None, alias="dateFrom", description="Lọc từ ngày (YYYY-MM-DD)"),
-    date_to: Optional[str] = Query(None, alias="dateTo", description="Lọc đến ngày (YYYY-MM-DD)")
+    date_to: Optional[str] = Query(None, alias="dateTo", description="Lọc đến ngày (YYYY-MM-DD)"),
+    cursor: Optional[str] = Query(None, description="Phân trang theo con trỏ: rỗng cho trang đầu, sau đó dùng nextCursor"),
+    with_total: bool = Query(False, alias="withTotal", description="Chế độ con trỏ: trả kèm tổng số bản ghi (cache ngắn hạn)")
 ):
     try:
         user_id = current_user["_id"]
-        skip = (page - 1) * limit
 
-        # --- Xây dựng pipeline cho Aggregation ---
-        match_stage = {"userId": ObjectId(user_id)}
-        
-        # 1. Thêm tìm kiếm theo applicationCode
-        if search:
-            match_stage["applicationCode"] = {"$regex": search, "$options": "i"}
-
-        # 2. Thêm lọc theo status
-        if status:
-            match_stage["status"] = status
-            
-        # 3. Thêm lọc theo khoảng thời gian (dựa trên trường updated_at)
-        # Lưu ý: Cần đảm bảo các document có trường 'updated_at' kiểu datetime
-        if date_from or date_to:
-            match_stage["updated_at"] = {}
-            if date_from:
-                try:
-                    match_stage["updated_at"]["$gte"] = datetime.fromisoformat(date_from + "T00:00:00")
-                except ValueError:
-                    raise HTTPException(status_code=400, detail="Định dạng dateFrom không hợp lệ. Vui lòng dùng YYYY-MM-DD.")
-            if date_to:
-                try:
-                    match_stage["updated_at"]["$lte"] = datetime.fromisoformat(date_to + "T23:59:59")
-                except ValueError:
-                    raise HTTPException(status_code=400, detail="Định dạng dateTo không hợp lệ. Vui lòng dùng YYYY-MM-DD.")
-
-        pipeline = [
-            {"$match": match_stage},
-            # 4. Sắp xếp theo ngày cập nhật mới nhất
-            {"$sort": {"updated_at": -1}}, 
-            {"$lookup": {"from": "schools", "localField": "school", "foreignField": "code", "as": "schoolInfo"}},
-            {"$unwind": {"path": "$schoolInfo", "preserveNullAndEmptyArrays": True}},
-            {"$addFields": {
-                "schoolName": "$schoolInfo.name",
-                "majorDetails": {"$first": {"$filter": {"input": "$schoolInfo.majors", "as": "m", "cond": {"$eq": ["$$m.code", "$major"]}}}}
-            }},
-            {"$addFields": {"majorName": "$majorDetails.name"}},
-            {"$project": {"schoolInfo": 0, "majorDetails": 0}},
-            {"$facet": {
-                "metadata": [{"$count": "totalRecords"}],
-                "data": [{"$skip": skip}, {"$limit": limit}]
-            }}
-        ]
-        
-        result = list(db.applications.aggregate(pipeline))
-
-        if not result or not result[0]["metadata"]:
-            return PaginatedApplicationResponse(
-                pagination=PaginationData(currentPage=page, totalPages=0, totalRecords=0, limit=limit),
-                applications=[]
+        # Điều kiện lọc dùng chung (app/crud/application_query.py); tìm theo một phần mã hồ sơ
+        try:
+            match_stage = build_application_filter(
+                user_id=user_id,
+                code_search=search,
+                status=status,
+                date_from=date_from,
+                date_to=date_to,
             )
-
-        total_records = result[0]["metadata"][0]["totalRecords"]
-        applications_data = result[0]["data"]
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        # Chế độ con trỏ (tùy chọn): truyền `cursor` rỗng cho trang đầu, sau đó truyền `nextCursor` nhận được.
+        # Thời gian lấy mỗi trang không tăng theo độ sâu; tổng số bản ghi chỉ tính khi `withTotal=true`.
+        if cursor is not None:
+            try:
+                after = decode_cursor(cursor) if cursor else None
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            applications_data, next_cursor = await list_applications_by_cursor(match_stage, after, limit)
+            total_records = await cached_count(match_stage, count_applications) if with_total else None
+            # Dữ liệu từ DB đã hợp lệ: dựng thẳng dict và trả ORJSONResponse, không validate lại
+            return ORJSONResponse({
+                "pagination": dump_trusted(PaginationData, {
+                    "limit": limit,
+                    "nextCursor": next_cursor,
+                    "totalRecords": total_records,
+                    "totalPages": math.ceil(total_records / limit) if total_records is not None else None
+                }),
+                "applications": [dump_trusted(ApplicationListItemSchema, app) for app in applications_data]
+            })
+
+        applications_data, total_records = await list_applications_by_page(match_stage, page, limit)
         total_pages = math.ceil(total_records / limit)
-
-        processed_applications = [ApplicationListItemSchema.model_validate(app) for app in applications_data]
         
-        return PaginatedApplicationResponse(
-            pagination=PaginationData(currentPage=page, totalPages=total_pages, totalRecords=total_records, limit=limit),
-            applications=processed_applications
-        )
+        return ORJSONResponse({
+            "pagination": dump_trusted(PaginationData, {"currentPage": page, "totalPages": total_pages, "totalRecords": total_records, "limit": limit}),
+            "applications": [dump_trusted(ApplicationListItemSchema, app) for app in applications_data]
+        })
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Lỗi server không xác định: {str(e)}")
 
@@ -151,71 +174,33 @@ async def get_application_details(application_code: str, current_user=Depends(Au
     try:
         user_id = current_user["_id"]
 
-        # Sử dụng aggregation để join dữ liệu hiệu quả
-        pipeline = [
-            # Bước 1: Tìm đúng hồ sơ theo mã và userId
-            {
-                "$match": {
-                    "applicationCode": application_code,
-                    "userId": ObjectId(user_id)
-                }
-            },
-            # Bước 2: Join với collection 'schools'
-            {
-                "$lookup": {
-                    "from": "schools",
-                    "localField": "school",
-                    "foreignField": "code",
-                    "as": "schoolInfo"
-                }
-            },
-            # Bước 3: Mở mảng schoolInfo
-            {"$unwind": {"path": "$schoolInfo", "preserveNullAndEmptyArrays": True}},
-            # Bước 4: Định hình lại dữ liệu và tìm tên ngành
-            {
-                "$addFields": {
-                    "schoolName": "$schoolInfo.name",
-                    # Tìm object major khớp với mã ngành trong hồ sơ
-                    "majorDetails": {
-                        "$first": {
-                            "$filter": {
-                                "input": "$schoolInfo.majors",
-                                "as": "major",
-                                "cond": {"$eq": ["$$major.code", "$major"]}
-                            }
-                        }
-                    }
-                }
-            },
-            # Bước 5: Lấy tên ngành từ object majorDetails
-            {
-                "$addFields": {
-                    "majorName": "$majorDetails.name"
-                }
-            },
-        ]
-        
-        result = list(db.applications.aggregate(pipeline))
+        # schoolName / majorName đã được ghi sẵn vào hồ sơ khi nộp, chỉ cần một lần find_one theo index
+        application_doc = await get_application_detail({
+            "applicationCode": application_code,
+            "userId": ObjectId(user_id)
+        })
         
         # Nếu không tìm thấy kết quả, trả về lỗi 404
-        if not result:
+        if not application_doc:
             raise HTTPException(status_code=404, detail="Hồ sơ không tồn tại hoặc bạn không có quyền truy cập.")
-            
-        application_doc = result[0]
         
         # Xử lý trạng thái để trả về object chi tiết
         from app.schemas.enums import ApplicationStatus
         status_code = application_doc.get("status", "PENDING")
         status_enum = ApplicationStatus[status_code] # Lấy Enum member từ mã code
         
-        application_doc["status"] = StatusDetailSchema(
-            code=status_enum.name, # PENDING, APPROVED, REJECTED
-            displayName=status_enum.value # Chờ duyệt, Đã duyệt, Từ chối
-        )
+        application_doc["status"] = {
+            "code": status_enum.name, # PENDING, APPROVED, REJECTED
+            "displayName": status_enum.value # Chờ duyệt, Đã duyệt, Từ chối
+        }
+        # Tệp đính kèm chỉ tải được qua URL có chữ ký, cấp cho chủ hồ sơ tại đây
+        application_doc.update(map_attachments(application_doc, signed_url))
 
-        # Trả về dữ liệu đã được Pydantic model validate
-        return ApplicationDetailSchema(**application_doc)
+        # Hồ sơ đọc từ DB đã được validate khi nộp: trả thẳng, không đi qua Pydantic lần nữa
+        return ORJSONResponse(dump_trusted(ApplicationDetailSchema, application_doc))
 
+    except HTTPException:
+        raise
     except PyMongoError as e:
         raise HTTPException(status_code=500, detail=f"Lỗi cơ sở dữ liệu khi lấy chi tiết hồ sơ: {e}")
     except Exception as e:
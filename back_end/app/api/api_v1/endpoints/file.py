@@ -1,16 +1,316 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Request, Query, status, BackgroundTasks, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse
+from bson import ObjectId
+from datetime import datetime
+import asyncio
+import hashlib
+import mimetypes
 import os
+import secrets
+import tempfile
+import time
+
+from app.core.config import UPLOAD_DIR, MAX_UPLOAD_SIZE, UPLOAD_BUFFER_SIZE, FILE_ACCEL_REDIRECT_PREFIX
+from app.crud.upload_crud import create_upload_session, get_upload_session, touch_upload_session, delete_upload_session, find_upload_session_ids
+from app.schemas.attachment_schema import UploadInitRequest, UploadStatusResponse, UploadCompleteResponse
+from app.utils.auth import Auth
+from app.utils.blob_store import adopt_file, blob_path, parse_blob_ref, BLOB_URL_PREFIX
+from app.utils.file_access import verify_signed_path
+from app.utils.image_processing import ensure_image_variants
+from app.utils.partial_uploads import PARTIAL_DIR, DIRECT_UPLOAD_SUFFIX, UPLOAD_SESSION_TTL_SECONDS, partial_path, remove_partial
 
 router = APIRouter()
 
-UPLOAD_DIR = "uploads"
+ALLOWED_CONTENT_TYPES = ["image/jpeg", "image/png", "application/pdf"]
+# Tên tệp trong blob store là sha256 của nội dung nên nội dung tại một URL không bao giờ thay đổi
+DOWNLOAD_CACHE_CONTROL = "private, max-age=31536000, immutable"
+
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
-@router.post("/upload")
-async def upload_file(file: UploadFile = File(...)):
-    if file.content_type not in ["image/jpeg", "image/png", "application/pdf"]:
+# Trạng thái băm tăng dần của các phiên tải trên worker này: upload_id -> [số byte đã băm, hasher]
+# Nếu mất (worker khởi động lại, phiên được tiếp tục ở worker khác, lần gửi trước bị lỗi)
+# thì băm lại tệp khi hoàn tất.
+_hashers = {}
+_locks = {}
+# upload_id -> thời điểm (monotonic) phiên được dùng lần cuối trên worker này, để dọn phiên bỏ dở
+_last_seen = {}
+
+
+def _forget(upload_id: str):
+    _hashers.pop(upload_id, None)
+    _locks.pop(upload_id, None)
+    _last_seen.pop(upload_id, None)
+
+
+def _forget_stale_sessions():
+    """Bỏ trạng thái trong bộ nhớ của các phiên đã quá hạn (bản ghi trong DB đã bị dọn)."""
+    deadline = time.monotonic() - UPLOAD_SESSION_TTL_SECONDS
+    for upload_id, last_seen in list(_last_seen.items()):
+        lock = _locks.get(upload_id)
+        if last_seen < deadline and not (lock and lock.locked()):
+            _forget(upload_id)
+
+
+def _write_chunk(buffer, hasher, data: bytes):
+    buffer.write(data)
+    if hasher is not None:
+        hasher.update(data)
+
+
+def _file_size(path: str):
+    try:
+        return os.path.getsize(path)
+    except FileNotFoundError:
+        return None
+
+
+def _hash_file(path: str) -> str:
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(UPLOAD_BUFFER_SIZE):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def _create_empty_file(path: str):
+    open(path, "wb").close()
+
+
+def _remove_file(path: str):
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def _open_at(path: str, offset: int):
+    buffer = open(path, "r+b")
+    buffer.seek(offset)
+    return buffer
+
+
+def _check_content_type(content_type: str):
+    if content_type not in ALLOWED_CONTENT_TYPES:
         raise HTTPException(400, "Invalid file type")
-    file_path = os.path.join(UPLOAD_DIR, file.filename)
-    with open(file_path, "wb") as buffer:
-        buffer.write(await file.read())
-    return {"file_url": f"/uploads/{file.filename}"}
+
+
+def _too_large():
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Tệp vượt quá dung lượng cho phép ({MAX_UPLOAD_SIZE} byte)"
+    )
+
+
+@router.post("/upload")
+async def upload_file(background_tasks: BackgroundTasks, file: UploadFile = File(...)):
+    _check_content_type(file.content_type)
+
+    # Ghi từng phần vào tệp tạm (ngoài event loop) rồi đưa vào blob store theo sha256,
+    # không dùng file.filename do client gửi lên làm tên lưu trữ
+    fd, tmp_path = tempfile.mkstemp(dir=PARTIAL_DIR, suffix=DIRECT_UPLOAD_SUFFIX)
+    os.close(fd)
+    hasher = hashlib.sha256()
+    size = 0
+    try:
+        buffer = await run_in_threadpool(open, tmp_path, "wb")
+        try:
+            while chunk := await file.read(UPLOAD_BUFFER_SIZE):
+                size += len(chunk)
+                if size > MAX_UPLOAD_SIZE:
+                    raise _too_large()
+                await run_in_threadpool(_write_chunk, buffer, hasher, chunk)
+        finally:
+            await run_in_threadpool(buffer.close)
+        file_url = await run_in_threadpool(adopt_file, tmp_path, hasher.hexdigest(), file.content_type)
+    except BaseException:
+        await run_in_threadpool(_remove_file, tmp_path)
+        raise
+    # Tạo ảnh review / thumb (bỏ EXIF, thu nhỏ) sau khi đã trả response
+    background_tasks.add_task(ensure_image_variants, file_url)
+    return {"file_url": file_url}
+
+
+# --- API TẢI TỆP THEO TỪNG PHẦN, CÓ THỂ TIẾP TỤC KHI MẤT KẾT NỐI ---
+# 1. POST   /uploads                       -> tạo phiên tải, nhận uploadId
+# 2. PUT    /uploads/{uploadId}?offset=N   -> gửi phần dữ liệu tiếp theo (body là byte thô)
+# 3. GET    /uploads/{uploadId}            -> hỏi offset hiện tại để tiếp tục sau khi rớt mạng
+# 4. POST   /uploads/{uploadId}/complete   -> hoàn tất, nhận file_url trong blob store
+
+async def _load_session(upload_id: str, current_user: dict):
+    session = await get_upload_session(upload_id, ObjectId(current_user["_id"]))
+    if not session:
+        _forget(upload_id)
+        # Phiên đã hết hạn / bị xóa (không chỉ là của người dùng khác): bỏ luôn tệp tải dở
+        if upload_id not in await find_upload_session_ids([upload_id]):
+            await run_in_threadpool(remove_partial, partial_path(upload_id))
+        raise HTTPException(status_code=404, detail="Phiên tải tệp không tồn tại hoặc đã hết hạn")
+    _last_seen[upload_id] = time.monotonic()
+    return session
+
+
+async def _current_offset(upload_id: str) -> int:
+    offset = await run_in_threadpool(_file_size, partial_path(upload_id))
+    if offset is None:
+        raise HTTPException(status_code=410, detail="Dữ liệu tải dở đã bị xóa, vui lòng tải lại từ đầu")
+    return offset
+
+
+def _status_response(session: dict, offset: int) -> UploadStatusResponse:
+    return UploadStatusResponse(
+        upload_id=session["_id"],
+        offset=offset,
+        total_size=session["totalSize"],
+        chunk_size=UPLOAD_BUFFER_SIZE
+    )
+
+
+@router.post("/uploads", response_model=UploadStatusResponse, status_code=201, summary="Khởi tạo phiên tải tệp theo từng phần")
+async def init_upload(payload: UploadInitRequest, current_user=Depends(Auth())):
+    _check_content_type(payload.content_type)
+    if payload.total_size > MAX_UPLOAD_SIZE:
+        raise _too_large()
+
+    _forget_stale_sessions()
+    now = datetime.utcnow()
+    session = {
+        "_id": secrets.token_urlsafe(16),
+        "userId": ObjectId(current_user["_id"]),
+        "filename": payload.filename,
+        "contentType": payload.content_type,
+        "totalSize": payload.total_size,
+        "offset": 0,
+        "created_at": now,
+        "updated_at": now,
+    }
+    # Tạo bản ghi trước tệp: tệp .part không có bản ghi phiên bị app/scripts/sweep_partial_uploads.py xóa
+    await create_upload_session(session)
+    await run_in_threadpool(_create_empty_file, partial_path(session["_id"]))
+    _hashers[session["_id"]] = [0, hashlib.sha256()]
+    _last_seen[session["_id"]] = time.monotonic()
+    return _status_response(session, 0)
+
+
+@router.get("/uploads/{upload_id}", response_model=UploadStatusResponse, summary="Lấy offset hiện tại của phiên tải tệp")
+async def get_upload_status(upload_id: str, current_user=Depends(Auth())):
+    session = await _load_session(upload_id, current_user)
+    return _status_response(session, await _current_offset(upload_id))
+
+
+@router.put("/uploads/{upload_id}", response_model=UploadStatusResponse, summary="Gửi một phần dữ liệu của tệp")
+async def append_upload_chunk(
+    upload_id: str,
+    request: Request,
+    offset: int = Query(..., ge=0, description="Vị trí byte bắt đầu của phần dữ liệu này"),
+    current_user=Depends(Auth())
+):
+    session = await _load_session(upload_id, current_user)
+    total_size = session["totalSize"]
+
+    async with _locks.setdefault(upload_id, asyncio.Lock()):
+        current = await _current_offset(upload_id)
+        if offset != current:
+            raise HTTPException(status_code=409, detail={"message": "Offset không khớp", "offset": current})
+
+        # Từ chối sớm dựa trên Content-Length, trước khi đọc body
+        content_length = request.headers.get("content-length")
+        if content_length and content_length.isdigit() and offset + int(content_length) > total_size:
+            raise _too_large()
+
+        # Lấy hẳn trạng thái băm ra: chỉ lần gửi thành công mới đặt lại
+        entry = _hashers.pop(upload_id, None)
+        hasher = entry[1] if entry and entry[0] == current else None
+
+        written = 0
+        pending = bytearray()
+        completed = False
+        # Ghi đúng tại `offset` chứ không nối vào cuối tệp: khóa ở trên chỉ có hiệu lực trong worker này,
+        # nên khi client gửi lại cùng phần dữ liệu tới worker khác trong lúc lần gửi trước chưa xong,
+        # hai lần ghi chồng lên cùng vùng byte thay vì làm tệp dài gấp đôi
+        buffer = await run_in_threadpool(_open_at, partial_path(upload_id), offset)
+        try:
+            async for data in request.stream():
+                if offset + written + len(pending) + len(data) > total_size:
+                    raise _too_large()
+                pending += data
+                if len(pending) >= UPLOAD_BUFFER_SIZE:
+                    chunk = bytes(pending)
+                    pending.clear()
+                    await run_in_threadpool(_write_chunk, buffer, hasher, chunk)
+                    written += len(chunk)
+            if pending:
+                chunk = bytes(pending)
+                await run_in_threadpool(_write_chunk, buffer, hasher, chunk)
+                written += len(chunk)
+            completed = True
+        finally:
+            await run_in_threadpool(buffer.close)
+            if completed and hasher is not None:
+                _hashers[upload_id] = [offset + written, hasher]
+            else:
+                # Lần gửi lỗi: không giữ trạng thái băm, băm lại tệp khi hoàn tất nếu client tiếp tục
+                _hashers.pop(upload_id, None)
+
+        # Chỉ gia hạn phiên khi gửi thành công; phiên chỉ gặp lỗi sẽ bị dọn khi quá hạn
+        await touch_upload_session(upload_id, offset + written)
+
+    return _status_response(session, offset + written)
+
+
+@router.post("/uploads/{upload_id}/complete", response_model=UploadCompleteResponse, summary="Hoàn tất phiên tải tệp")
+async def complete_upload(upload_id: str, background_tasks: BackgroundTasks, current_user=Depends(Auth())):
+    session = await _load_session(upload_id, current_user)
+
+    async with _locks.setdefault(upload_id, asyncio.Lock()):
+        size = await _current_offset(upload_id)
+        if size != session["totalSize"]:
+            raise HTTPException(status_code=409, detail={"message": "Tệp chưa được tải lên đầy đủ", "offset": size})
+
+        entry = _hashers.pop(upload_id, None)
+        if entry and entry[0] == size:
+            digest = entry[1].hexdigest()
+        else:
+            digest = await run_in_threadpool(_hash_file, partial_path(upload_id))
+
+        file_url = await run_in_threadpool(adopt_file, partial_path(upload_id), digest, session["contentType"])
+        await delete_upload_session(upload_id)
+
+    _forget(upload_id)
+    background_tasks.add_task(ensure_image_variants, file_url)
+    return UploadCompleteResponse(file_url=file_url, sha256=digest, size=size)
+
+
+@router.delete("/uploads/{upload_id}", status_code=204, summary="Hủy phiên tải tệp")
+async def abort_upload(upload_id: str, current_user=Depends(Auth())):
+    await _load_session(upload_id, current_user)
+    await run_in_threadpool(_remove_file, partial_path(upload_id))
+    await delete_upload_session(upload_id)
+    _forget(upload_id)
+
+
+# --- API TẢI TỆP ĐÍNH KÈM ---
+# URL do endpoint chi tiết hồ sơ cấp (app/utils/file_access.py): chữ ký thay cho kiểm tra quyền ở đây.
+# Có FILE_ACCEL_REDIRECT_PREFIX thì nginx gửi tệp (kể cả Range), worker chỉ trả header.
+@router.get("/download/{file_path:path}", summary="Tải tệp đính kèm qua URL có chữ ký")
+async def download_file(
+    file_path: str,
+    expires: int = Query(..., description="Thời điểm hết hạn (unix timestamp)"),
+    sig: str = Query(..., description="Chữ ký HMAC của đường dẫn và thời điểm hết hạn"),
+):
+    parsed = parse_blob_ref(BLOB_URL_PREFIX + file_path)
+    if parsed is None or not verify_signed_path(file_path, expires, sig):
+        raise HTTPException(status_code=403, detail="Liên kết tải tệp không hợp lệ hoặc đã hết hạn")
+
+    headers = {
+        "Cache-Control": DOWNLOAD_CACHE_CONTROL,
+        "Content-Disposition": "inline",
+        "X-Content-Type-Options": "nosniff",
+    }
+    media_type = mimetypes.guess_type(file_path)[0] or "application/octet-stream"
+    if FILE_ACCEL_REDIRECT_PREFIX:
+        headers["X-Accel-Redirect"] = f"{FILE_ACCEL_REDIRECT_PREFIX.rstrip('/')}/blobs/{file_path}"
+        return Response(headers=headers, media_type=media_type)
+
+    path = blob_path(*parsed)
+    if not await run_in_threadpool(os.path.isfile, path):
+        raise HTTPException(status_code=404, detail="Tệp không tồn tại")
+    # FileResponse hỗ trợ header Range (206) cho PDF lớn / tải tiếp
+    return FileResponse(path, media_type=media_type, headers=headers)
@@ -1,64 +1,45 @@
-from fastapi import APIRouter, HTTPException, Depends
-from app.database.database import db
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
 from app.utils.auth import Auth
-from bson import ObjectId
+from app.utils.catalog_cache import get_catalog, not_modified, not_modified_response, set_cache_headers
 
 router = APIRouter()
 
+# Các API danh mục đọc từ cache trong bộ nhớ (app/utils/catalog_cache.py), không truy vấn MongoDB mỗi request.
+# Response kèm ETag theo version danh mục; request có If-None-Match khớp nhận 304 không kèm body.
+
 @router.get("/schools")
-def get_all_school_full_info(current_user=Depends(Auth())):
-    schools = list(db.schools.find())
-    
-    for school in schools:
-        school.pop("majors", None)  # Xóa trường "majors" nếu có
-        school["_id"] = str(school["_id"])
-        
-    return schools
+async def get_all_school_full_info(request: Request, response: Response, current_user=Depends(Auth())):
+    catalog = await get_catalog()
+    if not_modified(request, catalog):
+        return not_modified_response(catalog)
+    set_cache_headers(response, catalog)
+    return catalog.school_summaries
 
 
 # GET các ngành của một trường cụ thể kèm tổ hợp chi tiết
 @router.get("/schools/{school_code}/majors")
-def get_majors_by_school(school_code: str, current_user=Depends(Auth())):
-    school = db.schools.find_one({"code": school_code})
-    if not school:
+async def get_majors_by_school(school_code: str, request: Request, response: Response, current_user=Depends(Auth())):
+    catalog = await get_catalog()
+    majors = catalog.majors_by_school.get(school_code)
+    if majors is None:
         raise HTTPException(status_code=404, detail="School not found")
 
-    subject_combinations = {sc["code"]: sc for sc in db.subject_combinations.find()}
-    subjects = {s["code"]: s for s in db.subjects.find()}
-
-    majors = []
-    for major in school.get("majors", []):
-        major_result = {
-            "code": major.get("code"),
-            "name": major.get("name"),
-            "subject_group_ids": major.get("subject_group_ids")
-        }
-
-        majors.append(major_result)
-
+    if not_modified(request, catalog):
+        return not_modified_response(catalog)
+    set_cache_headers(response, catalog)
     return majors
 
 @router.get("/subject-combinations/{code}")
-def get_subject_combination_detail(code: str, current_user=Depends(Auth())):
-    subject_combination = db.subject_combination.find_one({"code": code})
+async def get_subject_combination_detail(code: str, request: Request, response: Response, current_user=Depends(Auth())):
+    catalog = await get_catalog()
+    subject_combination = catalog.subject_combination_details.get(code)
     if not subject_combination:
         raise HTTPException(status_code=404, detail="Subject combination not found")
 
-    all_subjects = {s["code"]: s for s in db.subject.find()}
-
-    subject_codes = subject_combination.get("subjects", [])
-    full_subjects = [all_subjects.get(sub_code) for sub_code in subject_codes if sub_code in all_subjects]
-
-    if not full_subjects:
+    if not subject_combination["subjects"]:
         raise HTTPException(status_code=404, detail="Subjects details not found")
 
-    subject_combination["subjects"] = full_subjects
-
-    subject_combination.pop("_id", None)
-
-    for subject in subject_combination["subjects"]:
-        subject.pop("_id", None)
-
+    if not_modified(request, catalog):
+        return not_modified_response(catalog)
+    set_cache_headers(response, catalog)
     return subject_combination
-
-
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, HTTPException, Request, Body, Depends
 from app.schemas.user_schema import UserRegister, UserLogin
-from app.crud.user_crud import get_user_by_username, get_user_by_email, create_user, update_user_verified, get_user_by_reset_token, reset_user_password, update_user_reset_token
-from app.utils.auth import hash_password, verify_password, create_access_token, Auth
+from app.crud.user_crud import get_user_by_username, get_user_by_email, create_user, update_user_verified, get_user_by_reset_token, reset_user_password, update_user_reset_token, update_user_password_hash
+from app.utils.auth import hash_password_async, verify_password_async, create_access_token, Auth
 from app.utils.mailer import send_verify_email, send_reset_password_email
 import secrets
 import time
@@ -12,20 +12,21 @@ router = APIRouter()
 FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:3000")
 
 @router.post("/register")
-def register(user: UserRegister, request: Request):
+async def register(user: UserRegister, request: Request):
     # Kiểm tra username
-    if get_user_by_username(user.username):
+    if await get_user_by_username(user.username):
         raise HTTPException(status_code=400, detail="Username already exists")
     # Kiểm tra email
-    if get_user_by_email(user.email):
+    if await get_user_by_email(user.email):
         raise HTTPException(status_code=400, detail="Email already exists")
 
     # Sinh verification token
     verification_token = secrets.token_urlsafe(32)
     # Tạo user
-    create_user({
+    password_hash = await hash_password_async(user.password)
+    await create_user({
         "username": user.username,
-        "password_hash": hash_password(user.password),
+        "password_hash": password_hash,
         "email": user.email,
         "full_name": user.full_name,
         "role": "candidate",
@@ -34,27 +35,30 @@ def register(user: UserRegister, request: Request):
     })
     # Gửi mail xác nhận
     verify_link = f"{FRONTEND_URL}/auth/verify-email?token={verification_token}"
-    send_verify_email(user.email, verify_link)
+    await send_verify_email(user.email, verify_link)
 
     return {"msg": "Đăng ký thành công, vui lòng kiểm tra email để xác nhận tài khoản"}
 
 @router.get("/verify-email")
-def verify_email(token: str):
-    result = update_user_verified(token)
-    if result.modified_count == 1:
+async def verify_email(token: str):
+    if await update_user_verified(token):
         return {"msg": "Xác nhận email thành công, bạn có thể đăng nhập"}
     else:
         raise HTTPException(status_code=400, detail="Token không hợp lệ hoặc đã xác nhận")
 
 @router.post("/login")
-def login(user: UserLogin):
-    user_db = get_user_by_username(user.username)
+async def login(user: UserLogin):
+    user_db = await get_user_by_username(user.username)
     if not user_db:
         raise HTTPException(status_code=404, detail="Tài khoản không tồn tại")
     if not user_db.get("isVerified", False):
         raise HTTPException(status_code=401, detail="Tài khoản chưa xác thực email")
-    if not verify_password(user.password, user_db["password_hash"]):
+    password_ok, new_password_hash = await verify_password_async(user.password, user_db["password_hash"])
+    if not password_ok:
         raise HTTPException(status_code=401, detail="Sai mật khẩu")
+    # Hash cũ dùng chi phí bcrypt khác cấu hình hiện tại: lưu lại hash mới
+    if new_password_hash:
+        await update_user_password_hash(user_db["username"], new_password_hash)
     token = create_access_token({"sub": user_db["username"], "role": user_db["role"]})
     return {
         "access_token": token,
@@ -71,40 +75,41 @@ def login(user: UserLogin):
 
 
 @router.post("/forgot-password")
-def forgot_password(email: str = Body(..., embed=True)):
-    user = get_user_by_email(email)
+async def forgot_password(email: str = Body(..., embed=True)):
+    user = await get_user_by_email(email)
     if not user:
         raise HTTPException(status_code=404, detail="Email không tồn tại")
 
     reset_token = secrets.token_urlsafe(32)
     expired = int(time.time()) + 3600
 
-    update_user_reset_token(email, reset_token, expired)
+    await update_user_reset_token(email, reset_token, expired)
 
     reset_link = f"{FRONTEND_URL}/api/auth/reset-password?token={reset_token}"
-    send_reset_password_email(email, reset_link)
+    await send_reset_password_email(email, reset_link)
 
     return {"msg": "Đã gửi link đặt lại mật khẩu tới email (nếu email tồn tại)"}
 
 @router.post("/reset-password")
-def reset_password(token: str = Body(...), new_password: str = Body(...)):
-    user = get_user_by_reset_token(token)
+async def reset_password(token: str = Body(...), new_password: str = Body(...)):
+    user = await get_user_by_reset_token(token)
     if not user:
         raise HTTPException(status_code=404, detail="Token không hợp lệ")
     if int(time.time()) > user.get("reset_token_expired", 0):
         raise HTTPException(status_code=400, detail="Token đã hết hạn, vui lòng gửi lại yêu cầu")
-    reset_user_password(user["email"], hash_password(new_password))
+    new_password_hash = await hash_password_async(new_password)
+    await reset_user_password(user["email"], new_password_hash)
     return {"msg": "Đổi mật khẩu thành công, bạn có thể đăng nhập"}
 
 @router.get("/me")
-def get_user_info(current_user: dict = Depends(Auth())):
+async def get_user_info(current_user: dict = Depends(Auth())):
     user = current_user.copy()
     user.pop("password_hash", None)
     return user
 
 
 @router.put("/me")
-def update_user_info(
+async def update_user_info(
     data: dict = Body(...),
     current_user: dict = Depends(Auth())
 ):
@@ -112,6 +117,6 @@ def update_user_info(
     if not update_fields:
         raise HTTPException(status_code=400, detail="Không có trường nào để cập nhật")
     from app.crud.user_crud import update_user_info_by_username
-    update_user_info_by_username(current_user["username"], update_fields)
+    await update_user_info_by_username(current_user["username"], update_fields)
     return {"msg": "Cập nhật thông tin thành công"}
 
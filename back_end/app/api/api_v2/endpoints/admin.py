@@ -0,0 +1,36 @@
+# app/routers/admin_router.py
+from fastapi import APIRouter, Depends, Query
+
+from app.utils.auth import Auth
+from app.utils.principal_cache import principal_cache_stats
+from app.database.monitoring import command_monitor
+
+router = APIRouter()
+
+@router.get("/cache-stats", summary="[Admin] Thống kê cache người dùng đăng nhập")
+async def get_cache_stats(current_user=Depends(Auth("admin"))):
+    """
+    Số lần trúng / trượt của cache người dùng trong `get_current_user` trên worker hiện tại,
+    dùng để theo dõi số truy vấn `users` đã tiết kiệm được.
+    """
+    return {"principalCache": principal_cache_stats()}
+
+
+@router.get("/db-stats", summary="[Admin] Thống kê thời gian lệnh MongoDB theo route và truy vấn")
+async def get_db_stats(
+    top: int = Query(20, ge=1, le=500, description="Số nhóm truy vấn trả về"),
+    sort_by: str = Query("totalMs", alias="sortBy", pattern="^(totalMs|avgMs|maxMs|count)$", description="Sắp xếp theo"),
+    current_user=Depends(Auth("admin"))
+):
+    """
+    Các nhóm lệnh MongoDB tốn thời gian nhất trên worker hiện tại, gom theo route gọi và
+    dấu vân tay của truy vấn (filter / pipeline đã bỏ giá trị), kèm các lệnh chậm gần nhất và kế hoạch thực thi.
+    """
+    return {
+        "commands": command_monitor.command_stats(top, sort_by),
+        "slowCommands": command_monitor.slow_commands(),
+    }
+
+@router.delete("/db-stats", status_code=204, summary="[Admin] Xóa thống kê lệnh MongoDB")
+async def reset_db_stats(current_user=Depends(Auth("admin"))):
+    command_monitor.reset()
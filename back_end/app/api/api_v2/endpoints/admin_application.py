@@ -1,26 +1,39 @@
 # app/routers/admin_application_router.py
 from fastapi import APIRouter, HTTPException, Depends, Query
-from pymongo.errors import PyMongoError
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 import math
 from typing import Optional, List
 from datetime import datetime
 import os
 
-from app.database.database import db
+from app.crud.application_crud import get_application_detail, get_application_by_code, update_application_by_code, find_applications, bulk_write_applications, count_applications, list_applications_by_page, list_applications_by_cursor, iter_applications
+from app.utils.pagination import decode_cursor, cached_count
+from app.utils.serialization import dump_trusted
+from app.crud.application_query import build_application_filter, projection_for, EXPORT_COLUMNS
+from app.utils.export import csv_chunks, ndjson_chunks
+from app.utils.blob_store import map_attachments, variant_ref
+from app.utils.file_access import signed_url
+from app.crud.user_crud import get_user_by_id, get_users_by_ids
+from app.crud.statistics_crud import record_status_changes
 from app.schemas.enums import ApplicationStatus
 from app.schemas.application_schema import (
     PaginatedApplicationResponse, 
     ApplicationListItemSchema, 
     PaginationData,
     ApplicationDetailSchema,
-    StatusDetailSchema,
-    StatusUpdateRequest
+    StatusUpdateRequest,
+    BulkStatusUpdateRequest,
+    BulkStatusUpdateResponse,
+    BulkStatusItemResult,
+    BULK_STATUS_MAX_ITEMS
 )
 from app.utils.auth import Auth 
-from bson import ObjectId
 
-# Import hàm gửi email từ mailer
-from app.utils.mailer import send_application_status_email
+# Import hàm đưa email vào hàng đợi gửi (outbox)
+from app.utils.mailer import send_application_status_email, send_application_status_emails, build_application_status_email
 
 router = APIRouter()
 
@@ -39,87 +52,132 @@ async def get_all_applications(
     subjectGroup: Optional[str] = Query(None, description="Lọc theo tổ hợp môn"),
     status: Optional[str] = Query(None, description="Lọc theo trạng thái"),
     dateFrom: Optional[str] = Query(None, description="Lọc từ ngày (YYYY-MM-DD)"),
-    dateTo: Optional[str] = Query(None, description="Lọc đến ngày (YYYY-MM-DD)")
+    dateTo: Optional[str] = Query(None, description="Lọc đến ngày (YYYY-MM-DD)"),
+    cursor: Optional[str] = Query(None, description="Phân trang theo con trỏ: rỗng cho trang đầu, sau đó dùng nextCursor"),
+    with_total: bool = Query(False, alias="withTotal", description="Chế độ con trỏ: trả kèm tổng số bản ghi (cache ngắn hạn)")
 ):
     try:
-        skip = (page - 1) * limit
-        match_stage = {} 
-
-        if search:
-            match_stage["$or"] = [
-                {"applicationCode": {"$regex": search, "$options": "i"}},
-                {"fullname": {"$regex": search, "$options": "i"}}
-            ]
-        
-        if schoolCode: match_stage["school"] = schoolCode
-        if majorCode: match_stage["major"] = majorCode
-        if subjectGroup: match_stage["subjectGroup"] = subjectGroup
-        if status: match_stage["status"] = status
-            
-        if dateFrom or dateTo:
-            match_stage["updated_at"] = {}
-            if dateFrom: match_stage["updated_at"]["$gte"] = datetime.fromisoformat(f"{dateFrom}T00:00:00")
-            if dateTo: match_stage["updated_at"]["$lte"] = datetime.fromisoformat(f"{dateTo}T23:59:59")
-
-        pipeline = [
-            {"$match": match_stage},
-            {"$sort": {"updated_at": -1}},
-            {"$lookup": {"from": "schools", "localField": "school", "foreignField": "code", "as": "schoolInfo"}},
-            {"$unwind": {"path": "$schoolInfo", "preserveNullAndEmptyArrays": True}},
-            {"$addFields": {
-                "schoolName": "$schoolInfo.name",
-                "majorDetails": {"$first": {"$filter": {"input": "$schoolInfo.majors", "as": "m", "cond": {"$eq": ["$$m.code", "$major"]}}}}
-            }},
-            {"$addFields": {"majorName": "$majorDetails.name"}},
-            {"$project": {"schoolInfo": 0, "majorDetails": 0}},
-            {"$facet": {
-                "metadata": [{"$count": "totalRecords"}],
-                "data": [{"$skip": skip}, {"$limit": limit}]
-            }}
-        ]
-        
-        result = list(db.applications.aggregate(pipeline))
-
-        if not result or not result[0]["metadata"]:
-            return PaginatedApplicationResponse(
-                pagination=PaginationData(currentPage=page, totalPages=0, totalRecords=0, limit=limit),
-                applications=[]
+        # Điều kiện lọc dùng chung (app/crud/application_query.py); `search` tìm không dấu qua index searchKeys
+        try:
+            match_stage = build_application_filter(
+                search=search,
+                school_code=schoolCode,
+                major_code=majorCode,
+                subject_group=subjectGroup,
+                status=status,
+                date_from=dateFrom,
+                date_to=dateTo,
             )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
-        total_records = result[0]["metadata"][0]["totalRecords"]
-        applications_data = result[0]["data"]
+        # Chế độ con trỏ (tùy chọn): truyền `cursor` rỗng cho trang đầu, sau đó truyền `nextCursor` nhận được.
+        # Thời gian lấy mỗi trang không tăng theo độ sâu; tổng số bản ghi chỉ tính khi `withTotal=true`.
+        if cursor is not None:
+            try:
+                after = decode_cursor(cursor) if cursor else None
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            applications_data, next_cursor = await list_applications_by_cursor(match_stage, after, limit)
+            total_records = await cached_count(match_stage, count_applications) if with_total else None
+            # Dữ liệu từ DB đã hợp lệ: dựng thẳng dict và trả ORJSONResponse, không validate lại
+            return ORJSONResponse({
+                "pagination": dump_trusted(PaginationData, {
+                    "limit": limit,
+                    "nextCursor": next_cursor,
+                    "totalRecords": total_records,
+                    "totalPages": math.ceil(total_records / limit) if total_records is not None else None
+                }),
+                "applications": [dump_trusted(ApplicationListItemSchema, app) for app in applications_data]
+            })
+
+        applications_data, total_records = await list_applications_by_page(match_stage, page, limit)
         total_pages = math.ceil(total_records / limit)
-        processed_applications = [ApplicationListItemSchema.model_validate(app) for app in applications_data]
         
-        return PaginatedApplicationResponse(
-            pagination=PaginationData(currentPage=page, totalPages=total_pages, totalRecords=total_records, limit=limit),
-            applications=processed_applications
-        )
+        return ORJSONResponse({
+            "pagination": dump_trusted(PaginationData, {"currentPage": page, "totalPages": total_pages, "totalRecords": total_records, "limit": limit}),
+            "applications": [dump_trusted(ApplicationListItemSchema, app) for app in applications_data]
+        })
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Lỗi server không xác định: {str(e)}")
 
+# --- API XUẤT DANH SÁCH HỒ SƠ (CSV / NDJSON) ---
+# Phải khai báo trước "/{application_code}" để "export" không bị hiểu là mã hồ sơ
+@router.get("/export", summary="[Admin] Xuất danh sách hồ sơ ra CSV hoặc NDJSON")
+async def export_applications(
+    current_user=Depends(Auth("admin")),
+    format: str = Query("csv", pattern="^(csv|ndjson)$", description="Định dạng: csv hoặc ndjson"),
+    columns: Optional[str] = Query(None, description="Các cột cần xuất, cách nhau bởi dấu phẩy (mặc định: tất cả cột được phép)"),
+    schoolCode: Optional[str] = Query(None, description="Lọc theo mã trường"),
+    majorCode: Optional[str] = Query(None, description="Lọc theo mã ngành"),
+    subjectGroup: Optional[str] = Query(None, description="Lọc theo tổ hợp môn"),
+    status: Optional[str] = Query(None, description="Lọc theo trạng thái"),
+    dateFrom: Optional[str] = Query(None, description="Lọc từ ngày (YYYY-MM-DD)"),
+    dateTo: Optional[str] = Query(None, description="Lọc đến ngày (YYYY-MM-DD)")
+):
+    """
+    Xuất toàn bộ hồ sơ khớp bộ lọc (cùng bộ lọc với API danh sách) dưới dạng luồng:
+    dữ liệu được đọc bằng cursor phía server và gửi dần, không giới hạn số dòng.
+    Không bao giờ xuất tệp đính kèm.
+    """
+    if columns:
+        selected_columns = list(dict.fromkeys(c.strip() for c in columns.split(",") if c.strip()))
+        invalid = [c for c in selected_columns if c not in EXPORT_COLUMNS]
+        if invalid or not selected_columns:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Cột không hợp lệ: {', '.join(invalid)}. Các cột được phép: {', '.join(EXPORT_COLUMNS)}"
+            )
+    else:
+        selected_columns = list(EXPORT_COLUMNS)
+
+    try:
+        match_stage = build_application_filter(
+            school_code=schoolCode,
+            major_code=majorCode,
+            subject_group=subjectGroup,
+            status=status,
+            date_from=dateFrom,
+            date_to=dateTo,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    documents = iter_applications(match_stage, projection_for(*selected_columns, include_id=False))
+    filename = f"applications-{datetime.utcnow():%Y%m%d-%H%M%S}.{format}"
+    if format == "csv":
+        body, media_type = csv_chunks(documents, selected_columns), "text/csv; charset=utf-8"
+    else:
+        body, media_type = ndjson_chunks(documents, selected_columns), "application/x-ndjson"
+    return StreamingResponse(body, media_type=media_type, headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+def _signed_attachments(application: dict, variant: str):
+    """URL có chữ ký của từng tệp đính kèm theo phiên bản `variant`, và của ảnh thumb tương ứng."""
+    return (
+        map_attachments(application, lambda ref: signed_url(variant_ref(ref, variant))),
+        map_attachments(application, lambda ref: signed_url(variant_ref(ref, "thumb"))),
+    )
+
 # --- API LẤY CHI TIẾT HỒ SƠ (CHO ADMIN) ---
 @router.get("/{application_code}", response_model=ApplicationDetailSchema, summary="[Admin] Lấy chi tiết hồ sơ theo mã")
-async def get_application_details_by_admin(application_code: str, current_user=Depends(Auth("admin"))):
+async def get_application_details_by_admin(
+    application_code: str,
+    variant: str = Query("review", pattern="^(review|thumb|original)$", description="Phiên bản ảnh đính kèm: review (mặc định), thumb hoặc original"),
+    current_user=Depends(Auth("admin"))
+):
     try:
-        pipeline = [
-            {"$match": {"applicationCode": application_code}},
-            {"$limit": 1},
-            {"$lookup": {"from": "schools", "localField": "school", "foreignField": "code", "as": "schoolInfo"}},
-            {"$unwind": {"path": "$schoolInfo", "preserveNullAndEmptyArrays": True}},
-            {"$addFields": {
-                "schoolName": "$schoolInfo.name",
-                "majorDetails": {"$first": {"$filter": {"input": "$schoolInfo.majors", "as": "m", "cond": {"$eq": ["$$m.code", "$major"]}}}}
-            }},
-            {"$addFields": {"majorName": "$majorDetails.name"}},
-        ]
-        
-        result = list(db.applications.aggregate(pipeline))
+        application_doc = await get_application_detail({"applicationCode": application_code})
         
-        if not result:
+        if not application_doc:
             raise HTTPException(status_code=404, detail="Hồ sơ không tồn tại.")
-            
-        application_doc = result[0]
+
+        # Ảnh đã chuẩn hóa nhỏ hơn nhiều so với ảnh gốc; ảnh chưa có phiên bản thì giữ tham chiếu gốc.
+        # Mỗi tham chiếu được đổi thành URL tải có chữ ký (thư mục uploads không còn công khai)
+        attachments, thumbnails = await run_in_threadpool(_signed_attachments, application_doc, variant)
+        application_doc.update(attachments)
+        application_doc["thumbnails"] = thumbnails
         
         status_from_db = application_doc.get("status")
         status_enum_member = ApplicationStatus.PENDING
@@ -132,11 +190,141 @@ async def get_application_details_by_admin(application_code: str, current_user=D
                         status_enum_member = member
                         break
         
-        application_doc["status"] = StatusDetailSchema(
-            code=status_enum_member.name,
-            displayName=status_enum_member.value
+        application_doc["status"] = {
+            "code": status_enum_member.name,
+            "displayName": status_enum_member.value
+        }
+        # Hồ sơ đọc từ DB đã được validate khi nộp: trả thẳng, không đi qua Pydantic lần nữa
+        return ORJSONResponse(dump_trusted(ApplicationDetailSchema, application_doc))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Lỗi server không xác định: {str(e)}")
+
+# --- API CẬP NHẬT TRẠNG THÁI HÀNG LOẠT ---
+# Phải khai báo trước "/{application_code}/status" để "bulk" không bị hiểu là mã hồ sơ
+@router.patch("/bulk/status", response_model=BulkStatusUpdateResponse, summary="[Admin] Cập nhật trạng thái nhiều hồ sơ")
+async def change_application_status_bulk(
+    bulk_update: BulkStatusUpdateRequest,
+    current_user=Depends(Auth("admin"))
+):
+    """
+    Đổi trạng thái nhiều hồ sơ trong một request: chọn theo `applicationCodes` hoặc theo `filter`.
+    - Tất cả thay đổi được ghi bằng một lệnh `bulk_write`, thông tin thí sinh lấy bằng một truy vấn `$in`.
+    - Email thông báo được đưa vào hàng đợi trong một lần ghi.
+    - Trả về kết quả cho từng hồ sơ; hồ sơ bị admin khác đổi trạng thái cùng lúc được báo CONFLICT
+      và không được tính vào thống kê / gửi email.
+    """
+    if bool(bulk_update.application_codes) == bool(bulk_update.filter):
+        raise HTTPException(status_code=400, detail="Cần truyền applicationCodes hoặc filter (chỉ một trong hai).")
+
+    try:
+        # Các trường cần để ghi trạng thái, gửi email và cập nhật bảng tổng hợp thống kê
+        projection = projection_for("applicationCode", "userId", "status", "created_at", "school", "major", "subjectGroup")
+        if bulk_update.application_codes:
+            codes = list(dict.fromkeys(bulk_update.application_codes))
+            applications = await find_applications({"applicationCode": {"$in": codes}}, projection)
+        else:
+            bulk_filter = bulk_update.filter
+            query = build_application_filter(
+                school_code=bulk_filter.school_code,
+                major_code=bulk_filter.major_code,
+                subject_group=bulk_filter.subject_group,
+                status=bulk_filter.status.name if bulk_filter.status else None,
+            )
+            applications = await find_applications(query, projection, limit=BULK_STATUS_MAX_ITEMS + 1)
+            if len(applications) > BULK_STATUS_MAX_ITEMS:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Bộ lọc khớp hơn {BULK_STATUS_MAX_ITEMS} hồ sơ, vui lòng thu hẹp điều kiện."
+                )
+            codes = [app["applicationCode"] for app in applications]
+
+        new_status_enum = bulk_update.status
+        # MongoDB lưu thời gian tới mili giây: làm tròn để đọc lại đúng giá trị vừa ghi
+        now = datetime.utcnow()
+        now = now.replace(microsecond=now.microsecond // 1000 * 1000)
+        results = {code: "NOT_FOUND" for code in codes}
+        to_update = []
+        for application in applications:
+            if application.get("status") == new_status_enum.name:
+                results[application["applicationCode"]] = "UNCHANGED"
+            else:
+                to_update.append(application)
+
+        # Điều kiện theo trạng thái cũ giúp không ghi đè thay đổi đồng thời của admin khác
+        operations = [
+            UpdateOne(
+                {"_id": app["_id"], "status": app.get("status")},
+                {"$set": {"status": new_status_enum.name, "updated_at": now}}
+            )
+            for app in to_update
+        ]
+        failed_indexes = set()
+        if operations:
+            try:
+                await bulk_write_applications(operations)
+            except BulkWriteError as e:
+                failed_indexes = {error["index"] for error in e.details.get("writeErrors", [])}
+
+        # Điều kiện trạng thái cũ có thể bỏ qua hồ sơ mà không báo lỗi: đọc lại các hồ sơ thực sự đã được ghi
+        written_ids = set()
+        candidates = [app["_id"] for index, app in enumerate(to_update) if index not in failed_indexes]
+        if candidates:
+            written = await find_applications(
+                {"_id": {"$in": candidates}, "status": new_status_enum.name, "updated_at": now}, {"_id": 1}
+            )
+            written_ids = {app["_id"] for app in written}
+
+        updated = []
+        for index, application in enumerate(to_update):
+            if index in failed_indexes:
+                results[application["applicationCode"]] = "FAILED"
+            elif application["_id"] in written_ids:
+                results[application["applicationCode"]] = "UPDATED"
+                updated.append(application)
+            else:
+                results[application["applicationCode"]] = "CONFLICT"
+
+        try:
+            await record_status_changes([(app, app.get("status"), new_status_enum.name) for app in updated])
+        except Exception as e:
+            print(f"Lỗi khi cập nhật thống kê sau khi đổi trạng thái hàng loạt: {e}")
+
+        # Gửi email thông báo: lấy thông tin thí sinh bằng một truy vấn, đưa vào hàng đợi một lần
+        try:
+            user_ids = list({app["userId"] for app in updated if app.get("userId")})
+            users = {u["_id"]: u for u in await get_users_by_ids(user_ids, {"email": 1, "full_name": 1})} if user_ids else {}
+            detail_link = f"{FRONTEND_URL}/results"
+            messages = [
+                build_application_status_email(
+                    to_email=users[app["userId"]]["email"],
+                    full_name=users[app["userId"]].get("full_name", "Thí sinh"),
+                    application_code=app["applicationCode"],
+                    new_status_display=new_status_enum.value,
+                    detail_link=detail_link
+                )
+                for app in updated
+                if app.get("userId") in users and users[app["userId"]].get("email")
+            ]
+            await send_application_status_emails(messages)
+        except Exception as e:
+            print(f"Lỗi khi đưa email thông báo hàng loạt vào hàng đợi: {e}")
+
+        counts = {result: 0 for result in ("UPDATED", "UNCHANGED", "NOT_FOUND", "FAILED", "CONFLICT")}
+        for result in results.values():
+            counts[result] += 1
+        return BulkStatusUpdateResponse(
+            updated=counts["UPDATED"],
+            unchanged=counts["UNCHANGED"],
+            notFound=counts["NOT_FOUND"],
+            failed=counts["FAILED"],
+            conflict=counts["CONFLICT"],
+            results=[BulkStatusItemResult(applicationCode=code, result=result) for code, result in results.items()]
         )
-        return ApplicationDetailSchema.model_validate(application_doc)
+
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Lỗi server không xác định: {str(e)}")
 
@@ -148,11 +336,15 @@ async def change_application_status(
     current_user=Depends(Auth("admin"))
 ):
     try:
-        application = db.applications.find_one({"applicationCode": application_code})
+        application = await get_application_by_code(application_code)
         if not application:
             raise HTTPException(status_code=404, detail="Hồ sơ không tồn tại.")
 
         new_status_enum = status_update.status
+        old_status = application.get("status")
+        if old_status == new_status_enum.name:
+            raise HTTPException(status_code=400, detail="Trạng thái hồ sơ không thay đổi hoặc đã được cập nhật.")
+
         update_data = {
             "$set": {
                 "status": new_status_enum.name,
@@ -160,20 +352,23 @@ async def change_application_status(
             }
         }
         
-        result = db.applications.update_one(
-            {"applicationCode": application_code},
-            update_data
-        )
+        # Chỉ ghi nếu trạng thái vẫn là trạng thái vừa đọc, để thống kê trừ đúng nhóm cũ
+        result = await update_application_by_code(application_code, update_data, extra_filter={"status": old_status})
 
-        if result.modified_count == 0:
-            raise HTTPException(status_code=400, detail="Trạng thái hồ sơ không thay đổi hoặc đã được cập nhật.")
+        if result.modified_count != 1:
+            raise HTTPException(status_code=409, detail="Trạng thái hồ sơ vừa được thay đổi bởi người khác, vui lòng tải lại.")
+
+        try:
+            await record_status_changes([(application, old_status, new_status_enum.name)])
+        except Exception as e:
+            print(f"Lỗi khi cập nhật thống kê cho hồ sơ {application_code}: {e}")
 
         # Gửi email thông báo cho người dùng
+        detail_link = f"{FRONTEND_URL}/results"
         try:
-            user = db.users.find_one({"_id": application.get("userId")})
+            user = await get_user_by_id(application.get("userId"))
             if user and user.get("email"):
-                detail_link = f"{FRONTEND_URL}/results"
-                send_application_status_email(
+                await send_application_status_email(
                     to_email=user["email"],
                     full_name=user.get("full_name", "Thí sinh"),
                     application_code=application_code,
@@ -2,8 +2,10 @@
 from fastapi import APIRouter, HTTPException, Depends, Query
 from typing import Optional
 from datetime import datetime
+from collections import Counter
 
-from app.database.database import db
+from app.crud.statistics_crud import find_statistic_buckets
+from app.utils.catalog_cache import get_catalog
 from app.schemas.statistics_schema import OverviewStatisticsResponse
 from app.utils.auth import Auth 
 
@@ -20,94 +22,52 @@ async def get_overview_statistics(
     - Tổng số hồ sơ.
     - Phân loại theo trạng thái.
     - Phân loại theo trường, ngành, và tổ hợp môn.
-    Có thể lọc theo một khoảng thời gian.
+    Có thể lọc theo một khoảng thời gian (theo ngày nộp hồ sơ).
+    Số liệu đọc từ bảng tổng hợp `application_stats` được cập nhật khi nộp hồ sơ và khi đổi trạng thái.
     """
     try:
-        # --- Bước 1: Xây dựng giai đoạn lọc ban đầu ($match) ---
-        match_stage = {"school": {"$ne": None}}
-        if date_from or date_to:
-            match_stage["created_at"] = {}
-            if date_from:
-                match_stage["created_at"]["$gte"] = datetime.fromisoformat(f"{date_from}T00:00:00")
-            if date_to:
-                match_stage["updated_at"]["$lte"] = datetime.fromisoformat(f"{date_to}T23:59:59")
-        
-        # --- Bước 2: Xây dựng pipeline với $facet để chạy các thống kê song song ---
-        pipeline = [
-            # Áp dụng bộ lọc thời gian ngay từ đầu nếu có
-            {"$match": match_stage} if match_stage else {"$match": {}},
-            {
-                "$facet": {
-                    # Thống kê tổng số hồ sơ
-                    "totalApplications": [
-                        {"$count": "count"}
-                    ],
-                    # Thống kê theo trạng thái
-                    "byStatus": [
-                        {"$group": {"_id": "$status", "count": {"$sum": 1}}},
-                        {"$sort": {"count": -1}}
-                    ],
-                    # Thống kê theo trường
-                    "bySchool": [
-                        {"$group": {"_id": "$school", "count": {"$sum": 1}}},
-                        # Join với collection 'schools' để lấy tên đầy đủ
-                        {
-                            "$lookup": {
-                                "from": "schools",
-                                "localField": "_id",
-                                "foreignField": "code",
-                                "as": "schoolDetails"
-                            }
-                        },
-                        # Thêm tên trường vào kết quả
-                        {
-                            "$addFields": {
-                                "name": {"$ifNull": [{"$arrayElemAt": ["$schoolDetails.name", 0]}, "$_id"]}
-                            }
-                        },
-                        {"$project": {"schoolDetails": 0}}, # Bỏ trường thừa
-                        {"$sort": {"count": -1}}
-                    ],
-                    # Thống kê theo ngành
-                    "byMajor": [
-                        {"$group": {"_id": "$major", "count": {"$sum": 1}}},
-                        {"$sort": {"count": -1}},
-                        {"$limit": 10} # Giới hạn 10 ngành phổ biến nhất
-                    ],
-                    # Thống kê theo tổ hợp môn
-                    "bySubjectGroup": [
-                        {"$group": {"_id": "$subjectGroup", "count": {"$sum": 1}}},
-                        {"$sort": {"count": -1}}
-                    ]
-                }
-            }
-        ]
+        # --- Bước 1: Kiểm tra khoảng thời gian (lọc theo ngày nộp hồ sơ) ---
+        for value, name in ((date_from, "dateFrom"), (date_to, "dateTo")):
+            if value:
+                try:
+                    datetime.strptime(value, "%Y-%m-%d")
+                except ValueError:
+                    raise HTTPException(status_code=400, detail=f"Định dạng {name} không hợp lệ. Vui lòng dùng YYYY-MM-DD.")
 
-        # Thực thi pipeline
-        result = list(db.applications.aggregate(pipeline))
+        # --- Bước 2: Đọc các bộ đếm đã tổng hợp sẵn (O(số nhóm), không quét `applications`) ---
+        buckets = await find_statistic_buckets(date_from, date_to)
 
-        if not result:
-            raise HTTPException(status_code=404, detail="Không có dữ liệu thống kê.")
+        # --- Bước 3: Cộng dồn theo từng chiều thống kê ---
+        total_applications = 0
+        by_status, by_school, by_major, by_subject_group = Counter(), Counter(), Counter(), Counter()
+        for bucket in buckets:
+            count = bucket["count"]
+            total_applications += count
+            by_status[bucket.get("status")] += count
+            by_school[bucket.get("school")] += count
+            by_major[bucket.get("major")] += count
+            by_subject_group[bucket.get("subjectGroup")] += count
+
+        # Tên đầy đủ của trường lấy từ cache danh mục
+        catalog = await get_catalog()
+        def school_name(code):
+            school = catalog.schools.get(code)
+            return school.get("name") if school and school.get("name") else code
 
-        # Xử lý kết quả từ $facet
-        stats_data = result[0]
-        
-        # Trích xuất dữ liệu, có xử lý trường hợp mảng rỗng
-        total_applications = stats_data["totalApplications"][0]["count"] if stats_data.get("totalApplications") else 0
-        
         response_data = {
             "totalApplications": total_applications,
-            "byStatus": stats_data.get("byStatus", []),
-            "bySchool": stats_data.get("bySchool", []),
-            "byMajor": stats_data.get("byMajor", []),
-            "bySubjectGroup": stats_data.get("bySubjectGroup", [])
+            "byStatus": [{"_id": k, "count": v} for k, v in by_status.most_common()],
+            "bySchool": [{"_id": k, "name": school_name(k), "count": v} for k, v in by_school.most_common()],
+            "byMajor": [{"_id": k, "count": v} for k, v in by_major.most_common(10)], # 10 ngành phổ biến nhất
+            "bySubjectGroup": [{"_id": k, "count": v} for k, v in by_subject_group.most_common()]
         }
         
         return response_data
 
+    except HTTPException:
+        raise
     except Exception as e:
         # Ghi lại log lỗi đầy đủ
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Lỗi server khi lấy dữ liệu thống kê: {str(e)}")
-
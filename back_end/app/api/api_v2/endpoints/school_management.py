@@ -1,12 +1,18 @@
 # app/routers/admin_school_router.py
-from fastapi import APIRouter, HTTPException, Depends, status, Query
+from fastapi import APIRouter, HTTPException, Depends, status, Query, BackgroundTasks, UploadFile, File, Request, Response
 from typing import List
 
-from app.database.database import db
+from app.crud import school_crud
+from app.crud.application_crud import sync_school_names
+from app.utils.catalog_cache import (
+    get_catalog, invalidate_catalog, not_modified, not_modified_response, set_cache_headers, ADMIN_CATALOG_CACHE_CONTROL
+)
 from app.schemas.school_management_schema import (
     SchoolManagementResponse, SchoolDetailSchema, MajorDetailSchema, SubjectCombinationDetailSchema,
-    SchoolCreateSchema, SchoolUpdateSchema
+    SchoolCreateSchema, SchoolUpdateSchema, CatalogImportReport
 )
+from app.utils.catalog_import import CatalogImportError, parse_catalog_file, diff_catalog, apply_catalog_diff
+from app.core.config import MAX_UPLOAD_SIZE
 from app.utils.auth import Auth 
 
 router = APIRouter()
@@ -30,7 +36,7 @@ async def get_full_admissions_data(
                 ]
             }
 
-        schools = list(db.schools.find(query_filter, {"_id": 0}))
+        schools = await school_crud.find_schools(query_filter, {"_id": 0})
         return schools
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Lỗi server: {str(e)}")
@@ -44,7 +50,7 @@ async def create_school(school_data: SchoolCreateSchema, current_user=Depends(Au
     - `code`: Mã trường phải là duy nhất.
     """
     # Kiểm tra xem mã trường đã tồn tại chưa
-    if db.schools.find_one({"code": school_data.code}):
+    if await school_crud.get_school_by_code(school_data.code):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Mã trường '{school_data.code}' đã tồn tại."
@@ -54,7 +60,8 @@ async def create_school(school_data: SchoolCreateSchema, current_user=Depends(Au
     new_school_dict = school_data.model_dump(by_alias=True)
     
     try:
-        db.schools.insert_one(new_school_dict)
+        await school_crud.insert_school(new_school_dict)
+        await invalidate_catalog()
         school_dict = school_data.model_dump()
         school_dict.pop("majors", None)
 
@@ -71,12 +78,47 @@ async def create_school(school_data: SchoolCreateSchema, current_user=Depends(Au
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Lỗi khi tạo trường mới: {str(e)}")
 
+# --- API NHẬP DANH MỤC HÀNG LOẠT (CSV / JSON) ---
+@router.post("/import", response_model=CatalogImportReport, summary="[Admin] Nhập hàng loạt trường / ngành / tổ hợp môn")
+async def import_catalog(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(..., description="Tệp .csv hoặc .json (xem app/utils/catalog_import.py)"),
+    dry_run: bool = Query(True, alias="dryRun", description="true: chỉ trả về báo cáo thêm / sửa / xóa, không ghi"),
+    delete_missing: bool = Query(False, alias="deleteMissing", description="Xóa các trường (và tổ hợp môn) không có trong tệp"),
+    current_user=Depends(Auth("admin"))
+):
+    """
+    Nhập danh mục từ tệp: kiểm tra từng trường / ngành theo SchoolCreateSchema, so sánh với danh mục hiện tại
+    và trả về báo cáo. Khi `dryRun=false`, các thay đổi được ghi bằng bulk_write theo lô;
+    tên trường / tên ngành mới được đồng bộ sang các hồ sơ đã nộp ở background.
+    """
+    content = await file.read(MAX_UPLOAD_SIZE + 1)
+    if len(content) > MAX_UPLOAD_SIZE:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Tệp nhập quá lớn.")
+
+    try:
+        diff = await diff_catalog(parse_catalog_file(content, file.filename or ""), delete_missing)
+        if not dry_run:
+            for school_code, school_name, majors in await apply_catalog_diff(diff):
+                background_tasks.add_task(sync_school_names, school_code, school_name, majors)
+        return {"dryRun": dry_run, **diff["report"]}
+    except CatalogImportError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail={"message": str(e), "errors": e.errors})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Lỗi khi nhập danh mục: {str(e)}")
+
 # --- API CẬP NHẬT TRƯỜNG (UPDATE) ---
 @router.put("/{school_code}", response_model=SchoolUpdateSchema, summary="[Admin] Cập nhật thông tin trường học")
-async def update_school(school_code: str, school_update: SchoolUpdateSchema, current_user=Depends(Auth("admin"))):
+async def update_school(
+    school_code: str,
+    school_update: SchoolUpdateSchema,
+    background_tasks: BackgroundTasks,
+    current_user=Depends(Auth("admin"))
+):
     """
     Cập nhật thông tin của một trường học dựa trên mã trường.
     - Chỉ các trường được cung cấp trong request body mới được cập nhật.
+    - Tên trường / tên ngành mới được đồng bộ sang các hồ sơ đã nộp ở background.
     """
     # Tạo dict chỉ chứa các trường được gửi lên
     update_data = school_update.model_dump(exclude_unset=True, by_alias=True)
@@ -88,19 +130,27 @@ async def update_school(school_code: str, school_update: SchoolUpdateSchema, cur
         )
 
     try:
-        result = db.schools.update_one(
-            {"code": school_code},
-            {"$set": update_data}
-        )
+        result = await school_crud.update_school_by_code(school_code, update_data)
         
         if result.matched_count == 0:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Không tìm thấy trường có mã '{school_code}'."
             )
+        await invalidate_catalog()
+
+        if "name" in update_data or "majors" in update_data:
+            background_tasks.add_task(
+                sync_school_names,
+                school_code,
+                update_data.get("name"),
+                update_data.get("majors")
+            )
             
         return school_update
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Lỗi khi cập nhật trường: {str(e)}")
 
@@ -111,27 +161,34 @@ async def delete_school(school_code: str, current_user=Depends(Auth("admin"))):
     Xóa một trường học khỏi cơ sở dữ liệu dựa trên mã trường.
     """
     try:
-        result = db.schools.delete_one({"code": school_code})
+        result = await school_crud.delete_school_by_code(school_code)
         
         if result.deleted_count == 0:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Không tìm thấy trường có mã '{school_code}' để xóa."
             )
+        await invalidate_catalog()
         
         # Trả về response không có nội dung khi xóa thành công
         return
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Lỗi khi xóa trường: {str(e)}")
 
 @router.get("/subject-combinations", response_model=List[SubjectCombinationDetailSchema], summary="[Admin] Lấy danh sách tất cả tổ hợp môn")
-async def get_all_subject_combinations(current_user=Depends(Auth("admin"))):
+async def get_all_subject_combinations(request: Request, response: Response, current_user=Depends(Auth("admin"))):
     """
     Lấy danh sách tất cả các tổ hợp môn để sử dụng trong các form, dropdown.
+    Trả về 304 nếu `If-None-Match` khớp ETag (version danh mục) hiện tại.
     """
     try:
-        combinations_cursor = db.subject_combination.find({}, {"_id": 0})
-        return list(combinations_cursor)
+        catalog = await get_catalog()
+        if not_modified(request, catalog):
+            return not_modified_response(catalog, ADMIN_CATALOG_CACHE_CONTROL)
+        set_cache_headers(response, catalog, ADMIN_CATALOG_CACHE_CONTROL)
+        return catalog.subject_combination_list
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Lỗi server khi lấy danh sách tổ hợp môn: {str(e)}")
\ No newline at end of file
@@ -4,4 +4,43 @@ from dotenv import load_dotenv
 load_dotenv()
 
 MONGO_URI = os.getenv("MONGO_URI")
+# Tên database; đặt khác (ví dụ admission_portal_bench) khi sinh dữ liệu thử / chạy benchmark
+MONGO_DB_NAME = os.getenv("MONGO_DB_NAME", "admission_portal")
+# Pool kết nối MongoDB (app/database/database.py). Tổng kết nối tới server = số worker x MONGO_MAX_POOL_SIZE
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "50"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "5"))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "300000"))
+# Thời gian tối đa một request chờ lấy kết nối khi pool đã dùng hết (0 = chờ mãi)
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "5000"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000"))
+MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "30000"))
+# Nén dữ liệu trên đường truyền, theo thứ tự ưu tiên; zstd / snappy cần cài thêm gói zstandard / python-snappy
+MONGO_COMPRESSORS = os.getenv("MONGO_COMPRESSORS", "zlib")
+# Số kết nối mở sẵn khi khởi động để các request đầu tiên sau khi deploy không phải chờ bắt tay TCP / TLS / xác thực
+MONGO_WARMUP_CONNECTIONS = int(os.getenv("MONGO_WARMUP_CONNECTIONS", str(MONGO_MIN_POOL_SIZE)))
 JWT_SECRET = os.getenv("JWT_SECRET")
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads")
+# Giới hạn kích thước một tệp tải lên (byte) và kích thước bộ đệm khi ghi đĩa
+MAX_UPLOAD_SIZE = int(os.getenv("MAX_UPLOAD_SIZE", str(20 * 1024 * 1024)))
+UPLOAD_BUFFER_SIZE = int(os.getenv("UPLOAD_BUFFER_SIZE", str(1024 * 1024)))
+
+# Cấu hình SMTP cho worker gửi email (app/utils/mail_worker.py).
+# Khi thử nghiệm với SMTP giả lập cục bộ: SMTP_HOST=localhost SMTP_PORT=1025 SMTP_STARTTLS=false
+SMTP_USER = os.getenv("SMTP_USER")
+SMTP_PASS = os.getenv("SMTP_PASS")
+SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "true").lower() == "true"
+# Địa chỉ người gửi (header From và envelope sender); mặc định là SMTP_USER
+SMTP_FROM = os.getenv("SMTP_FROM") or SMTP_USER or "no-reply@localhost"
+
+# Nếu đặt, endpoint /metrics yêu cầu header "Authorization: Bearer <METRICS_TOKEN>"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+# Tải tệp đính kèm qua URL ký HMAC có hạn dùng (app/utils/file_access.py)
+FILE_URL_SECRET = os.getenv("FILE_URL_SECRET") or JWT_SECRET
+FILE_URL_TTL_SECONDS = int(os.getenv("FILE_URL_TTL_SECONDS", "900"))
+# Nếu đặt (ví dụ /protected-uploads/), endpoint tải tệp chỉ trả header X-Accel-Redirect để nginx gửi tệp;
+# location tương ứng phải là `internal` và trỏ tới UPLOAD_DIR
+FILE_ACCEL_REDIRECT_PREFIX = os.getenv("FILE_ACCEL_REDIRECT_PREFIX")
@@ -0,0 +1,132 @@
+# app/crud/application_crud.py
+import asyncio
+
+from pymongo import UpdateOne
+
+from app.database.database import get_db
+# schoolName / majorName được ghi sẵn vào hồ sơ khi nộp nên danh sách không cần $lookup sang `schools`
+from app.crud.application_query import LIST_PROJECTION, projection_for
+from app.utils.pagination import encode_cursor, keyset_condition
+from app.utils.search import build_search_keys
+
+# Thứ tự của mọi danh sách hồ sơ; _id giúp thứ tự ổn định khi trùng updated_at
+LIST_SORT = [("updated_at", -1), ("_id", -1)]
+
+
+# Số hồ sơ cập nhật mỗi lượt khi đồng bộ lại tên trường / tên ngành
+NAME_SYNC_BATCH_SIZE = 1000
+
+
+def resolve_school_names(school: dict, major_code: str):
+    """Lấy (tên trường, tên ngành) từ document trường để ghi kèm vào hồ sơ."""
+    if not school:
+        return None, None
+    major = next((m for m in school.get("majors", []) if m.get("code") == major_code), None)
+    return school.get("name"), major.get("name") if major else None
+
+async def insert_application(application_data: dict):
+    return await get_db().applications.insert_one(application_data)
+
+async def aggregate_applications(pipeline: list):
+    cursor = await get_db().applications.aggregate(pipeline)
+    return await cursor.to_list(None)
+
+async def get_application_by_code(application_code: str):
+    return await get_db().applications.find_one({"applicationCode": application_code})
+
+async def get_application_detail(query: dict):
+    """
+    Lấy một hồ sơ đầy đủ. Hồ sơ cũ chưa được ghi schoolName / majorName
+    (chưa chạy app.scripts.backfill_application_names) thì tra tên từ `schools`.
+    """
+    application = await get_db().applications.find_one(query)
+    if application and "schoolName" not in application:
+        school = await get_db().schools.find_one({"code": application.get("school")})
+        application["schoolName"], application["majorName"] = resolve_school_names(school, application.get("major"))
+    return application
+
+async def update_application_by_code(application_code: str, update_data: dict, extra_filter: dict = None):
+    """`extra_filter`: điều kiện thêm, ví dụ {"status": <trạng thái đã đọc>} để không ghi đè thay đổi đồng thời."""
+    return await get_db().applications.update_one({**(extra_filter or {}), "applicationCode": application_code}, update_data)
+
+async def find_applications(query: dict, projection: dict = None, limit: int = 0):
+    return await get_db().applications.find(query, projection).limit(limit).to_list(None)
+
+async def bulk_write_applications(operations: list):
+    return await get_db().applications.bulk_write(operations, ordered=False)
+
+async def iter_applications(query: dict, projection: dict, batch_size: int = 1000):
+    """Duyệt hồ sơ bằng cursor phía server theo từng lô, bộ nhớ không phụ thuộc số bản ghi."""
+    cursor = get_db().applications.find(query, projection).sort(LIST_SORT).batch_size(batch_size)
+    try:
+        async for document in cursor:
+            yield document
+    finally:
+        await cursor.close()
+
+async def count_applications(match_stage: dict):
+    return await get_db().applications.count_documents(match_stage)
+
+async def list_applications_by_page(match_stage: dict, page: int, limit: int):
+    """Phân trang theo số trang (skip/limit). Trả về (danh sách hồ sơ, tổng số bản ghi)."""
+    cursor = get_db().applications.find(match_stage, LIST_PROJECTION).sort(LIST_SORT).skip((page - 1) * limit).limit(limit)
+    return await asyncio.gather(cursor.to_list(None), count_applications(match_stage))
+
+async def list_applications_by_cursor(match_stage: dict, after, limit: int):
+    """
+    Phân trang theo con trỏ (updated_at, _id): chi phí mỗi trang không phụ thuộc độ sâu.
+    `after` là (updated_at, _id) của bản ghi cuối trang trước hoặc None cho trang đầu.
+    Trả về (danh sách hồ sơ, con trỏ trang kế tiếp hoặc None).
+    """
+    if after:
+        match_stage = {"$and": [match_stage, keyset_condition(*after)]}
+    docs = await get_db().applications.find(match_stage, LIST_PROJECTION).sort(LIST_SORT).limit(limit + 1).to_list(None)
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor(docs[-1]["updated_at"], docs[-1]["_id"])
+    return docs, next_cursor
+
+async def _update_applications_in_batches(query: dict, update: dict):
+    """
+    Cập nhật theo từng lô `_id` để không khóa / ghi hàng trăm nghìn hồ sơ trong một lệnh.
+    `query` phải loại các hồ sơ đã cập nhật (ví dụ dùng $ne) để vòng lặp kết thúc.
+    """
+    updated = 0
+    while True:
+        batch = await get_db().applications.find(query, projection_for("_id")).limit(NAME_SYNC_BATCH_SIZE).to_list(None)
+        if not batch:
+            return updated
+        result = await get_db().applications.update_many({"_id": {"$in": [doc["_id"] for doc in batch]}}, update)
+        updated += result.modified_count
+
+async def sync_school_names(school_code: str, school_name: str = None, majors: list = None):
+    """Đồng bộ schoolName / majorName trên các hồ sơ sau khi trường hoặc ngành được đổi tên."""
+    updated = 0
+    if school_name is not None:
+        updated += await _update_applications_in_batches(
+            {"school": school_code, "schoolName": {"$ne": school_name}},
+            {"$set": {"schoolName": school_name}}
+        )
+    for major in majors or []:
+        updated += await _update_applications_in_batches(
+            {"school": school_code, "major": major["code"], "majorName": {"$ne": major["name"]}},
+            {"$set": {"majorName": major["name"]}}
+        )
+    return updated
+
+async def backfill_search_keys(batch_size: int = NAME_SYNC_BATCH_SIZE):
+    """Tính `searchKeys` cho các hồ sơ chưa có, theo từng lô. Trả về số hồ sơ đã cập nhật."""
+    updated = 0
+    while True:
+        batch = await get_db().applications.find(
+            {"searchKeys": {"$exists": False}},
+            projection_for("fullname", "applicationCode")
+        ).limit(batch_size).to_list(None)
+        if not batch:
+            return updated
+        result = await get_db().applications.bulk_write(
+            [UpdateOne({"_id": doc["_id"]}, {"$set": {"searchKeys": build_search_keys(doc)}}) for doc in batch],
+            ordered=False
+        )
+        updated += result.modified_count
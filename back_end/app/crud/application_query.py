@@ -0,0 +1,94 @@
+# app/crud/application_query.py
+"""
+Dựng điều kiện lọc và projection cho các truy vấn danh sách / đếm / thống kê trên `applications`.
+
+Hồ sơ có thể nặng vài MB vì tệp đính kèm (ảnh CCCD, học bạ, giấy tờ). Các route danh sách,
+đếm và thống kê chỉ được đọc những trường cần thiết: mọi projection đều đi qua `projection_for`,
+hàm này từ chối các trường đính kèm, và mọi pipeline đều bắt đầu bằng `$match` + `$project`
+(`minimal_pipeline`) để tài liệu đầy đủ không đi qua các stage phía sau.
+"""
+import re
+from datetime import datetime
+
+from bson import ObjectId
+
+from app.utils.search import search_filter
+
+# Các trường chứa tệp đính kèm (tham chiếu blob hoặc base64 của hồ sơ cũ)
+ATTACHMENT_FIELDS = frozenset({"cccdFront", "cccdBack", "transcript", "priorityProof", "extraDocuments"})
+
+
+def projection_for(*fields: str, include_id: bool = True) -> dict:
+    """Projection chỉ gồm `fields`; báo lỗi nếu vô tình yêu cầu trường đính kèm."""
+    attachments = ATTACHMENT_FIELDS.intersection(field.split(".")[0] for field in fields)
+    if attachments:
+        raise ValueError(f"Không được đọc trường đính kèm trong truy vấn danh sách: {sorted(attachments)}")
+    projection = {field: 1 for field in fields}
+    if not include_id:
+        projection["_id"] = 0
+    return projection
+
+
+# Một dòng trong danh sách hồ sơ (updated_at / _id dùng cho sắp xếp và con trỏ)
+LIST_PROJECTION = projection_for("applicationCode", "schoolName", "majorName", "status", "updated_at")
+# Các trường dùng để đếm thống kê
+STATISTICS_PROJECTION = projection_for("created_at", "school", "major", "subjectGroup", "status", include_id=False)
+
+# Các cột được phép xuất ra CSV / NDJSON (không bao giờ gồm tệp đính kèm), theo thứ tự mặc định
+EXPORT_COLUMNS = (
+    "applicationCode", "fullname", "gender", "dob", "idNumber",
+    "province", "district", "ward", "addressDetail",
+    "school", "schoolName", "major", "majorName", "subjectGroup",
+    "mathScore", "literatureScore", "englishScore", "physicsScore", "chemistryScore",
+    "biologyScore", "historyScore", "geographyScore", "civicEducationScore", "totalScore",
+    "priority", "status", "created_at", "updated_at",
+)
+
+
+def minimal_pipeline(match_stage: dict, projection: dict, *stages: dict) -> list:
+    """Pipeline aggregate bắt đầu bằng $match rồi $project ngay, trước mọi stage khác."""
+    return [{"$match": match_stage}, {"$project": projection}, *stages]
+
+
+def _parse_day(value: str, name: str, end_of_day: bool = False) -> datetime:
+    try:
+        return datetime.fromisoformat(value + ("T23:59:59" if end_of_day else "T00:00:00"))
+    except ValueError:
+        raise ValueError(f"Định dạng {name} không hợp lệ. Vui lòng dùng YYYY-MM-DD.")
+
+
+def build_application_filter(
+    user_id: str = None,
+    search: str = None,
+    code_search: str = None,
+    school_code: str = None,
+    major_code: str = None,
+    subject_group: str = None,
+    status: str = None,
+    date_from: str = None,
+    date_to: str = None,
+) -> dict:
+    """
+    Điều kiện `$match` dùng chung cho danh sách, đếm, xuất dữ liệu và đổi trạng thái hàng loạt.
+    - `search`: tìm không dấu theo họ tên / mã hồ sơ (index searchKeys).
+    - `code_search`: tìm theo một phần mã hồ sơ (chỉ dùng khi đã lọc theo `user_id`).
+    - `date_from` / `date_to` (YYYY-MM-DD) lọc theo updated_at; sai định dạng thì báo ValueError.
+    """
+    match_stage = {}
+    if user_id is not None:
+        match_stage["userId"] = ObjectId(user_id)
+    if search:
+        search_condition = search_filter(search)
+        if search_condition:
+            match_stage.update(search_condition)
+    if code_search:
+        match_stage["applicationCode"] = {"$regex": re.escape(code_search), "$options": "i"}
+    if school_code: match_stage["school"] = school_code
+    if major_code: match_stage["major"] = major_code
+    if subject_group: match_stage["subjectGroup"] = subject_group
+    if status: match_stage["status"] = status
+    if date_from or date_to:
+        match_stage["updated_at"] = {}
+        if date_from: match_stage["updated_at"]["$gte"] = _parse_day(date_from, "dateFrom")
+        if date_to: match_stage["updated_at"]["$lte"] = _parse_day(date_to, "dateTo", end_of_day=True)
+    return match_stage
@@ -0,0 +1,16 @@
+# app/crud/counter_crud.py
+from pymongo import ReturnDocument
+from app.database.database import get_db
+
+async def reserve_sequence_block(name: str, size: int):
+    """
+    Giữ chỗ `size` số liên tiếp của bộ đếm `name` bằng một lệnh $inc nguyên tử.
+    Trả về (số đầu, số cuối) của khối; các worker khác không bao giờ nhận trùng khối.
+    """
+    counter = await get_db().counters.find_one_and_update(
+        {"_id": name},
+        {"$inc": {"value": size}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return counter["value"] - size + 1, counter["value"]
@@ -0,0 +1,101 @@
+# app/crud/outbox_crud.py
+import secrets
+from datetime import datetime, timedelta
+from pymongo import ReturnDocument
+from app.database.database import get_db
+
+# Trạng thái email trong collection `email_outbox`
+OUTBOX_PENDING = "pending"
+OUTBOX_SENDING = "sending"
+OUTBOX_SENT = "sent"
+OUTBOX_DEAD = "dead"
+
+def _outbox_document(message: dict, now: datetime) -> dict:
+    return {
+        **message,
+        "status": OUTBOX_PENDING,
+        "attempts": 0,
+        "next_attempt_at": now,
+        "created_at": now,
+    }
+
+async def enqueue_email(message: dict):
+    return await get_db().email_outbox.insert_one(_outbox_document(message, datetime.utcnow()))
+
+async def enqueue_emails(messages: list):
+    if not messages:
+        return None
+    now = datetime.utcnow()
+    return await get_db().email_outbox.insert_many([_outbox_document(m, now) for m in messages], ordered=False)
+
+async def claim_emails(limit: int, lease_seconds: int, max_attempts: int):
+    """
+    Nhận tối đa `limit` email đến hạn gửi. Mỗi email được giữ `lease_seconds` giây;
+    nếu worker chết giữa chừng, email sẽ được worker khác nhận lại sau khi hết hạn giữ.
+
+    Mỗi lần nhận tính là một lần thử (`attempts` tăng ở đây, kể cả khi nhận lại email hết hạn giữ),
+    nên email làm worker chết liên tục cũng chuyển sang dead-letter sau `max_attempts` lần.
+    Trả về (lease_token, danh sách email); token phải được truyền lại khi ghi kết quả.
+    """
+    now = datetime.utcnow()
+    outbox = get_db().email_outbox
+    # Email hết hạn giữ đã dùng hết lượt thử: không nhận lại nữa
+    await outbox.update_many(
+        {"status": OUTBOX_SENDING, "locked_until": {"$lt": now}, "attempts": {"$gte": max_attempts}},
+        {
+            "$set": {"status": OUTBOX_DEAD, "last_error": "Hết hạn giữ khi đang gửi", "updated_at": now},
+            "$unset": {"locked_until": "", "lease_token": ""},
+        }
+    )
+
+    lease_token = secrets.token_hex(8)
+    claimed = []
+    for _ in range(limit):
+        message = await outbox.find_one_and_update(
+            {"$or": [
+                {"status": OUTBOX_PENDING, "next_attempt_at": {"$lte": now}},
+                {"status": OUTBOX_SENDING, "locked_until": {"$lt": now}},
+            ], "attempts": {"$lt": max_attempts}},
+            {
+                "$set": {
+                    "status": OUTBOX_SENDING,
+                    "locked_until": now + timedelta(seconds=lease_seconds),
+                    "lease_token": lease_token,
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("next_attempt_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+        if message is None:
+            break
+        claimed.append(message)
+    return lease_token, claimed
+
+def _leased(message_filter: dict, lease_token: str) -> dict:
+    # Chỉ worker còn giữ email mới được ghi kết quả: worker hết hạn giữ không ghi đè lượt nhận của worker khác
+    return {**message_filter, "status": OUTBOX_SENDING, "lease_token": lease_token}
+
+async def mark_emails_sent(message_ids: list, lease_token: str):
+    if not message_ids:
+        return None
+    return await get_db().email_outbox.update_many(
+        _leased({"_id": {"$in": message_ids}}, lease_token),
+        {"$set": {"status": OUTBOX_SENT, "sent_at": datetime.utcnow()}, "$unset": {"locked_until": "", "lease_token": ""}}
+    )
+
+async def mark_email_failed(message: dict, error: str, retry_at, lease_token: str):
+    """Ghi nhận lần gửi lỗi; `retry_at` là None khi đã hết số lần thử (chuyển sang dead-letter)."""
+    update = {
+        "$set": {"last_error": error, "updated_at": datetime.utcnow()},
+        "$unset": {"locked_until": "", "lease_token": ""},
+    }
+    if retry_at is None:
+        update["$set"]["status"] = OUTBOX_DEAD
+    else:
+        update["$set"].update({"status": OUTBOX_PENDING, "next_attempt_at": retry_at})
+    return await get_db().email_outbox.update_one(_leased({"_id": message["_id"]}, lease_token), update)
+
+async def count_emails_by_status():
+    cursor = await get_db().email_outbox.aggregate([{"$group": {"_id": "$status", "count": {"$sum": 1}}}])
+    return {item["_id"]: item["count"] async for item in cursor}
@@ -0,0 +1,46 @@
+# app/crud/school_crud.py
+from pymongo import ReturnDocument
+from app.database.database import get_db
+
+async def find_schools(query_filter: dict = None, projection: dict = None):
+    return await get_db().schools.find(query_filter or {}, projection).to_list(None)
+
+async def get_school_by_code(school_code: str):
+    return await get_db().schools.find_one({"code": school_code})
+
+async def insert_school(school_data: dict):
+    return await get_db().schools.insert_one(school_data)
+
+async def update_school_by_code(school_code: str, update_data: dict):
+    return await get_db().schools.update_one({"code": school_code}, {"$set": update_data})
+
+async def delete_school_by_code(school_code: str):
+    return await get_db().schools.delete_one({"code": school_code})
+
+async def bulk_write_schools(operations: list):
+    return await get_db().schools.bulk_write(operations, ordered=False)
+
+async def get_subject_combination_by_code(code: str):
+    return await get_db().subject_combination.find_one({"code": code})
+
+async def find_subject_combinations(projection: dict = None):
+    return await get_db().subject_combination.find({}, projection).to_list(None)
+
+async def bulk_write_subject_combinations(operations: list):
+    return await get_db().subject_combination.bulk_write(operations, ordered=False)
+
+async def find_subjects():
+    return await get_db().subject.find().to_list(None)
+
+async def get_catalog_version():
+    meta = await get_db().catalog_meta.find_one({"_id": "catalog"})
+    return meta.get("version", 0) if meta else 0
+
+async def bump_catalog_version():
+    meta = await get_db().catalog_meta.find_one_and_update(
+        {"_id": "catalog"},
+        {"$inc": {"version": 1}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return meta["version"]
@@ -0,0 +1,86 @@
+# app/crud/statistics_crud.py
+"""
+Bảng tổng hợp (rollup) số hồ sơ cho trang thống kê của admin.
+
+Mỗi document trong `application_stats` là một bộ đếm cho tổ hợp
+(ngày nộp, trường, ngành, tổ hợp môn, trạng thái). Bộ đếm được cập nhật bằng `$inc`
+khi nộp hồ sơ và khi đổi trạng thái; API thống kê chỉ cần đọc các bộ đếm này thay vì
+quét toàn bộ `applications`. Nếu số liệu bị lệch (ví dụ sửa dữ liệu trực tiếp trong DB),
+chạy `python -m app.scripts.rebuild_statistics` để tính lại từ đầu.
+"""
+from pymongo import UpdateOne
+from app.database.database import get_db
+from app.crud.application_query import STATISTICS_PROJECTION, minimal_pipeline
+
+BUCKET_FIELDS = ("day", "school", "major", "subjectGroup", "status")
+
+
+def _bucket(application: dict, status: str):
+    # Giống thống kê cũ: bỏ qua hồ sơ không có trường
+    if application.get("school") is None:
+        return None
+    created_at = application.get("created_at")
+    return {
+        "day": created_at.strftime("%Y-%m-%d") if created_at else None,
+        "school": application.get("school"),
+        "major": application.get("major"),
+        "subjectGroup": application.get("subjectGroup"),
+        "status": status,
+    }
+
+
+def _increment(bucket: dict, delta: int):
+    return UpdateOne(bucket, {"$inc": {"count": delta}}, upsert=True)
+
+
+async def record_application_created(application: dict):
+    bucket = _bucket(application, application.get("status"))
+    if bucket:
+        await get_db().application_stats.update_one(bucket, {"$inc": {"count": 1}}, upsert=True)
+
+
+async def record_status_changes(changes: list):
+    """`changes` là danh sách (hồ sơ, trạng thái cũ, trạng thái mới); ghi bằng một lệnh bulk_write."""
+    operations = []
+    for application, old_status, new_status in changes:
+        old_bucket = _bucket(application, old_status)
+        if old_bucket:
+            operations.append(_increment(old_bucket, -1))
+            operations.append(_increment(_bucket(application, new_status), 1))
+    if operations:
+        await get_db().application_stats.bulk_write(operations, ordered=False)
+
+
+async def find_statistic_buckets(day_from: str = None, day_to: str = None):
+    query = {"count": {"$gt": 0}}
+    if day_from or day_to:
+        query["day"] = {}
+        if day_from:
+            query["day"]["$gte"] = day_from
+        if day_to:
+            query["day"]["$lte"] = day_to
+    return await get_db().application_stats.find(query, {"_id": 0}).to_list(None)
+
+
+async def rebuild_statistics():
+    """Tính lại toàn bộ bảng tổng hợp từ `applications` và thay thế nguyên tử bằng $out."""
+    # Chỉ giữ các trường cần đếm ngay sau $match, không kéo tệp đính kèm qua pipeline
+    pipeline = minimal_pipeline(
+        {"school": {"$ne": None}},
+        STATISTICS_PROJECTION,
+        {"$group": {
+            "_id": {
+                "day": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}},
+                "school": "$school",
+                "major": "$major",
+                "subjectGroup": "$subjectGroup",
+                "status": "$status",
+            },
+            "count": {"$sum": 1},
+        }},
+        {"$replaceWith": {"$mergeObjects": ["$_id", {"count": "$count"}]}},
+        {"$out": "application_stats"},
+    )
+    cursor = await get_db().applications.aggregate(pipeline, allowDiskUse=True)
+    await cursor.to_list(None)
+    return await get_db().application_stats.count_documents({})
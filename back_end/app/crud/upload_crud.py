@@ -0,0 +1,26 @@
+# app/crud/upload_crud.py
+from datetime import datetime
+from app.database.database import get_db
+
+async def create_upload_session(session_data: dict):
+    return await get_db().upload_sessions.insert_one(session_data)
+
+async def get_upload_session(upload_id: str, user_id: str):
+    return await get_db().upload_sessions.find_one({"_id": upload_id, "userId": user_id})
+
+async def touch_upload_session(upload_id: str, offset: int):
+    return await get_db().upload_sessions.update_one(
+        {"_id": upload_id},
+        {"$set": {"offset": offset, "updated_at": datetime.utcnow()}}
+    )
+
+async def delete_upload_session(upload_id: str):
+    return await get_db().upload_sessions.delete_one({"_id": upload_id})
+
+async def find_upload_session_ids(upload_ids: list) -> set:
+    """Các `upload_ids` còn bản ghi phiên tải."""
+    sessions = await get_db().upload_sessions.find({"_id": {"$in": upload_ids}}, {"_id": 1}).to_list(None)
+    return {session["_id"] for session in sessions}
+
+async def delete_upload_sessions_before(updated_before: datetime):
+    return await get_db().upload_sessions.delete_many({"updated_at": {"$lt": updated_before}})
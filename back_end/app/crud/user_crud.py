@@ -1,37 +1,58 @@
-from app.database.database import db
+from pymongo import ReturnDocument
+from app.database.database import get_db
+from app.utils.principal_cache import invalidate_principal
 
-def get_user_by_username(username: str):
-    return db.users.find_one({"username": username})
+# Các hàm thay đổi thông tin người dùng phải xóa người dùng khỏi cache đăng nhập (principal_cache)
 
-def create_user(user_data: dict):
-    return db.users.insert_one(user_data)
+async def get_user_by_username(username: str):
+    return await get_db().users.find_one({"username": username})
 
-def get_user_by_email(email: str):
-    return db.users.find_one({"email": email})
+async def create_user(user_data: dict):
+    return await get_db().users.insert_one(user_data)
 
-def update_user_verified(token: str):
-    return db.users.update_one({"verification_token": token}, {"$set": {"isVerified": True}})
+async def get_user_by_email(email: str):
+    return await get_db().users.find_one({"email": email})
 
-def update_user_reset_token(email: str, token: str, expired: int):
-    return db.users.update_one(
+async def update_user_verified(token: str):
+    user = await get_db().users.find_one_and_update(
+        {"verification_token": token, "isVerified": {"$ne": True}},
+        {"$set": {"isVerified": True}},
+        projection={"username": 1}
+    )
+    if user:
+        invalidate_principal(user.get("username"))
+    return user
+
+async def update_user_reset_token(email: str, token: str, expired: int):
+    return await get_db().users.update_one(
         {"email": email},
         {"$set": {"reset_token": token, "reset_token_expired": expired}}
     )
 
-def get_user_by_reset_token(token: str):
-    return db.users.find_one({"reset_token": token})
+async def get_user_by_reset_token(token: str):
+    return await get_db().users.find_one({"reset_token": token})
 
-def reset_user_password(email: str, new_password_hash: str):
-    return db.users.update_one(
-        {"email": email},
-        {"$set": {"password_hash": new_password_hash}, "$unset": {"reset_token": "", "reset_token_expired": ""}}
-    )
+async def get_user_by_id(user_id):
+    return await get_db().users.find_one({"_id": user_id})
 
-def update_user_reset_token(email: str, token: str, expired: int):
-    return db.users.update_one(
+async def get_users_by_ids(user_ids: list, projection: dict = None):
+    return await get_db().users.find({"_id": {"$in": user_ids}}, projection).to_list(None)
+
+async def reset_user_password(email: str, new_password_hash: str):
+    user = await get_db().users.find_one_and_update(
         {"email": email},
-        {"$set": {"reset_token": token, "reset_token_expired": expired}}
+        {"$set": {"password_hash": new_password_hash}, "$unset": {"reset_token": "", "reset_token_expired": ""}},
+        projection={"username": 1},
+        return_document=ReturnDocument.AFTER
     )
-    
-def update_user_info_by_username(username, update_fields: dict):
-    return db.users.update_one({"username": username}, {"$set": update_fields})
\ No newline at end of file
+    if user:
+        invalidate_principal(user.get("username"))
+    return user
+
+async def update_user_password_hash(username: str, password_hash: str):
+    return await get_db().users.update_one({"username": username}, {"$set": {"password_hash": password_hash}})
+
+async def update_user_info_by_username(username, update_fields: dict):
+    result = await get_db().users.update_one({"username": username}, {"$set": update_fields})
+    invalidate_principal(username)
+    return result
@@ -1,6 +1,90 @@
-from pymongo import MongoClient
-from app.core.config import MONGO_URI
+# app/database/database.py
+"""
+Vòng đời kết nối MongoDB.
 
-client = MongoClient(MONGO_URI)
-# db = client.get_database()  # Hoặc db = client['admission_portal']
-db = client['admission_portal']
+Client được tạo trong lifespan của ứng dụng (app/main.py) bằng `connect()` và đóng bằng `close()`;
+script chạy ngoài ứng dụng gọi hai hàm này trong `main`. Các module crud lấy database qua `get_db()`.
+
+`connect()` mở sẵn MONGO_WARMUP_CONNECTIONS kết nối (ping đồng thời) trước khi ứng dụng nhận request.
+Số liệu pool (thời gian chờ lấy kết nối, số kết nối đang dùng...) do `pool_monitor` ghi và
+xuất ra /metrics; thời gian từng lệnh do `command_monitor` ghi (app/database/monitoring.py).
+"""
+import asyncio
+import time
+
+from pymongo import AsyncMongoClient
+
+from app.core.config import (
+    MONGO_URI, MONGO_DB_NAME, MONGO_MAX_POOL_SIZE, MONGO_MIN_POOL_SIZE, MONGO_MAX_IDLE_TIME_MS,
+    MONGO_WAIT_QUEUE_TIMEOUT_MS, MONGO_SERVER_SELECTION_TIMEOUT_MS, MONGO_CONNECT_TIMEOUT_MS,
+    MONGO_SOCKET_TIMEOUT_MS, MONGO_COMPRESSORS, MONGO_WARMUP_CONNECTIONS,
+)
+from app.database.monitoring import command_monitor, pool_monitor
+
+_client = None
+_db = None
+
+
+def create_client() -> AsyncMongoClient:
+    # Dùng client bất đồng bộ để các endpoint `async def` không chặn event loop khi chờ MongoDB.
+    # Tùy chọn trong MONGO_URI (nếu có) bị các tham số dưới đây ghi đè
+    options = {
+        "maxPoolSize": MONGO_MAX_POOL_SIZE,
+        "minPoolSize": MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": MONGO_MAX_IDLE_TIME_MS,
+        "waitQueueTimeoutMS": MONGO_WAIT_QUEUE_TIMEOUT_MS or None,
+        "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "connectTimeoutMS": MONGO_CONNECT_TIMEOUT_MS,
+        "socketTimeoutMS": MONGO_SOCKET_TIMEOUT_MS,
+        "appname": "admission-portal",
+    }
+    if MONGO_COMPRESSORS:
+        options["compressors"] = MONGO_COMPRESSORS
+    return AsyncMongoClient(MONGO_URI, event_listeners=[command_monitor, pool_monitor], **options)
+
+
+async def warmup(db, connections: int = MONGO_WARMUP_CONNECTIONS):
+    """Chọn server và mở sẵn `connections` kết nối: các ping chạy đồng thời nên mỗi ping cần một kết nối riêng."""
+    # Không thể mở quá maxPoolSize kết nối
+    connections = max(1, min(connections, MONGO_MAX_POOL_SIZE))
+    started = time.perf_counter()
+    await db.command("ping")
+    if connections > 1:
+        await asyncio.gather(*(db.command("ping") for _ in range(connections)))
+    print(f"[mongo] Đã kết nối {MONGO_DB_NAME}, mở sẵn {connections} kết nối trong {(time.perf_counter() - started) * 1000:.0f}ms")
+
+
+async def connect(warmup_connections: int = MONGO_WARMUP_CONNECTIONS):
+    """Tạo client (nếu chưa có), làm nóng pool và trả về database."""
+    global _client, _db
+    if _client is None:
+        _client = create_client()
+        _db = _client[MONGO_DB_NAME]
+        # Database dùng để chạy explain cho lệnh chậm
+        command_monitor.bind(_db)
+    if warmup_connections:
+        await warmup(_db, warmup_connections)
+    return _db
+
+
+async def close():
+    global _client, _db
+    if _client is not None:
+        client, _client, _db = _client, None, None
+        command_monitor.bind(None)
+        await client.close()
+
+
+def get_db():
+    if _db is None:
+        raise RuntimeError("Chưa kết nối MongoDB: gọi `await connect()` trước (lifespan hoặc main của script)")
+    return _db
+
+
+async def run_script(fn, *args):
+    """Chạy `await fn(*args)` trong script: kết nối trước (không làm nóng pool), luôn đóng client sau đó."""
+    await connect(warmup_connections=0)
+    try:
+        return await fn(*args)
+    finally:
+        await close()
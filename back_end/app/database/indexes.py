@@ -0,0 +1,130 @@
+# app/database/indexes.py
+"""
+Danh sách index bắt buộc của từng collection.
+`ensure_indexes` được gọi khi ứng dụng khởi động (lifespan trong app/main.py):
+tạo các index còn thiếu và báo cáo sai lệch (index khác tùy chọn, index thừa).
+
+Kiểm tra thủ công: python -m app.database.indexes
+"""
+import asyncio
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+INDEXES = {
+    "applications": [
+        # Danh sách hồ sơ của thí sinh: lọc theo userId, sắp xếp (và phân trang con trỏ) theo updated_at, _id
+        IndexModel([("userId", ASCENDING), ("updated_at", DESCENDING), ("_id", DESCENDING)], name="userId_updated_at_id"),
+        # Danh sách hồ sơ cho admin: sắp xếp (và phân trang con trỏ) theo updated_at, _id
+        IndexModel([("updated_at", DESCENDING), ("_id", DESCENDING)], name="updated_at_id"),
+        # Lọc theo trường / ngành và đồng bộ lại tên trường / tên ngành đã ghi vào hồ sơ
+        IndexModel([("school", ASCENDING), ("major", ASCENDING)], name="school_major"),
+        # Tìm kiếm không dấu của admin: index multikey trên token / tiền tố (app/utils/search.py)
+        IndexModel([("searchKeys", ASCENDING)], name="searchKeys"),
+        # Mọi API chi tiết / cập nhật trạng thái đều tra cứu theo mã hồ sơ
+        IndexModel([("applicationCode", ASCENDING)], name="applicationCode_unique", unique=True),
+    ],
+    "users": [
+        IndexModel([("username", ASCENDING)], name="username_unique", unique=True),
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+        IndexModel([("verification_token", ASCENDING)], name="verification_token", sparse=True),
+        IndexModel([("reset_token", ASCENDING)], name="reset_token", sparse=True),
+    ],
+    "schools": [
+        # foreignField của các $lookup từ applications
+        IndexModel([("code", ASCENDING)], name="code_unique", unique=True),
+    ],
+    "subject_combination": [
+        IndexModel([("code", ASCENDING)], name="code_unique", unique=True),
+    ],
+    "application_stats": [
+        # Mỗi bộ đếm là duy nhất theo (ngày, trường, ngành, tổ hợp, trạng thái); đọc theo khoảng ngày
+        IndexModel(
+            [("day", ASCENDING), ("school", ASCENDING), ("major", ASCENDING), ("subjectGroup", ASCENDING), ("status", ASCENDING)],
+            name="bucket_unique",
+            unique=True,
+        ),
+    ],
+    "email_outbox": [
+        # Worker gửi email tìm các email đến hạn theo trạng thái
+        IndexModel([("status", ASCENDING), ("next_attempt_at", ASCENDING)], name="status_next_attempt_at"),
+        # Email đã gửi được giữ lại 7 ngày để tra cứu
+        IndexModel([("sent_at", ASCENDING)], name="sent_at_ttl", expireAfterSeconds=7 * 24 * 3600),
+    ],
+    "upload_sessions": [
+        # Phiên tải tệp bỏ dở quá 2 ngày sẽ tự bị xóa
+        IndexModel([("updated_at", ASCENDING)], name="updated_at_ttl", expireAfterSeconds=2 * 24 * 3600),
+    ],
+}
+
+# Các tùy chọn được so sánh khi phát hiện sai lệch
+_COMPARED_OPTIONS = ("unique", "sparse", "expireAfterSeconds", "partialFilterExpression")
+
+
+def _index_signature(spec: dict) -> dict:
+    return {option: spec.get(option) for option in _COMPARED_OPTIONS if spec.get(option) not in (None, False)}
+
+
+def _key_of(spec) -> list:
+    # Chuẩn hóa 1.0 / -1.0 (index tạo từ mongo shell) về số nguyên
+    return [(field, int(direction) if isinstance(direction, (int, float)) else direction) for field, direction in spec]
+
+
+async def ensure_collection_indexes(collection, models: list) -> dict:
+    report = {"created": [], "mismatched": [], "extra": [], "errors": []}
+    existing = await collection.index_information()
+    existing_by_key = {tuple(_key_of(info["key"])): (name, info) for name, info in existing.items()}
+
+    to_create = []
+    for model in models:
+        spec = model.document
+        key = tuple(_key_of(spec["key"].items()))
+        current = existing_by_key.get(key)
+        if current is None:
+            to_create.append(model)
+            continue
+        name, info = current
+        if _index_signature(info) != _index_signature(spec):
+            report["mismatched"].append({
+                "name": name,
+                "expected": _index_signature(spec),
+                "actual": _index_signature(info),
+            })
+
+    for model in to_create:
+        try:
+            await collection.create_indexes([model])
+            report["created"].append(model.document["name"])
+        except OperationFailure as e:
+            # Ví dụ: dữ liệu đang có bản ghi trùng nên không tạo được index unique
+            report["errors"].append({"name": model.document["name"], "error": str(e)})
+
+    expected_keys = {tuple(_key_of(model.document["key"].items())) for model in models}
+    for name, info in existing.items():
+        if name != "_id_" and tuple(_key_of(info["key"])) not in expected_keys:
+            report["extra"].append(name)
+
+    return report
+
+
+async def ensure_indexes(db) -> dict:
+    """Tạo index còn thiếu cho tất cả collection trong INDEXES và trả về báo cáo sai lệch."""
+    report = {}
+    for collection_name, models in INDEXES.items():
+        report[collection_name] = await ensure_collection_indexes(db[collection_name], models)
+
+    for collection_name, collection_report in report.items():
+        for name in collection_report["created"]:
+            print(f"[indexes] Đã tạo index {collection_name}.{name}")
+        for item in collection_report["mismatched"]:
+            print(f"[indexes] Index {collection_name}.{item['name']} khác cấu hình: mong đợi {item['expected']}, thực tế {item['actual']}")
+        for name in collection_report["extra"]:
+            print(f"[indexes] Index {collection_name}.{name} không có trong danh sách quản lý")
+        for item in collection_report["errors"]:
+            print(f"[indexes] Không tạo được index {collection_name}.{item['name']}: {item['error']}")
+    return report
+
+
+if __name__ == "__main__":
+    from app.database.database import get_db, run_script
+    asyncio.run(run_script(lambda: ensure_indexes(get_db())))
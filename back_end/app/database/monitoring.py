@@ -0,0 +1,284 @@
+# app/database/monitoring.py
+"""
+Giám sát lệnh MongoDB (pymongo CommandListener) được đăng ký trên client trong app/database/database.py.
+
+- Mỗi lệnh được gom theo (route gọi, lệnh, collection, dấu vân tay): dấu vân tay là hình dạng
+  của filter / pipeline sau khi bỏ mọi giá trị, nên cùng một truy vấn với tham số khác nhau được cộng chung.
+- Lệnh chậm hơn SLOW_COMMAND_MS được in ra log cùng kế hoạch thực thi (`explain`, chạy nền,
+  tối đa một lần mỗi EXPLAIN_INTERVAL_SECONDS cho mỗi dấu vân tay).
+- `command_stats(top, sort_by)` và `slow_commands()` phục vụ endpoint admin /api/v2/admin/db-stats.
+- `pool_monitor` (ConnectionPoolListener) ghi số liệu pool kết nối vào /metrics: thời gian chờ lấy kết nối,
+  số lần lấy kết nối thất bại (ví dụ hết waitQueueTimeoutMS), số kết nối đang mở / đang dùng.
+
+Số liệu nằm trong bộ nhớ của từng worker.
+"""
+import asyncio
+import json
+import os
+import time
+from collections import deque
+
+from pymongo import monitoring
+
+from app.utils.metrics import REGISTRY, Counter, Gauge, Histogram, current_route
+
+SLOW_COMMAND_MS = float(os.getenv("SLOW_COMMAND_MS", "200"))
+SLOW_COMMAND_EXPLAIN = os.getenv("SLOW_COMMAND_EXPLAIN", "true").lower() == "true"
+EXPLAIN_INTERVAL_SECONDS = 60
+# Giới hạn số nhóm thống kê; vượt quá thì cộng vào nhóm "other"
+MAX_FINGERPRINTS = 2000
+SLOW_LOG_SIZE = 50
+
+# Lệnh nội bộ của driver / xác thực, không đáng theo dõi
+IGNORED_COMMANDS = frozenset({
+    "hello", "ismaster", "isMaster", "ping", "buildInfo", "endSessions", "saslStart", "saslContinue",
+    "getnonce", "authenticate", "explain", "killCursors",
+})
+# Phần của lệnh tạo nên hình dạng truy vấn
+SHAPE_FIELDS = {
+    "find": ("filter", "sort", "projection"),
+    "aggregate": ("pipeline",),
+    "count": ("query",),
+    "distinct": ("key", "query"),
+    "findAndModify": ("query", "sort", "update"),
+    "update": ("updates",),
+    "delete": ("deletes",),
+}
+EXPLAINABLE_COMMANDS = ("find", "aggregate", "count", "distinct")
+# Khóa do driver thêm vào lệnh, phải bỏ trước khi gửi lại trong explain
+_DRIVER_FIELDS = ("lsid", "$clusterTime", "$db", "$readPreference", "txnNumber", "autocommit", "startTransaction")
+
+
+def _shape(value):
+    """Giữ cấu trúc (khóa, toán tử), thay mọi giá trị bằng "?"; danh sách chỉ giữ phần tử đầu."""
+    if isinstance(value, dict):
+        return {key: _shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_shape(value[0])] if value else []
+    return "?"
+
+
+def fingerprint(command_name: str, command: dict) -> str:
+    shape = {field: _shape(command[field]) for field in SHAPE_FIELDS.get(command_name, ()) if field in command}
+    # `updates` / `deletes` chứa cả giá trị cập nhật; chỉ giữ điều kiện lọc `q`
+    for field in ("updates", "deletes"):
+        if shape.get(field):
+            shape[field] = [{"q": shape[field][0].get("q")}]
+    return json.dumps(shape, separators=(",", ":"), ensure_ascii=False)
+
+
+class _Stat:
+    __slots__ = ("count", "failures", "total_ms", "max_ms")
+
+    def __init__(self):
+        self.count = self.failures = 0
+        self.total_ms = self.max_ms = 0.0
+
+
+class CommandMonitor(monitoring.CommandListener):
+    def __init__(self):
+        self._pending = {}
+        self._stats = {}
+        self._slow = deque(maxlen=SLOW_LOG_SIZE)
+        self._last_explain = {}
+        # Giữ tham chiếu tới các task explain đang chạy để chúng không bị garbage collector thu hồi giữa chừng
+        self._tasks = set()
+        self._db = None
+
+    def bind(self, db):
+        """Database dùng để chạy explain cho lệnh chậm."""
+        self._db = db
+
+    # --- CommandListener ---
+    def started(self, event):
+        if event.command_name in IGNORED_COMMANDS:
+            return
+        command = event.command
+        collection = command.get(event.command_name)
+        key = (
+            current_route() or "background",
+            event.command_name,
+            collection if isinstance(collection, str) else None,
+            fingerprint(event.command_name, command),
+        )
+        explain_source = command if event.command_name in EXPLAINABLE_COMMANDS else None
+        self._pending[(event.connection_id, event.request_id)] = (key, explain_source)
+
+    def succeeded(self, event):
+        self._finish(event, failed=False)
+
+    def failed(self, event):
+        self._finish(event, failed=True)
+
+    def _finish(self, event, failed: bool):
+        pending = self._pending.pop((event.connection_id, event.request_id), None)
+        if pending is None:
+            return
+        key, explain_source = pending
+        duration_ms = event.duration_micros / 1000
+        stat = self._stats.get(key)
+        if stat is None:
+            if len(self._stats) >= MAX_FINGERPRINTS:
+                key = ("other", key[1], None, "")
+                stat = self._stats.setdefault(key, _Stat())
+            else:
+                stat = self._stats[key] = _Stat()
+        stat.count += 1
+        stat.failures += failed
+        stat.total_ms += duration_ms
+        stat.max_ms = max(stat.max_ms, duration_ms)
+        if duration_ms >= SLOW_COMMAND_MS:
+            self._record_slow(key, duration_ms, event.database_name, explain_source)
+
+    # --- Lệnh chậm ---
+    def _record_slow(self, key, duration_ms: float, database_name: str, explain_source):
+        route, command_name, collection, shape = key
+        entry = {
+            "at": time.time(),
+            "route": route,
+            "command": command_name,
+            "collection": collection,
+            "fingerprint": shape,
+            "durationMs": round(duration_ms, 2),
+            "plan": None,
+        }
+        self._slow.append(entry)
+        print(f"[mongo] Lệnh chậm {duration_ms:.0f}ms: {command_name} {collection} route={route} {shape}")
+
+        now = time.monotonic()
+        if (
+            SLOW_COMMAND_EXPLAIN and explain_source is not None and self._db is not None
+            and now - self._last_explain.get(key, 0) > EXPLAIN_INTERVAL_SECONDS
+        ):
+            self._last_explain[key] = now
+            command = {k: v for k, v in explain_source.items() if k not in _DRIVER_FIELDS}
+            try:
+                task = asyncio.get_running_loop().create_task(self._explain(entry, command))
+            except RuntimeError:
+                return  # không có event loop (ví dụ client đồng bộ trong script)
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _explain(self, entry: dict, command: dict):
+        try:
+            result = await self._db.command({"explain": command, "verbosity": "queryPlanner"})
+            entry["plan"] = summarize_plan(result)
+            print(f"[mongo] Kế hoạch cho {entry['command']} {entry['collection']}: {entry['plan']}")
+        except Exception as e:
+            entry["plan"] = f"explain lỗi: {e}"
+
+    # --- Đọc số liệu ---
+    def command_stats(self, top: int = 20, sort_by: str = "totalMs") -> list:
+        rows = [
+            {
+                "route": route,
+                "command": command_name,
+                "collection": collection,
+                "fingerprint": shape,
+                "count": stat.count,
+                "failures": stat.failures,
+                "totalMs": round(stat.total_ms, 2),
+                "avgMs": round(stat.total_ms / stat.count, 2) if stat.count else 0,
+                "maxMs": round(stat.max_ms, 2),
+            }
+            for (route, command_name, collection, shape), stat in list(self._stats.items())
+        ]
+        rows.sort(key=lambda row: row[sort_by], reverse=True)
+        return rows[:top]
+
+    def slow_commands(self) -> list:
+        return list(reversed(self._slow))
+
+    def reset(self):
+        self._stats.clear()
+        self._slow.clear()
+
+
+def summarize_plan(explain_result: dict) -> str:
+    """Rút gọn winningPlan thành chuỗi các stage, ví dụ "LIMIT <- FETCH <- IXSCAN(updated_at_id)"."""
+    planner = explain_result.get("queryPlanner")
+    if planner is None:
+        # aggregate: kế hoạch nằm trong stage $cursor đầu tiên
+        for stage in explain_result.get("stages", []):
+            if "$cursor" in stage:
+                planner = stage["$cursor"].get("queryPlanner")
+                break
+    plan = (planner or {}).get("winningPlan", {})
+    plan = plan.get("queryPlan", plan)  # định dạng của slot-based engine
+    stages = []
+    while plan:
+        name = plan.get("stage", "?")
+        if plan.get("indexName"):
+            name += f"({plan['indexName']})"
+        stages.append(name)
+        plan = plan.get("inputStage") or (plan.get("inputStages") or [None])[0]
+    return " <- ".join(stages) or "không rõ"
+
+
+command_monitor = CommandMonitor()
+
+
+# --- Pool kết nối ---
+CHECKOUT_WAIT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+POOL_CHECKOUT_WAIT = Histogram(
+    "mongo_pool_checkout_wait_seconds", "Thời gian chờ lấy kết nối từ pool MongoDB (giây).", ("address",), CHECKOUT_WAIT_BUCKETS
+)
+POOL_CHECKOUT_FAILURES = Counter(
+    "mongo_pool_checkout_failures_total", "Số lần lấy kết nối MongoDB thất bại.", ("address", "reason")
+)
+POOL_CONNECTIONS = Gauge("mongo_pool_connections", "Số kết nối MongoDB đang mở.", ("address",))
+POOL_CHECKED_OUT = Gauge("mongo_pool_checked_out_connections", "Số kết nối MongoDB đang được dùng.", ("address",))
+POOL_CLEARED = Counter("mongo_pool_cleared_total", "Số lần pool MongoDB bị xóa (lỗi mạng, đổi primary...).", ("address",))
+
+REGISTRY.extend([POOL_CHECKOUT_WAIT, POOL_CHECKOUT_FAILURES, POOL_CONNECTIONS, POOL_CHECKED_OUT, POOL_CLEARED])
+
+
+def _address(event) -> str:
+    host, port = event.address
+    return f"{host}:{port}"
+
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        POOL_CLEARED.inc((_address(event),))
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        POOL_CONNECTIONS.inc((_address(event),))
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        POOL_CONNECTIONS.dec((_address(event),))
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        address = _address(event)
+        POOL_CHECKOUT_FAILURES.inc((address, event.reason))
+        if event.duration is not None:
+            POOL_CHECKOUT_WAIT.observe((address,), event.duration)
+
+    def connection_checked_out(self, event):
+        address = _address(event)
+        POOL_CHECKED_OUT.inc((address,))
+        # `duration`: từ lúc bắt đầu chờ đến khi nhận được kết nối (kể cả thời gian mở kết nối mới)
+        if event.duration is not None:
+            POOL_CHECKOUT_WAIT.observe((address,), event.duration)
+
+    def connection_checked_in(self, event):
+        POOL_CHECKED_OUT.dec((_address(event),))
+
+
+pool_monitor = PoolMonitor()
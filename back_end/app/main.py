@@ -1,9 +1,37 @@
-from fastapi import FastAPI
+import hmac
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, HTTPException
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+from app.database.database import connect, close
+from app.database.indexes import ensure_indexes
+from app.utils.catalog_cache import load_catalog
+from app.utils.auth import password_pool
+from app.utils.image_processing import image_pool
+from app.utils.mail_worker import outbox_worker
+from app.utils.metrics import MetricsMiddleware, render_metrics
+from app.core.config import METRICS_TOKEN
 from app.api.api_v1.endpoints import user, file, school, application
 from app.api.api_v2.endpoints import admin, admin_application, admin_statistic, school_management
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Tạo client MongoDB và mở sẵn kết nối trước khi nhận request
+    db = await connect()
+    # Tạo / kiểm tra index trước khi nhận request
+    await ensure_indexes(db)
+    # Nạp sẵn danh mục trường / ngành / tổ hợp môn vào bộ nhớ
+    await load_catalog()
+    # Worker nền gửi email từ hàng đợi email_outbox
+    outbox_worker.start()
+    yield
+    await outbox_worker.stop()
+    password_pool.shutdown()
+    image_pool.shutdown()
+    await close()
+
+# orjson nhanh hơn nhiều so với json chuẩn khi trả danh sách / chi tiết hồ sơ lớn
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -13,6 +41,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Số liệu request theo route (app/utils/metrics.py); thêm sau CORS để đo cả thời gian của CORSMiddleware
+app.add_middleware(MetricsMiddleware)
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    """Số liệu HTTP của worker hiện tại ở định dạng text của Prometheus."""
+    if METRICS_TOKEN and not hmac.compare_digest(request.headers.get("authorization", ""), f"Bearer {METRICS_TOKEN}"):
+        raise HTTPException(status_code=401, detail="Không có quyền truy cập")
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 app.include_router(user.router, prefix="/api/v1/auth", tags=["auth"])
 app.include_router(application.router, prefix="/api/v1/application", tags=["application"])
 app.include_router(file.router, prefix="/api/v1/file", tags=["file"])
@@ -20,7 +58,7 @@ app.include_router(school.router, prefix="/api/v1", tags=["school"])
 app.include_router(admin_application.router, prefix="/api/v2/application", tags=["admin_application"])
 app.include_router(admin_statistic.router, prefix="/api/v2/statistic", tags=["admin_statistic"])
 app.include_router(school_management.router, prefix="/api/v2/schools", tags=["school_management"])
+app.include_router(admin.router, prefix="/api/v2/admin", tags=["admin"])
 
-# Serve file static
-from fastapi.staticfiles import StaticFiles
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+# Thư mục uploads không được mount công khai: tệp đính kèm chỉ tải được qua URL có chữ ký
+# GET /api/v1/file/download/... (app/utils/file_access.py)
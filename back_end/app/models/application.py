@@ -47,7 +47,8 @@ class ApplicationDBModel(BaseModel):
     subjectGroup: str
     totalScore: float
     
-    # Các trường tài liệu (đã được chuyển thành chuỗi base64)
+    # Các trường tài liệu: tham chiếu tới blob store (/uploads/blobs/...)
+    # Hồ sơ cũ có thể vẫn chứa chuỗi base64 cho tới khi chạy app.scripts.migrate_attachments
     cccdFront: str
     cccdBack: str
     transcript: List[str]
@@ -61,10 +61,12 @@ class ApplicationListItemSchema(BaseModel):
         populate_by_name = True
         
 class PaginationData(BaseModel):
-    current_page: int = Field(..., alias="currentPage")
-    total_pages: int = Field(..., alias="totalPages")
-    total_records: int = Field(..., alias="totalRecords")
+    # Ở chế độ con trỏ không có currentPage; totalPages/totalRecords chỉ có khi yêu cầu withTotal
+    current_page: Optional[int] = Field(None, alias="currentPage")
+    total_pages: Optional[int] = Field(None, alias="totalPages")
+    total_records: Optional[int] = Field(None, alias="totalRecords")
     limit: int
+    next_cursor: Optional[str] = Field(None, alias="nextCursor")
 
 class PaginatedApplicationResponse(BaseModel):
     pagination: PaginationData
@@ -78,6 +80,50 @@ class ApplicationDetailSchema(ApplicationSchema):
     school_name: Optional[str] = Field(None, alias="schoolName")
     major_name: Optional[str] = Field(None, alias="majorName")
     status: StatusDetailSchema
+    # Chỉ có ở API admin: ảnh thumb của các tệp đính kèm (cùng cấu trúc với các trường đính kèm),
+    # để hiển thị ảnh thu nhỏ trước và chỉ tải ảnh lớn khi người duyệt mở
+    thumbnails: Optional[dict] = None
 
 class StatusUpdateRequest(BaseModel):
-    status: ApplicationStatus
\ No newline at end of file
+    status: ApplicationStatus
+
+# --- SCHEMAS CHO API CẬP NHẬT TRẠNG THÁI HÀNG LOẠT ---
+
+# Số hồ sơ tối đa được đổi trạng thái trong một request
+BULK_STATUS_MAX_ITEMS = 5000
+
+class BulkStatusFilter(BaseModel):
+    school_code: Optional[str] = Field(None, alias="schoolCode")
+    major_code: Optional[str] = Field(None, alias="majorCode")
+    subject_group: Optional[str] = Field(None, alias="subjectGroup")
+    status: Optional[ApplicationStatus] = None # Trạng thái hiện tại của các hồ sơ cần đổi
+
+    class Config:
+        populate_by_name = True
+
+class BulkStatusUpdateRequest(BaseModel):
+    # Chọn hồ sơ theo danh sách mã hoặc theo bộ lọc (chỉ dùng một trong hai)
+    application_codes: Optional[List[str]] = Field(None, alias="applicationCodes", max_length=BULK_STATUS_MAX_ITEMS)
+    filter: Optional[BulkStatusFilter] = None
+    status: ApplicationStatus
+
+    class Config:
+        populate_by_name = True
+
+class BulkStatusItemResult(BaseModel):
+    application_code: str = Field(..., alias="applicationCode")
+    result: str # UPDATED, UNCHANGED, NOT_FOUND, FAILED, CONFLICT
+
+    class Config:
+        populate_by_name = True
+
+class BulkStatusUpdateResponse(BaseModel):
+    updated: int
+    unchanged: int
+    not_found: int = Field(..., alias="notFound")
+    failed: int
+    conflict: int = 0 # Hồ sơ bị đổi trạng thái đồng thời, không được cập nhật
+    results: List[BulkStatusItemResult]
+
+    class Config:
+        populate_by_name = True
\ No newline at end of file
@@ -0,0 +1,26 @@
+# app/schemas/attachment_schema.py
+from pydantic import BaseModel, Field
+
+# --- SCHEMAS CHO API TẢI TỆP THEO TỪNG PHẦN (CHUNKED UPLOAD) ---
+
+class UploadInitRequest(BaseModel):
+    filename: str
+    content_type: str = Field(..., alias="contentType")
+    total_size: int = Field(..., alias="totalSize", gt=0)
+
+    class Config:
+        populate_by_name = True
+
+class UploadStatusResponse(BaseModel):
+    upload_id: str = Field(..., alias="uploadId")
+    offset: int
+    total_size: int = Field(..., alias="totalSize")
+    chunk_size: int = Field(..., alias="chunkSize")
+
+    class Config:
+        populate_by_name = True
+
+class UploadCompleteResponse(BaseModel):
+    file_url: str
+    sha256: str
+    size: int
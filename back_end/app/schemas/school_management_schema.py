@@ -21,6 +21,28 @@ class SchoolUpdateSchema(BaseModel):
     name: Optional[str] = None
     majors: Optional[List[MajorSchema]] = None
 
+# Model cho một tổ hợp môn trong tệp nhập danh mục
+class SubjectCombinationImportSchema(BaseModel):
+    code: str
+    name: str
+    subjects: List[str] = []
+
+# Báo cáo của API nhập danh mục hàng loạt
+class CatalogImportChange(BaseModel):
+    code: str
+    changes: List[str]
+
+class CatalogImportSection(BaseModel):
+    inserted: List[str]
+    updated: List[CatalogImportChange]
+    unchanged: int
+    deleted: List[str]
+
+class CatalogImportReport(BaseModel):
+    dry_run: bool = Field(..., alias="dryRun")
+    schools: CatalogImportSection
+    subject_combinations: CatalogImportSection = Field(..., alias="subjectCombinations")
+
 # --- SCHEMAS CHO API RESPONSE (GET) ---
 
 # Model cho thông tin chi tiết của một tổ hợp môn
@@ -0,0 +1,28 @@
+# app/scripts/backfill_application_names.py
+"""
+Ghi schoolName / majorName vào các hồ sơ đã nộp trước khi hai trường này được lưu kèm.
+Có thể chạy lại nhiều lần: chỉ những hồ sơ còn thiếu hoặc sai tên mới được cập nhật.
+
+Chạy từ thư mục back_end:
+    python -m app.scripts.backfill_application_names
+"""
+import asyncio
+import time
+
+from app.crud.application_crud import sync_school_names
+from app.crud.school_crud import find_schools
+from app.database.database import run_script
+
+
+async def backfill():
+    started = time.perf_counter()
+    total = 0
+    for school in await find_schools({}, {"_id": 0, "code": 1, "name": 1, "majors": 1}):
+        updated = await sync_school_names(school["code"], school.get("name"), school.get("majors"))
+        total += updated
+        print(f"{school['code']}: cập nhật {updated} hồ sơ")
+    print(f"Hoàn tất: cập nhật {total} hồ sơ trong {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(run_script(backfill))
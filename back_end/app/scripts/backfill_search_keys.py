@@ -0,0 +1,23 @@
+# app/scripts/backfill_search_keys.py
+"""
+Ghi `searchKeys` (khóa tìm kiếm không dấu) cho các hồ sơ đã nộp trước khi trường này được lưu kèm.
+Có thể chạy lại nhiều lần: chỉ những hồ sơ còn thiếu `searchKeys` mới được cập nhật.
+
+Chạy từ thư mục back_end:
+    python -m app.scripts.backfill_search_keys
+"""
+import asyncio
+import time
+
+from app.crud.application_crud import backfill_search_keys
+from app.database.database import run_script
+
+
+async def backfill():
+    started = time.perf_counter()
+    updated = await backfill_search_keys()
+    print(f"Hoàn tất: cập nhật {updated} hồ sơ trong {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(run_script(backfill))
@@ -0,0 +1,50 @@
+# app/scripts/bench_utils.py
+"""Phần dùng chung của các script app/scripts/benchmark_*: đo thời gian một case, in bảng kết quả, database tạm."""
+import statistics
+import time
+from contextlib import asynccontextmanager
+
+from pymongo import AsyncMongoClient
+
+from app.core.config import MONGO_URI
+
+
+async def measure(fn, warmup: int = 3, repeat: int = 20) -> dict:
+    """
+    Chạy `fn` (coroutine function) `warmup` lần không tính rồi `repeat` lần có đo, trả về p50 / p95 / trung bình (ms).
+    Nếu `fn` trả về số đơn vị công việc (lượt đăng nhập, dòng xuất...) thì báo thêm thông lượng `per_sec`.
+    """
+    for _ in range(warmup):
+        await fn()
+    timings, units = [], 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        done = await fn()
+        timings.append((time.perf_counter() - started) * 1000)
+        units += done or 0
+    result = {
+        "p50_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(sorted(timings)[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+        "mean_ms": round(statistics.fmean(timings), 3),
+    }
+    if units:
+        result["per_sec"] = round(units / (sum(timings) / 1000), 1)
+    return result
+
+
+def print_results(results: dict):
+    print(f"{'case':32} {'p50 ms':>10} {'p95 ms':>10} {'mean ms':>10} {'per s':>10}")
+    for name, result in results.items():
+        print(f"{name:32} {result['p50_ms']:>10.2f} {result['p95_ms']:>10.2f} {result['mean_ms']:>10.2f} {result.get('per_sec', ''):>10}")
+
+
+@asynccontextmanager
+async def scratch_db(name: str):
+    """Database riêng cho dữ liệu sinh ra trong benchmark (cùng MONGO_URI), bị xóa khi kết thúc."""
+    client = AsyncMongoClient(MONGO_URI)
+    try:
+        await client.drop_database(name)
+        yield client[name]
+    finally:
+        await client.drop_database(name)
+        await client.close()
@@ -0,0 +1,183 @@
+# app/scripts/benchmark.py
+"""
+Đo thời gian các truy vấn mà từng endpoint danh sách / chi tiết / thống kê thực hiện,
+trên dữ liệu sinh bởi app/scripts/seed_data.py, và so sánh với một baseline JSON.
+
+    MONGO_URI=mongodb://localhost:27017 MONGO_DB_NAME=admission_portal_bench \
+        python -m app.scripts.benchmark --baseline bench_baseline.json
+
+- Lần đầu (chưa có baseline) hoặc khi thêm --save-baseline: ghi kết quả làm baseline mới.
+- Các lần sau: case nào có p50 chậm hơn baseline quá --threshold (mặc định 20%) bị đánh dấu REGRESSION
+  và script thoát với mã 1 (dùng được trong CI).
+Chỉ so sánh các kết quả đo trên cùng máy và cùng kích thước dữ liệu.
+
+Các so sánh trước / sau của từng tối ưu (tìm kiếm, đổi trạng thái, đăng nhập, tuần tự hóa, xuất dữ liệu...)
+nằm trong các script app/scripts/benchmark_*.py, chạy trên database tạm riêng.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+from datetime import datetime, timedelta
+
+from app.crud.application_crud import (
+    count_applications, get_application_detail, iter_applications,
+    list_applications_by_cursor, list_applications_by_page,
+)
+from app.crud.application_query import EXPORT_COLUMNS, build_application_filter, projection_for
+from app.crud.statistics_crud import find_statistic_buckets
+from app.database.database import get_db, run_script
+from app.scripts.bench_utils import measure
+from app.utils.pagination import decode_cursor
+
+# Bỏ qua chênh lệch nhỏ hơn mức này (ms) để tránh báo nhầm do nhiễu
+MIN_REGRESSION_MS = 2.0
+
+
+async def _sample_inputs(rng: random.Random) -> dict:
+    db = get_db()
+    total = await db.applications.estimated_document_count()
+    if not total:
+        sys.exit("Database chưa có hồ sơ. Chạy app.scripts.seed_data trước.")
+    sample = await (await db.applications.aggregate([
+        {"$sample": {"size": 50}},
+        {"$project": {"userId": 1, "applicationCode": 1, "fullname": 1, "school": 1}},
+    ])).to_list(None)
+    return {"total": total, "sample": sample, "rng": rng}
+
+
+def _cases(inputs: dict) -> dict:
+    rng, sample = inputs["rng"], inputs["sample"]
+    pick = lambda: rng.choice(sample)
+    today = datetime.utcnow()
+    last_week = (today - timedelta(days=7)).strftime("%Y-%m-%d")
+    deep_page = max(1, min(500, inputs["total"] // 10 // 2))
+
+    async def user_list():
+        # GET /api/v1/application/applications
+        await list_applications_by_page(build_application_filter(user_id=pick()["userId"]), 1, 10)
+
+    async def admin_list_first_page():
+        # GET /api/v2/application/
+        await list_applications_by_page(build_application_filter(), 1, 10)
+
+    async def admin_list_deep_page():
+        await list_applications_by_page(build_application_filter(), deep_page, 10)
+
+    async def admin_list_cursor_100():
+        # GET /api/v2/application/?cursor=... qua 5 trang 100 dòng
+        match, after = build_application_filter(), None
+        for _ in range(5):
+            _, next_cursor = await list_applications_by_cursor(match, after, 100)
+            if not next_cursor:
+                break
+            after = decode_cursor(next_cursor)
+
+    async def admin_filter_school_status():
+        await list_applications_by_page(build_application_filter(school_code=pick()["school"], status="PENDING"), 1, 10)
+
+    async def admin_search_name():
+        await list_applications_by_page(build_application_filter(search=" ".join(pick()["fullname"].split()[-2:])), 1, 10)
+
+    async def admin_search_code():
+        await list_applications_by_page(build_application_filter(search=pick()["applicationCode"][:7]), 1, 10)
+
+    async def admin_count_date_range():
+        await count_applications(build_application_filter(date_from=last_week))
+
+    async def application_detail():
+        # GET /api/v2/application/{code}
+        await get_application_detail({"applicationCode": pick()["applicationCode"]})
+
+    async def statistics_overview():
+        # GET /api/v2/statistic/overview
+        await find_statistic_buckets(None, None)
+
+    async def statistics_overview_last_week():
+        await find_statistic_buckets(last_week, today.strftime("%Y-%m-%d"))
+
+    async def export_school():
+        # GET /api/v2/application/export?schoolCode=...
+        async for _ in iter_applications(build_application_filter(school_code=pick()["school"]), projection_for(*EXPORT_COLUMNS, include_id=False)):
+            pass
+
+    return {fn.__name__: fn for fn in (
+        user_list, admin_list_first_page, admin_list_deep_page, admin_list_cursor_100,
+        admin_filter_school_status, admin_search_name, admin_search_code, admin_count_date_range,
+        application_detail, statistics_overview, statistics_overview_last_week, export_school,
+    )}
+
+
+def _compare(results: dict, baseline: dict, threshold: float) -> list:
+    regressions = []
+    for name, result in results["cases"].items():
+        previous = baseline.get("cases", {}).get(name)
+        if not previous:
+            continue
+        delta = result["p50_ms"] - previous["p50_ms"]
+        if delta > MIN_REGRESSION_MS and result["p50_ms"] > previous["p50_ms"] * (1 + threshold):
+            regressions.append(name)
+        result["baseline_p50_ms"] = previous["p50_ms"]
+        result["change_pct"] = round(100 * delta / previous["p50_ms"], 1) if previous["p50_ms"] else None
+    return regressions
+
+
+async def main(args):
+    db = get_db()
+    inputs = await _sample_inputs(random.Random(args.seed))
+    cases = _cases(inputs)
+    selected = args.cases.split(",") if args.cases else list(cases)
+
+    results = {
+        "meta": {
+            "applications": inputs["total"],
+            "database": db.name,
+            "server_version": (await db.client.server_info()).get("version"),
+            "python": platform.python_version(),
+            "run_at": datetime.utcnow().isoformat(),
+            "repeat": args.repeat,
+        },
+        "cases": {},
+    }
+    for name in selected:
+        results["cases"][name] = await measure(cases[name], args.warmup, args.repeat)
+
+    baseline = None
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("meta", {}).get("applications") != inputs["total"]:
+            print(f"Cảnh báo: baseline đo trên {baseline['meta'].get('applications')} hồ sơ, hiện có {inputs['total']}")
+    regressions = _compare(results, baseline, args.threshold) if baseline else []
+
+    print(f"{'case':32} {'p50 ms':>10} {'p95 ms':>10} {'baseline':>10} {'change':>8}")
+    for name, result in results["cases"].items():
+        change = f"{result['change_pct']:+.1f}%" if result.get("change_pct") is not None else ""
+        flag = "  REGRESSION" if name in regressions else ""
+        print(f"{name:32} {result['p50_ms']:>10.2f} {result['p95_ms']:>10.2f} {result.get('baseline_p50_ms', ''):>10} {change:>8}{flag}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    if baseline is None:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"Đã ghi baseline vào {args.baseline}")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark truy vấn của các endpoint hồ sơ / thống kê")
+    parser.add_argument("--baseline", default="bench_baseline.json", help="Tệp baseline JSON")
+    parser.add_argument("--save-baseline", action="store_true", help="Ghi đè baseline bằng kết quả lần này")
+    parser.add_argument("--output", help="Ghi kết quả lần này ra tệp JSON")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Ngưỡng chậm đi tính là regression (0.2 = 20%%)")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--cases", help="Chỉ chạy các case này (cách nhau bởi dấu phẩy)")
+    parser.add_argument("--seed", type=int, default=7)
+    asyncio.run(run_script(main, parser.parse_args()))
@@ -0,0 +1,99 @@
+"""
+Đo thông lượng xuất dữ liệu (GET /api/v2/application/export): số dòng mỗi giây và bộ nhớ đỉnh khi
+tạo các khối CSV / NDJSON từ một luồng document. Document được sinh trong bộ nhớ theo từng dòng
+(không cần MongoDB), nên bộ nhớ đỉnh chỉ gồm phần tạo khối và không được tăng theo số dòng.
+
+Chạy từ thư mục back_end:
+    python -m app.scripts.benchmark_export --rows 100000
+"""
+import argparse
+import asyncio
+import random
+import tracemalloc
+from datetime import datetime, timedelta
+
+from app.crud.application_query import EXPORT_COLUMNS
+from app.scripts.bench_utils import measure, print_results
+from app.utils.export import csv_chunks, ndjson_chunks
+
+
+async def _documents(count: int, seed: int):
+    # Cùng các cột với EXPORT_COLUMNS, như iter_applications trả về từng lô
+    rng = random.Random(seed)
+    created_at = datetime(2026, 1, 1)
+    for i in range(count):
+        yield {
+            "applicationCode": f"HS-{i + 1:07d}",
+            "fullname": f"Nguyễn Văn {i}",
+            "gender": "Nam",
+            "dob": "2008-01-01",
+            "idNumber": f"001208{i:06d}",
+            "province": "Hà Nội",
+            "district": "Ba Đình",
+            "ward": "Điện Biên",
+            "addressDetail": f"{i} Điện Biên Phủ",
+            "school": "S001",
+            "schoolName": "Trường Đại học số 1",
+            "major": "M01",
+            "majorName": "Ngành 1 - Trường 1",
+            "subjectGroup": "A00",
+            "mathScore": round(rng.uniform(0, 10), 2),
+            "literatureScore": round(rng.uniform(0, 10), 2),
+            "englishScore": round(rng.uniform(0, 10), 2),
+            "physicsScore": round(rng.uniform(0, 10), 2),
+            "chemistryScore": round(rng.uniform(0, 10), 2),
+            "totalScore": round(rng.uniform(0, 30), 2),
+            "status": "PENDING",
+            "created_at": created_at + timedelta(minutes=i),
+            "updated_at": created_at + timedelta(minutes=i),
+        }
+
+
+def _cases(rows: int, seed: int) -> dict:
+    columns = list(EXPORT_COLUMNS)
+
+    async def export(chunks) -> int:
+        # Tạo đủ các khối như khi stream, không giữ lại khối nào
+        async for _ in chunks(_documents(rows, seed), columns):
+            pass
+        return rows
+
+    async def export_csv():
+        return await export(csv_chunks)
+
+    async def export_ndjson():
+        return await export(ndjson_chunks)
+
+    return {fn.__name__: fn for fn in (export_csv, export_ndjson)}
+
+
+async def _peak_kb(fn) -> float:
+    # Chạy riêng một lần: tracemalloc làm chậm đáng kể nên không tính vào thời gian
+    tracemalloc.start()
+    try:
+        await fn()
+        return round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+    finally:
+        tracemalloc.stop()
+
+
+async def main(args):
+    results, peaks = {}, {}
+    for name, fn in _cases(args.rows, args.seed).items():
+        results[name] = await measure(fn, args.warmup, args.repeat)
+        peaks[name] = await _peak_kb(fn)
+    print(f"Số dòng mỗi lần xuất: {args.rows}")
+    print_results(results)
+    print()
+    print(f"{'case':32} {'peak KB':>10}")
+    for name, peak in peaks.items():
+        print(f"{name:32} {peak:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark số dòng xuất CSV / NDJSON mỗi giây")
+    parser.add_argument("--rows", type=int, default=100000, help="Số dòng mỗi lần xuất")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=7)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,79 @@
+# app/scripts/benchmark_images.py
+"""
+Đo tốc độ chuẩn hóa ảnh (ảnh/giây) và dung lượng tiết kiệm được, không cần MongoDB.
+Dùng ảnh trong --source (jpg/png) hoặc tự sinh ảnh giống ảnh chụp điện thoại 12MP.
+Kết quả được ghi vào thư mục tạm, không đụng tới blob store thật.
+
+Chạy từ thư mục back_end:
+    python -m app.scripts.benchmark_images --count 24
+    python -m app.scripts.benchmark_images --source ~/samples
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+
+from PIL import Image, ImageFilter
+
+
+def _synthetic_photo(path: str, seed: int):
+    # Nhiễu làm mờ + gradient: nén JPEG khó gần giống ảnh chụp thật
+    noise = Image.effect_noise((4000, 3000), 40 + seed % 20).filter(ImageFilter.GaussianBlur(1))
+    gradient = Image.linear_gradient("L").resize((4000, 3000))
+    Image.merge("RGB", (noise, gradient, noise.transpose(Image.Transpose.FLIP_LEFT_RIGHT))).save(path, "JPEG", quality=95)
+
+
+async def main(args):
+    workdir = tempfile.mkdtemp(prefix="bench-images-")
+    # Blob store tạm: phải đặt UPLOAD_DIR trước khi import các module dùng nó
+    os.environ["UPLOAD_DIR"] = workdir
+    from app.utils.blob_store import save_blob, parse_blob_ref, blob_path
+    from app.utils.image_processing import image_pool, make_variants
+
+    try:
+        if args.source:
+            sources = [os.path.join(args.source, f) for f in sorted(os.listdir(args.source))
+                       if f.lower().endswith((".jpg", ".jpeg", ".png"))]
+        else:
+            sources = []
+            for i in range(args.count):
+                path = os.path.join(workdir, f"sample-{i}.jpg")
+                _synthetic_photo(path, i)
+                sources.append(path)
+
+        refs = []
+        for path in sources:
+            with open(path, "rb") as f:
+                data = f.read()
+            refs.append(save_blob(data, "image/png" if path.lower().endswith(".png") else "image/jpeg"))
+
+        jobs = []
+        for ref in refs:
+            digest, ext = parse_blob_ref(ref)
+            jobs.append((blob_path(digest, ext), digest))
+
+        # Khởi động tiến trình con trước khi đo
+        await asyncio.gather(*(image_pool.run(os.getpid) for _ in range(image_pool.max_workers)))
+        started = time.perf_counter()
+        results = await asyncio.gather(*(image_pool.run(make_variants, path, digest) for path, digest in jobs))
+        elapsed = time.perf_counter() - started
+
+        original = sum(r["original"] for r in results)
+        review = sum(r["review"] for r in results)
+        thumb = sum(r["thumb"] for r in results)
+        print(f"Ảnh: {len(results)}, tiến trình: {image_pool.max_workers}, thời gian: {elapsed:.2f}s "
+              f"({len(results) / elapsed:.1f} ảnh/giây)")
+        print(f"Gốc: {original / 1024 / 1024:.1f} MB, review: {review / 1024 / 1024:.1f} MB "
+              f"({100 * (1 - review / original):.0f}% nhỏ hơn), thumb: {thumb / 1024:.0f} KB")
+    finally:
+        image_pool.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark chuẩn hóa ảnh tải lên")
+    parser.add_argument("--source", help="Thư mục chứa ảnh mẫu (jpg/png)")
+    parser.add_argument("--count", type=int, default=16, help="Số ảnh tự sinh khi không có --source")
+    asyncio.run(main(parser.parse_args()))
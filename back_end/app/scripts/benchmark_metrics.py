@@ -0,0 +1,58 @@
+# app/scripts/benchmark_metrics.py
+"""
+Đo chi phí thêm vào mỗi request của MetricsMiddleware, không cần MongoDB.
+Gọi trực tiếp một ứng dụng ASGI tối giản có và không có middleware rồi so sánh thời gian.
+
+Chạy từ thư mục back_end:
+    python -m app.scripts.benchmark_metrics --requests 200000
+"""
+import argparse
+import asyncio
+import time
+
+from app.utils.metrics import MetricsMiddleware
+
+SCOPE = {"type": "http", "method": "GET", "path": "/api/v2/application/HS-0000001"}
+
+
+class _Route:
+    path = "/api/v2/application/{application_code}"
+
+
+async def _app(scope, receive, send):
+    scope["route"] = _Route
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def _receive():
+    return {"type": "http.request", "body": b""}
+
+
+async def _send(message):
+    pass
+
+
+async def _run(app, requests: int) -> float:
+    started = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(SCOPE), _receive, _send)
+    return time.perf_counter() - started
+
+
+async def main(requests: int):
+    wrapped = MetricsMiddleware(_app)
+    await _run(_app, 1000)
+    await _run(wrapped, 1000)
+    baseline = await _run(_app, requests)
+    measured = await _run(wrapped, requests)
+    overhead_us = (measured - baseline) / requests * 1e6
+    print(f"Không middleware: {baseline / requests * 1e6:.2f} µs/request")
+    print(f"Có MetricsMiddleware: {measured / requests * 1e6:.2f} µs/request")
+    print(f"Chi phí thêm: {overhead_us:.2f} µs/request")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark chi phí của MetricsMiddleware")
+    parser.add_argument("--requests", type=int, default=200_000)
+    asyncio.run(main(parser.parse_args().requests))
@@ -0,0 +1,130 @@
+# app/scripts/benchmark_names.py
+"""
+So sánh thời gian danh sách / chi tiết hồ sơ khi lấy tên trường, tên ngành bằng $lookup sang `schools`
+cho từng dòng (cách cũ) và khi đọc schoolName / majorName đã ghi sẵn trên hồ sơ.
+Dữ liệu được sinh vào database tạm --database (bị xóa khi xong), không đụng tới dữ liệu thật.
+
+Chạy từ thư mục back_end:
+    python -m app.scripts.benchmark_names --applications 100000
+"""
+import argparse
+import asyncio
+import random
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from app.crud.application_crud import LIST_SORT
+from app.crud.application_query import LIST_PROJECTION
+from app.database.indexes import ensure_indexes
+from app.scripts.bench_utils import measure, print_results, scratch_db
+
+SCHOOL_COUNT = 60
+MAJORS_PER_SCHOOL = 15
+INSERT_BATCH_SIZE = 5000
+
+# Cách lấy tên trường / tên ngành trước khi ghi sẵn vào hồ sơ: join `schools` cho từng dòng
+LEGACY_NAME_LOOKUP_STAGES = [
+    {"$lookup": {"from": "schools", "localField": "school", "foreignField": "code", "as": "schoolInfo"}},
+    {"$unwind": {"path": "$schoolInfo", "preserveNullAndEmptyArrays": True}},
+    {"$addFields": {
+        "schoolName": "$schoolInfo.name",
+        "majorDetails": {"$first": {"$filter": {"input": "$schoolInfo.majors", "as": "m", "cond": {"$eq": ["$$m.code", "$major"]}}}}
+    }},
+    {"$addFields": {"majorName": "$majorDetails.name"}},
+    {"$project": {"schoolInfo": 0, "majorDetails": 0}},
+]
+
+
+async def _seed(db, count: int, rng: random.Random):
+    schools = [
+        {
+            "code": f"S{i:03d}",
+            "name": f"Trường Đại học số {i}",
+            "majors": [{"code": f"M{j:02d}", "name": f"Ngành {j} - Trường {i}"} for j in range(MAJORS_PER_SCHOOL)],
+        }
+        for i in range(SCHOOL_COUNT)
+    ]
+    await db.schools.insert_many(schools)
+
+    now = datetime.utcnow()
+    for start in range(0, count, INSERT_BATCH_SIZE):
+        batch = []
+        for i in range(start, min(start + INSERT_BATCH_SIZE, count)):
+            school = rng.choice(schools)
+            major = rng.choice(school["majors"])
+            updated_at = now - timedelta(minutes=rng.randrange(60 * 24 * 90))
+            batch.append({
+                "applicationCode": f"HS-{i + 1:07d}",
+                "userId": ObjectId(),
+                "fullname": f"Thí sinh {i}",
+                "school": school["code"],
+                "schoolName": school["name"],
+                "major": major["code"],
+                "majorName": major["name"],
+                "status": "PENDING",
+                "cccdFront": f"/uploads/blobs/{i:064x}.jpg",
+                "transcript": [f"/uploads/blobs/{i + count:064x}.pdf"],
+                "created_at": updated_at,
+                "updated_at": updated_at,
+            })
+        await db.applications.insert_many(batch)
+        print(f"Đã sinh {start + len(batch)}/{count} hồ sơ")
+
+
+def _cases(db, count: int, limit: int, rng: random.Random) -> dict:
+    random_code = lambda: f"HS-{rng.randrange(count) + 1:07d}"
+
+    async def list_page_lookup():
+        # Trước khi ghi sẵn tên: $facet đếm tổng + một trang kèm $lookup cho từng dòng
+        cursor = await db.applications.aggregate([
+            {"$match": {}},
+            {"$sort": dict(LIST_SORT)},
+            {"$facet": {
+                "metadata": [{"$count": "totalRecords"}],
+                "data": [{"$skip": 0}, {"$limit": limit}, *LEGACY_NAME_LOOKUP_STAGES],
+            }},
+        ])
+        await cursor.to_list(None)
+
+    async def list_page():
+        # GET /api/v2/application/: find có projection theo index + count_documents chạy song song
+        cursor = db.applications.find({}, LIST_PROJECTION).sort(LIST_SORT).limit(limit)
+        await asyncio.gather(cursor.to_list(None), db.applications.count_documents({}))
+
+    async def detail_lookup():
+        cursor = await db.applications.aggregate([
+            {"$match": {"applicationCode": random_code()}},
+            {"$limit": 1},
+            *LEGACY_NAME_LOOKUP_STAGES,
+        ])
+        await cursor.to_list(None)
+
+    async def detail():
+        # GET /api/v2/application/{code}
+        await db.applications.find_one({"applicationCode": random_code()})
+
+    return {fn.__name__: fn for fn in (list_page_lookup, list_page, detail_lookup, detail)}
+
+
+async def main(args):
+    rng = random.Random(args.seed)
+    async with scratch_db(args.database) as db:
+        await ensure_indexes(db)
+        await _seed(db, args.applications, rng)
+        results = {}
+        for name, fn in _cases(db, args.applications, args.limit, rng).items():
+            results[name] = await measure(fn, args.warmup, args.repeat)
+    print(f"Hồ sơ: {args.applications}, số dòng mỗi trang: {args.limit}")
+    print_results(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark $lookup tên trường / ngành so với tên ghi sẵn trên hồ sơ")
+    parser.add_argument("--applications", type=int, default=100000, help="Số hồ sơ sinh ra")
+    parser.add_argument("--limit", type=int, default=10, help="Số dòng mỗi trang danh sách")
+    parser.add_argument("--database", default="admission_portal_bench_names", help="Database tạm (bị xóa khi xong)")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,60 @@
+# app/scripts/benchmark_password.py
+"""
+Đo số lượt kiểm tra mật khẩu (đăng nhập) mỗi giây trên một worker, không cần MongoDB:
+- bcrypt_inline: chạy ngay trên event loop, các lượt nối tiếp nhau
+- bcrypt_threadpool: cách làm trước khi có process pool (run_in_threadpool)
+- bcrypt_pool: password_pool như POST /api/auth/login hiện tại
+
+Chạy từ thư mục back_end:
+    python -m app.scripts.benchmark_password
+    PASSWORD_HASH_WORKERS=4 BCRYPT_ROUNDS=12 python -m app.scripts.benchmark_password
+"""
+import argparse
+import asyncio
+import os
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.scripts.bench_utils import measure, print_results
+from app.utils.auth import password_pool, verify_password_async
+from app.utils.password_hashing import BCRYPT_ROUNDS, hash_password, verify_and_update_password
+
+BENCH_PASSWORD = "benchmark-password"
+
+
+async def main(args):
+    password_hash = hash_password(BENCH_PASSWORD)
+    # Số lượt đăng nhập đồng thời trong một lần đo (không vượt giới hạn hàng đợi của pool)
+    burst = args.burst or min(password_pool.max_workers * 4, password_pool.max_pending)
+
+    async def bcrypt_inline():
+        for _ in range(burst):
+            verify_and_update_password(BENCH_PASSWORD, password_hash)
+        return burst
+
+    async def bcrypt_threadpool():
+        await asyncio.gather(*(run_in_threadpool(verify_and_update_password, BENCH_PASSWORD, password_hash) for _ in range(burst)))
+        return burst
+
+    async def bcrypt_pool():
+        await asyncio.gather(*(verify_password_async(BENCH_PASSWORD, password_hash) for _ in range(burst)))
+        return burst
+
+    # Khởi động tiến trình con trước khi đo
+    await asyncio.gather(*(password_pool.run(os.getpid) for _ in range(password_pool.max_workers)))
+    results = {}
+    for fn in (bcrypt_inline, bcrypt_threadpool, bcrypt_pool):
+        results[fn.__name__] = await measure(fn, args.warmup, args.repeat)
+    print(f"BCRYPT_ROUNDS={BCRYPT_ROUNDS}, tiến trình: {password_pool.max_workers}, lượt mỗi lần đo: {burst}")
+    print_results(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark số lượt đăng nhập mỗi giây: bcrypt inline / thread pool / process pool")
+    parser.add_argument("--burst", type=int, help="Số lượt đăng nhập đồng thời (mặc định 4 lượt mỗi tiến trình)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    try:
+        asyncio.run(main(parser.parse_args()))
+    finally:
+        password_pool.shutdown()
@@ -0,0 +1,105 @@
+"""
+So sánh tìm kiếm hồ sơ của admin (GET /api/v2/application/?search=...): `$regex` không neo trên
+applicationCode / fullname (cách cũ) và so khớp trên index searchKeys (app/utils/search.py).
+Dữ liệu được sinh vào database tạm --database (bị xóa khi xong), không đụng tới dữ liệu thật.
+
+Chạy từ thư mục back_end:
+    python -m app.scripts.benchmark_search --applications 200000
+"""
+import argparse
+import asyncio
+import random
+import re
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from app.crud.application_crud import LIST_SORT
+from app.crud.application_query import LIST_PROJECTION
+from app.database.indexes import ensure_indexes
+from app.scripts.bench_utils import measure, print_results, scratch_db
+from app.utils.search import build_search_keys, search_filter
+
+INSERT_BATCH_SIZE = 5000
+
+LAST_NAMES = ["Nguyễn", "Trần", "Lê", "Phạm", "Hoàng", "Huỳnh", "Phan", "Vũ", "Võ", "Đặng", "Bùi", "Đỗ"]
+MIDDLE_NAMES = ["Văn", "Thị", "Hữu", "Đức", "Minh", "Ngọc", "Thanh", "Quốc"]
+FIRST_NAMES = ["An", "Bình", "Chi", "Dũng", "Giang", "Hà", "Khánh", "Linh", "Nam", "Phương", "Quân", "Thảo", "Tú", "Vy"]
+
+
+async def _seed(db, count: int, rng: random.Random) -> list:
+    now = datetime.utcnow()
+    names = []
+    for start in range(0, count, INSERT_BATCH_SIZE):
+        batch = []
+        for i in range(start, min(start + INSERT_BATCH_SIZE, count)):
+            fullname = f"{rng.choice(LAST_NAMES)} {rng.choice(MIDDLE_NAMES)} {rng.choice(FIRST_NAMES)}"
+            updated_at = now - timedelta(minutes=rng.randrange(60 * 24 * 90))
+            application = {
+                "applicationCode": f"HS-{i + 1:07d}",
+                "userId": ObjectId(),
+                "fullname": fullname,
+                "status": "PENDING",
+                "created_at": updated_at,
+                "updated_at": updated_at,
+            }
+            application["searchKeys"] = build_search_keys(application)
+            batch.append(application)
+            names.append(fullname)
+        await db.applications.insert_many(batch)
+        print(f"Đã sinh {start + len(batch)}/{count} hồ sơ")
+    return names
+
+
+def _cases(db, count: int, names: list, limit: int, rng: random.Random) -> dict:
+    async def list_page(match_stage: dict):
+        # Trang đầu của danh sách admin: find có projection + count_documents chạy song song
+        cursor = db.applications.find(match_stage, LIST_PROJECTION).sort(LIST_SORT).limit(limit)
+        await asyncio.gather(cursor.to_list(None), db.applications.count_documents(match_stage))
+
+    def regex_filter(search: str) -> dict:
+        # Tìm kiếm cũ: $regex không neo, không dùng được index và phải gõ đúng dấu
+        return {"$or": [
+            {"applicationCode": {"$regex": search, "$options": "i"}},
+            {"fullname": {"$regex": search, "$options": "i"}},
+        ]}
+
+    pick_name = lambda: " ".join(rng.choice(names).split()[-2:])
+    pick_code = lambda: f"HS-{rng.randrange(count) + 1:07d}"[:7]
+
+    async def search_name_regex():
+        await list_page(regex_filter(re.escape(pick_name())))
+
+    async def search_name_keys():
+        await list_page(search_filter(pick_name()))
+
+    async def search_code_regex():
+        await list_page(regex_filter(re.escape(pick_code())))
+
+    async def search_code_keys():
+        await list_page(search_filter(pick_code()))
+
+    return {fn.__name__: fn for fn in (search_name_regex, search_name_keys, search_code_regex, search_code_keys)}
+
+
+async def main(args):
+    rng = random.Random(args.seed)
+    async with scratch_db(args.database) as db:
+        await ensure_indexes(db)
+        names = await _seed(db, args.applications, rng)
+        results = {}
+        for name, fn in _cases(db, args.applications, names, args.limit, rng).items():
+            results[name] = await measure(fn, args.warmup, args.repeat)
+    print(f"Hồ sơ: {args.applications}, số dòng mỗi trang: {args.limit}")
+    print_results(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark tìm kiếm $regex so với index searchKeys")
+    parser.add_argument("--applications", type=int, default=200000, help="Số hồ sơ sinh ra")
+    parser.add_argument("--limit", type=int, default=10, help="Số dòng mỗi trang danh sách")
+    parser.add_argument("--database", default="admission_portal_bench_search", help="Database tạm (bị xóa khi xong)")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    asyncio.run(main(parser.parse_args()))
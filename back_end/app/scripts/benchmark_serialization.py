@@ -0,0 +1,132 @@
+"""
+So sánh chi phí tuần tự hóa một trang danh sách và một hồ sơ chi tiết: đường cũ (model_validate từng dòng,
+FastAPI validate lại theo response_model rồi JSONResponse) và đường tắt (dump_trusted + ORJSONResponse).
+Chỉ đo tuần tự hóa trên dữ liệu sinh trong bộ nhớ, không cần MongoDB. Ngoài thời gian còn báo
+dung lượng cấp phát đỉnh (tracemalloc) của một lần chạy mỗi case.
+
+Chạy từ thư mục back_end:
+    python -m app.scripts.benchmark_serialization --page-size 100
+"""
+import argparse
+import asyncio
+import random
+import tracemalloc
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from app.schemas.application_schema import (
+    ApplicationDetailSchema, ApplicationListItemSchema, PaginatedApplicationResponse, PaginationData,
+)
+from app.scripts.bench_utils import measure, print_results
+from app.utils.blob_store import blob_url, map_attachments
+from app.utils.file_access import signed_url
+from app.utils.serialization import dump_trusted
+
+
+def _application(i: int, rng: random.Random) -> dict:
+    # Hồ sơ như trong DB: điểm có thể được lưu dưới dạng số nguyên
+    scores = {name: rng.choice([rng.randrange(11), round(rng.uniform(0, 10), 2)])
+              for name in ("mathScore", "literatureScore", "englishScore", "physicsScore", "chemistryScore")}
+    created_at = datetime(2026, 1, 1) + timedelta(minutes=i)
+    return {
+        "_id": ObjectId(),
+        "userId": ObjectId(),
+        "applicationCode": f"HS-{i + 1:07d}",
+        "fullname": f"Thí sinh {i}",
+        "gender": "Nam",
+        "dob": "2008-01-01",
+        "idNumber": f"001208{i:06d}",
+        "province": "Hà Nội",
+        "district": "Ba Đình",
+        "ward": "Điện Biên",
+        "addressDetail": f"{i} Điện Biên Phủ",
+        **scores,
+        "school": "S001",
+        "schoolName": "Trường Đại học số 1",
+        "major": "M01",
+        "majorName": "Ngành 1 - Trường 1",
+        "subjectGroup": "A00",
+        "totalScore": sum(scores[name] for name in ("mathScore", "physicsScore", "chemistryScore")),
+        "cccdFront": blob_url(f"{i:064x}", "jpg"),
+        "cccdBack": blob_url(f"{i + 1:064x}", "jpg"),
+        "transcript": [blob_url(f"{i + 2:064x}", "pdf")],
+        "priority": None,
+        "extraDocuments": [{"description": "Giấy khen", "files": [blob_url(f"{i + 3:064x}", "pdf")]}],
+        "status": "PENDING",
+        "created_at": created_at,
+        "updated_at": created_at,
+    }
+
+
+def _validated_body(schema, model) -> bytes:
+    # Đường cũ: FastAPI dump model trả về, validate lại theo response_model rồi serialize bằng JSONResponse
+    validated = schema.model_validate(model.model_dump(by_alias=True))
+    return JSONResponse(validated.model_dump(mode="json", by_alias=True)).body
+
+
+def _cases(page_size: int, rng: random.Random) -> dict:
+    list_page = [_application(i, rng) for i in range(page_size)]
+    pagination = {"currentPage": 1, "totalPages": 1, "totalRecords": page_size, "limit": page_size}
+    # Hồ sơ chi tiết như endpoint trả về: trạng thái dạng object, tệp đính kèm là URL có chữ ký
+    detail = {**_application(page_size, rng), "status": {"code": "PENDING", "displayName": "Chờ duyệt"}}
+    detail.update(map_attachments(detail, signed_url))
+
+    async def serialize_list_validated():
+        _validated_body(PaginatedApplicationResponse, PaginatedApplicationResponse(
+            pagination=PaginationData(**pagination),
+            applications=[ApplicationListItemSchema.model_validate(app) for app in list_page],
+        ))
+        return len(list_page)
+
+    async def serialize_list_trusted():
+        ORJSONResponse({
+            "pagination": dump_trusted(PaginationData, pagination),
+            "applications": [dump_trusted(ApplicationListItemSchema, app) for app in list_page],
+        })
+        return len(list_page)
+
+    async def serialize_detail_validated():
+        _validated_body(ApplicationDetailSchema, ApplicationDetailSchema(**detail))
+        return 1
+
+    async def serialize_detail_trusted():
+        ORJSONResponse(dump_trusted(ApplicationDetailSchema, detail))
+        return 1
+
+    return {fn.__name__: fn for fn in (
+        serialize_list_validated, serialize_list_trusted, serialize_detail_validated, serialize_detail_trusted,
+    )}
+
+
+async def _peak_kb(fn) -> float:
+    # Chạy riêng một lần: tracemalloc làm chậm đáng kể nên không tính vào thời gian
+    tracemalloc.start()
+    try:
+        await fn()
+        return round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+    finally:
+        tracemalloc.stop()
+
+
+async def main(args):
+    results, peaks = {}, {}
+    for name, fn in _cases(args.page_size, random.Random(args.seed)).items():
+        results[name] = await measure(fn, args.warmup, args.repeat)
+        peaks[name] = await _peak_kb(fn)
+    print(f"Số dòng mỗi trang: {args.page_size}")
+    print_results(results)
+    print()
+    print(f"{'case':32} {'peak KB':>10}")
+    for name, peak in peaks.items():
+        print(f"{name:32} {peak:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark tuần tự hóa qua Pydantic so với dump_trusted + orjson")
+    parser.add_argument("--page-size", type=int, default=100, help="Số dòng của trang danh sách")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,111 @@
+"""
+So sánh thông lượng đổi trạng thái hồ sơ: mỗi hồ sơ một request (PATCH /api/v2/application/{code}/status)
+và một request hàng loạt (PATCH /api/v2/application/bulk/status).
+Hai case lặp lại đúng các truy vấn của từng endpoint trên database tạm --database (bị xóa khi xong):
+email thông báo chỉ được ghi vào `email_outbox` của database tạm, không có email thật nào được gửi.
+
+Chạy từ thư mục back_end:
+    python -m app.scripts.benchmark_status --applications 20000
+"""
+import argparse
+import asyncio
+from datetime import datetime
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from app.database.indexes import ensure_indexes
+from app.scripts.bench_utils import measure, print_results, scratch_db
+from app.schemas.enums import ApplicationStatus
+
+# Số hồ sơ được đổi trạng thái trong một lần đo
+STATUS_BATCH_SIZE = 100
+INSERT_BATCH_SIZE = 5000
+
+
+async def _seed(db, count: int):
+    now = datetime.utcnow()
+    for start in range(0, count, INSERT_BATCH_SIZE):
+        users, applications = [], []
+        for i in range(start, min(start + INSERT_BATCH_SIZE, count)):
+            user_id = ObjectId()
+            users.append({"_id": user_id, "email": f"thisinh{i}@example.com", "full_name": f"Thí sinh {i}"})
+            applications.append({
+                "applicationCode": f"HS-{i + 1:07d}",
+                "userId": user_id,
+                "fullname": f"Thí sinh {i}",
+                "status": ApplicationStatus.PENDING.name,
+                "created_at": now,
+                "updated_at": now,
+            })
+        await db.users.insert_many(users)
+        await db.applications.insert_many(applications)
+        print(f"Đã sinh {start + len(applications)}/{count} hồ sơ")
+
+
+def _email(user: dict, code: str, status: ApplicationStatus) -> dict:
+    return {"to": user["email"], "subject": f"Cập nhật hồ sơ {code}: {status.value}", "status": "PENDING", "created_at": datetime.utcnow()}
+
+
+def _cases(db, codes: list) -> dict:
+    # Duyệt rồi trả lại trạng thái chờ duyệt để lần đo sau bắt đầu từ cùng dữ liệu
+    status_round_trip = (ApplicationStatus.APPROVED, ApplicationStatus.PENDING)
+
+    async def status_change_single():
+        # Mỗi hồ sơ: đọc hồ sơ, cập nhật, đọc thí sinh, đưa một email vào hàng đợi
+        for status in status_round_trip:
+            for code in codes:
+                application = await db.applications.find_one({"applicationCode": code})
+                await db.applications.update_one(
+                    {"applicationCode": code}, {"$set": {"status": status.name, "updated_at": datetime.utcnow()}}
+                )
+                user = await db.users.find_one({"_id": application["userId"]})
+                await db.email_outbox.insert_one(_email(user, code, status))
+        return len(status_round_trip) * len(codes)
+
+    async def status_change_bulk():
+        # Cả lô: một truy vấn $in, một bulk_write, đọc lại hồ sơ đã ghi, một truy vấn $in thí sinh, một insert_many
+        projection = {"applicationCode": 1, "userId": 1, "status": 1}
+        for status in status_round_trip:
+            applications = await db.applications.find({"applicationCode": {"$in": codes}}, projection).to_list(None)
+            now = datetime.utcnow()
+            now = now.replace(microsecond=now.microsecond // 1000 * 1000)
+            await db.applications.bulk_write([
+                UpdateOne({"_id": app["_id"], "status": app["status"]}, {"$set": {"status": status.name, "updated_at": now}})
+                for app in applications
+            ], ordered=False)
+            written = await db.applications.find(
+                {"_id": {"$in": [app["_id"] for app in applications]}, "status": status.name, "updated_at": now}, {"_id": 1}
+            ).to_list(None)
+            written_ids = {app["_id"] for app in written}
+            updated = [app for app in applications if app["_id"] in written_ids]
+            users = await db.users.find({"_id": {"$in": [app["userId"] for app in updated]}}).to_list(None)
+            users_by_id = {user["_id"]: user for user in users}
+            await db.email_outbox.insert_many(
+                [_email(users_by_id[app["userId"]], app["applicationCode"], status) for app in updated], ordered=False
+            )
+        return len(status_round_trip) * len(codes)
+
+    return {fn.__name__: fn for fn in (status_change_single, status_change_bulk)}
+
+
+async def main(args):
+    async with scratch_db(args.database) as db:
+        await ensure_indexes(db)
+        await _seed(db, args.applications)
+        codes = [f"HS-{i + 1:07d}" for i in range(min(args.batch, args.applications))]
+        results = {}
+        for name, fn in _cases(db, codes).items():
+            results[name] = await measure(fn, args.warmup, args.repeat)
+    print(f"Hồ sơ: {args.applications}, số hồ sơ mỗi lô: {len(codes)}")
+    print_results(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark đổi trạng thái từng hồ sơ so với đổi trạng thái hàng loạt")
+    parser.add_argument("--applications", type=int, default=20000, help="Số hồ sơ sinh ra")
+    parser.add_argument("--batch", type=int, default=STATUS_BATCH_SIZE, help="Số hồ sơ đổi trạng thái mỗi lần đo")
+    parser.add_argument("--database", default="admission_portal_bench_status", help="Database tạm (bị xóa khi xong)")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=2)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,49 @@
+# app/scripts/generate_image_variants.py
+"""
+Tạo ảnh review / thumb cho các ảnh đã có trong blob store nhưng chưa được chuẩn hóa
+(ảnh tải lên trước khi có bước chuẩn hóa, hoặc bị bỏ qua khi pool ảnh quá tải).
+Có thể chạy lại nhiều lần: ảnh đã có đủ phiên bản được bỏ qua.
+
+Chạy từ thư mục back_end:
+    python -m app.scripts.generate_image_variants
+"""
+import asyncio
+import os
+import time
+
+from app.utils.blob_store import BLOB_DIR, IMAGE_EXTENSIONS, blob_url
+from app.utils.image_processing import ensure_image_variants, image_pool
+
+
+def _original_images():
+    for root, _, files in os.walk(BLOB_DIR):
+        for name in files:
+            digest, _, ext = name.partition(".")
+            # Bỏ qua các phiên bản <digest>.review.jpg / <digest>.thumb.jpg và tệp tạm
+            if ext in IMAGE_EXTENSIONS and len(digest) == 64:
+                yield blob_url(digest, ext)
+
+
+async def main():
+    started = time.perf_counter()
+    processed = saved = 0
+    semaphore = asyncio.Semaphore(image_pool.max_workers * 2)
+
+    async def process(ref):
+        nonlocal processed, saved
+        async with semaphore:
+            sizes = await ensure_image_variants(ref)
+        if sizes:
+            processed += 1
+            saved += sizes["original"] - sizes["review"]
+
+    try:
+        await asyncio.gather(*(process(ref) for ref in _original_images()))
+    finally:
+        image_pool.shutdown()
+    print(f"Hoàn tất: chuẩn hóa {processed} ảnh, bản review nhỏ hơn bản gốc {saved / 1024 / 1024:.1f} MB, "
+          f"trong {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
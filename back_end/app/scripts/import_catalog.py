@@ -0,0 +1,50 @@
+# app/scripts/import_catalog.py
+"""
+Nhập danh mục trường / ngành / tổ hợp môn từ tệp CSV hoặc JSON (định dạng: app/utils/catalog_import.py).
+Mặc định chỉ in báo cáo thay đổi (dry-run); thêm --apply để ghi vào DB.
+
+Chạy từ thư mục back_end:
+    python -m app.scripts.import_catalog catalog.csv
+    python -m app.scripts.import_catalog catalog.json --apply [--delete-missing]
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from app.crud.application_crud import sync_school_names
+from app.database.database import run_script
+from app.utils.catalog_import import CatalogImportError, parse_catalog_file, diff_catalog, apply_catalog_diff
+
+
+async def main(path: str, apply: bool, delete_missing: bool):
+    started = time.perf_counter()
+    with open(path, "rb") as f:
+        content = f.read()
+    try:
+        diff = await diff_catalog(parse_catalog_file(content, path), delete_missing)
+    except CatalogImportError as e:
+        print(str(e))
+        for error in e.errors:
+            print(f"  - {error}")
+        sys.exit(1)
+
+    print(json.dumps(diff["report"], ensure_ascii=False, indent=2))
+    if not apply:
+        print("Dry-run: chưa ghi gì. Thêm --apply để áp dụng.")
+        return
+
+    for school_code, school_name, majors in await apply_catalog_diff(diff):
+        updated = await sync_school_names(school_code, school_name, majors)
+        print(f"{school_code}: đồng bộ tên cho {updated} hồ sơ")
+    print(f"Hoàn tất trong {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Nhập danh mục tuyển sinh từ CSV / JSON")
+    parser.add_argument("path")
+    parser.add_argument("--apply", action="store_true", help="Ghi thay đổi vào DB (mặc định chỉ dry-run)")
+    parser.add_argument("--delete-missing", action="store_true", help="Xóa trường / tổ hợp môn không có trong tệp")
+    args = parser.parse_args()
+    asyncio.run(run_script(main, args.path, args.apply, args.delete_missing))
@@ -0,0 +1,97 @@
+# app/scripts/migrate_attachments.py
+"""
+Di chuyển tệp đính kèm base64 trong collection `applications` sang blob store.
+
+Chạy từ thư mục back_end:
+    python -m app.scripts.migrate_attachments [--batch-size 50] [--restart]
+
+Tiến độ (`_id` cuối cùng đã xử lý) được lưu trong collection `migrations`,
+nên có thể dừng giữa chừng và chạy lại để tiếp tục.
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime
+
+import bson
+from pymongo import UpdateOne
+
+from app.database.database import get_db, run_script
+from app.utils.blob_store import externalize_attachments
+
+MIGRATION_ID = "attachments_to_blob_store"
+
+
+async def migrate(batch_size: int, restart: bool):
+    db = get_db()
+    state = None if restart else await db.migrations.find_one({"_id": MIGRATION_ID})
+    last_id = state.get("lastId") if state else None
+
+    processed = 0
+    rewritten = 0
+    bytes_reclaimed = 0
+    started = time.perf_counter()
+
+    while True:
+        query = {"_id": {"$gt": last_id}} if last_id is not None else {}
+        batch = await db.applications.find(query).sort("_id", 1).limit(batch_size).to_list(None)
+        if not batch:
+            break
+
+        operations = []
+        batch_reclaimed = 0
+        for doc in batch:
+            changes = await asyncio.to_thread(externalize_attachments, doc)
+            if not changes:
+                continue
+            size_before = len(bson.encode(doc))
+            doc.update(changes)
+            batch_reclaimed += size_before - len(bson.encode(doc))
+            operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": changes}))
+
+        if operations:
+            await db.applications.bulk_write(operations, ordered=False)
+
+        last_id = batch[-1]["_id"]
+        processed += len(batch)
+        rewritten += len(operations)
+        bytes_reclaimed += batch_reclaimed
+
+        await db.migrations.update_one(
+            {"_id": MIGRATION_ID},
+            {
+                "$set": {"lastId": last_id, "updated_at": datetime.utcnow()},
+                "$inc": {"processed": len(batch), "rewritten": len(operations), "bytesReclaimed": batch_reclaimed},
+            },
+            upsert=True,
+        )
+
+        elapsed = time.perf_counter() - started
+        print(
+            f"Đã xử lý {processed} hồ sơ ({rewritten} được ghi lại), "
+            f"giải phóng {bytes_reclaimed / 1024 / 1024:.1f} MB, "
+            f"{processed / elapsed:.1f} hồ sơ/giây"
+        )
+
+    await db.migrations.update_one(
+        {"_id": MIGRATION_ID},
+        {"$set": {"completed_at": datetime.utcnow()}},
+        upsert=True,
+    )
+    elapsed = time.perf_counter() - started
+    print(
+        f"Hoàn tất: {processed} hồ sơ, {rewritten} được ghi lại, "
+        f"giải phóng {bytes_reclaimed / 1024 / 1024:.1f} MB trong {elapsed:.1f}s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chuyển tệp base64 trong hồ sơ sang blob store")
+    parser.add_argument("--batch-size", type=int, default=50, help="Số hồ sơ xử lý mỗi lô")
+    parser.add_argument("--restart", action="store_true", help="Bỏ qua tiến độ đã lưu và chạy lại từ đầu")
+    args = parser.parse_args()
+    asyncio.run(run_script(migrate, args.batch_size, args.restart))
+
+
+if __name__ == "__main__":
+    main()
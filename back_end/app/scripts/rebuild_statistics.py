@@ -0,0 +1,22 @@
+# app/scripts/rebuild_statistics.py
+"""
+Tính lại bảng tổng hợp thống kê `application_stats` từ toàn bộ `applications`.
+
+Chạy từ thư mục back_end:
+    python -m app.scripts.rebuild_statistics
+"""
+import asyncio
+import time
+
+from app.crud.statistics_crud import rebuild_statistics
+from app.database.database import run_script
+
+
+async def main():
+    started = time.perf_counter()
+    buckets = await rebuild_statistics()
+    print(f"Đã tính lại {buckets} nhóm thống kê trong {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(run_script(main))
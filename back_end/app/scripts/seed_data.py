@@ -0,0 +1,199 @@
+# app/scripts/seed_data.py
+"""
+Sinh dữ liệu thử có cấu trúc giống dữ liệu thật (người dùng, trường, ngành, tổ hợp môn, môn học, hồ sơ)
+để chạy benchmark (app/scripts/benchmark.py) trên một mongod cục bộ.
+
+Dữ liệu được ghi vào database MONGO_DB_NAME, nên luôn đặt một database riêng:
+    MONGO_URI=mongodb://localhost:27017 MONGO_DB_NAME=admission_portal_bench \
+        python -m app.scripts.seed_data --applications 200000 --drop
+
+Tệp đính kèm mặc định là tham chiếu blob (như hồ sơ nộp sau khi có blob store);
+--inline-attachment-kb N nhúng base64 N KB cho mỗi tệp để mô phỏng hồ sơ cũ.
+"""
+import argparse
+import asyncio
+import base64
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from app.core.config import MONGO_DB_NAME
+from app.crud.application_crud import resolve_school_names
+from app.crud.statistics_crud import rebuild_statistics
+from app.database.database import get_db, run_script
+from app.database.indexes import ensure_indexes
+from app.schemas.enums import ApplicationStatus
+from app.utils.blob_store import BLOB_URL_PREFIX
+from app.utils.code_generate import CODE_PREFIX, SEQUENCE_DIGITS
+from app.utils.password_hashing import hash_password
+from app.utils.search import build_search_keys
+
+INSERT_BATCH_SIZE = 2000
+SEED_PASSWORD = "benchmark123"
+
+SURNAMES = ["Nguyễn", "Trần", "Lê", "Phạm", "Hoàng", "Huỳnh", "Phan", "Vũ", "Võ", "Đặng", "Bùi", "Đỗ", "Hồ", "Ngô", "Dương", "Lý"]
+MIDDLE_NAMES = ["Văn", "Thị", "Hữu", "Đức", "Minh", "Thanh", "Ngọc", "Quốc", "Gia", "Bảo", "Thu", "Hoài"]
+GIVEN_NAMES = ["An", "Bình", "Châu", "Dũng", "Giang", "Hà", "Hải", "Hạnh", "Hùng", "Khánh", "Linh", "Long",
+               "Mai", "Nam", "Ngân", "Phúc", "Quân", "Sơn", "Tâm", "Thảo", "Trang", "Tuấn", "Vy", "Yến"]
+PROVINCES = ["Hà Nội", "TP Hồ Chí Minh", "Đà Nẵng", "Hải Phòng", "Cần Thơ", "Nghệ An", "Thanh Hóa", "Quảng Ninh", "Huế", "Bình Định"]
+SUBJECTS = {
+    "MATH": "Toán", "LIT": "Ngữ văn", "ENG": "Tiếng Anh", "PHY": "Vật lý", "CHE": "Hóa học",
+    "BIO": "Sinh học", "HIS": "Lịch sử", "GEO": "Địa lý", "CIV": "Giáo dục công dân",
+}
+SUBJECT_COMBINATIONS = {
+    "A00": ["MATH", "PHY", "CHE"], "A01": ["MATH", "PHY", "ENG"], "B00": ["MATH", "CHE", "BIO"],
+    "C00": ["LIT", "HIS", "GEO"], "D01": ["MATH", "LIT", "ENG"], "D07": ["MATH", "CHE", "ENG"],
+    "D14": ["LIT", "HIS", "ENG"], "C19": ["LIT", "HIS", "CIV"],
+}
+MAJOR_NAMES = ["Công nghệ thông tin", "Kỹ thuật phần mềm", "Khoa học máy tính", "Kinh tế", "Tài chính ngân hàng",
+               "Kế toán", "Quản trị kinh doanh", "Ngôn ngữ Anh", "Luật", "Y đa khoa", "Dược học", "Điều dưỡng",
+               "Kỹ thuật điện", "Cơ khí", "Xây dựng", "Kiến trúc", "Sư phạm Toán", "Báo chí", "Marketing", "Logistics"]
+# Tỉ lệ trạng thái hồ sơ trong một mùa tuyển sinh
+STATUS_WEIGHTS = [(ApplicationStatus.PENDING.name, 6), (ApplicationStatus.APPROVED.name, 3), (ApplicationStatus.CANCEL.name, 1)]
+
+
+def _full_name(rng: random.Random) -> str:
+    return f"{rng.choice(SURNAMES)} {rng.choice(MIDDLE_NAMES)} {rng.choice(GIVEN_NAMES)}"
+
+
+def _build_schools(rng: random.Random, count: int, majors_per_school: int) -> list:
+    schools = []
+    for i in range(count):
+        majors = []
+        for j, name in enumerate(rng.sample(MAJOR_NAMES, min(majors_per_school, len(MAJOR_NAMES)))):
+            majors.append({
+                "code": f"{7480000 + j * 101 + i % 100}",
+                "name": name,
+                "subjectGroupIds": rng.sample(list(SUBJECT_COMBINATIONS), 3),
+            })
+        schools.append({"code": f"S{i:03d}", "name": f"Trường Đại học số {i + 1}", "majors": majors})
+    return schools
+
+
+def _attachment(rng: random.Random, inline_kb: int, ext: str = "jpg") -> str:
+    if inline_kb:
+        return "data:image/jpeg;base64," + base64.b64encode(os.urandom(inline_kb * 1024)).decode()
+    digest = "%064x" % rng.getrandbits(256)
+    return f"{BLOB_URL_PREFIX}{digest[:2]}/{digest[2:4]}/{digest}.{ext}"
+
+
+def _build_application(rng: random.Random, index: int, user: dict, school: dict, now: datetime, inline_kb: int) -> dict:
+    major = rng.choice(school["majors"])
+    subject_group = rng.choice(major["subjectGroupIds"])
+    created_at = now - timedelta(days=rng.uniform(0, 90))
+    status = rng.choices([s for s, _ in STATUS_WEIGHTS], [w for _, w in STATUS_WEIGHTS])[0]
+    updated_at = created_at if status == ApplicationStatus.PENDING.name else created_at + timedelta(days=rng.uniform(0, 10))
+    scores = {f: round(rng.uniform(3, 10), 2) for f in ("mathScore", "literatureScore", "englishScore")}
+    application = {
+        "fullname": user["full_name"],
+        "gender": rng.choice(["Nam", "Nữ"]),
+        "dob": f"{rng.randint(2005, 2008)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        "idNumber": f"{rng.randrange(10 ** 11, 10 ** 12)}",
+        "province": rng.choice(PROVINCES),
+        "district": "Quận 1",
+        "ward": "Phường 1",
+        "addressDetail": f"Số {rng.randint(1, 300)} đường {rng.choice(GIVEN_NAMES)}",
+        **scores,
+        "physicsScore": round(rng.uniform(3, 10), 2),
+        "school": school["code"],
+        "major": major["code"],
+        "subjectGroup": subject_group,
+        "totalScore": round(sum(scores.values()), 2),
+        "cccdFront": _attachment(rng, inline_kb),
+        "cccdBack": _attachment(rng, inline_kb),
+        "transcript": [_attachment(rng, inline_kb) for _ in range(rng.randint(1, 3))],
+        "priority": rng.choice([None, None, None, "KV1", "KV2"]),
+        "userId": user["_id"],
+        "created_at": created_at,
+        "updated_at": updated_at,
+        "applicationCode": f"{CODE_PREFIX}-{str(index + 1).zfill(SEQUENCE_DIGITS)}",
+        "status": status,
+    }
+    application["schoolName"], application["majorName"] = resolve_school_names(school, major["code"])
+    application["searchKeys"] = build_search_keys(application)
+    return application
+
+
+async def _insert_in_batches(collection, documents, total: int, label: str):
+    batch, inserted, started = [], 0, time.perf_counter()
+    for document in documents:
+        batch.append(document)
+        if len(batch) >= INSERT_BATCH_SIZE:
+            await collection.insert_many(batch, ordered=False)
+            inserted += len(batch)
+            batch = []
+            print(f"\r{label}: {inserted}/{total} ({inserted / (time.perf_counter() - started):.0f}/s)", end="", flush=True)
+    if batch:
+        await collection.insert_many(batch, ordered=False)
+        inserted += len(batch)
+    print(f"\r{label}: {inserted}/{total} trong {time.perf_counter() - started:.1f}s")
+
+
+async def seed(args):
+    db = get_db()
+    rng = random.Random(args.seed)
+    now = datetime.utcnow()
+
+    if args.drop:
+        for name in ("users", "applications", "schools", "subject_combination", "subject",
+                     "application_stats", "counters", "catalog_meta"):
+            await db.drop_collection(name)
+
+    await db.subject.insert_many([{"code": code, "name": name} for code, name in SUBJECTS.items()])
+    await db.subject_combination.insert_many([
+        {"code": code, "name": code, "subjects": subjects} for code, subjects in SUBJECT_COMBINATIONS.items()
+    ])
+    schools = _build_schools(rng, args.schools, args.majors_per_school)
+    await db.schools.insert_many([dict(school) for school in schools])
+    await db.catalog_meta.update_one({"_id": "catalog"}, {"$inc": {"version": 1}}, upsert=True)
+
+    # Một hash dùng chung: tất cả người dùng thử có mật khẩu SEED_PASSWORD
+    password_hash = hash_password(SEED_PASSWORD)
+    users = [
+        {
+            "_id": ObjectId(),
+            "username": f"user{i:07d}",
+            "password_hash": password_hash,
+            "email": f"user{i:07d}@example.com",
+            "full_name": _full_name(rng),
+            "role": "candidate",
+            "isVerified": True,
+        }
+        for i in range(args.users)
+    ]
+    await _insert_in_batches(db.users, iter(users), len(users), "users")
+
+    applications = (
+        _build_application(rng, i, rng.choice(users), rng.choice(schools), now, args.inline_attachment_kb)
+        for i in range(args.applications)
+    )
+    await _insert_in_batches(db.applications, applications, args.applications, "applications")
+    # Bộ đếm mã hồ sơ tiếp tục sau các mã đã sinh
+    await db.counters.update_one({"_id": f"applicationCode:{CODE_PREFIX}"}, {"$max": {"value": args.applications}}, upsert=True)
+
+    await ensure_indexes(db)
+    buckets = await rebuild_statistics()
+    print(f"application_stats: {buckets} nhóm")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sinh dữ liệu thử cho benchmark")
+    parser.add_argument("--applications", type=int, default=10_000, help="Số hồ sơ (10k đến 1M)")
+    parser.add_argument("--users", type=int, default=None, help="Số người dùng (mặc định: một nửa số hồ sơ)")
+    parser.add_argument("--schools", type=int, default=200)
+    parser.add_argument("--majors-per-school", type=int, default=15)
+    parser.add_argument("--inline-attachment-kb", type=int, default=0,
+                        help="Nhúng base64 N KB cho mỗi tệp đính kèm (mô phỏng hồ sơ cũ); 0 = tham chiếu blob")
+    parser.add_argument("--seed", type=int, default=42, help="Seed ngẫu nhiên để dữ liệu lặp lại được")
+    parser.add_argument("--drop", action="store_true", help="Xóa các collection liên quan trước khi sinh")
+    parser.add_argument("--force", action="store_true", help="Cho phép ghi vào database mặc định admission_portal")
+    args = parser.parse_args()
+    args.users = args.users or max(1, args.applications // 2)
+
+    if MONGO_DB_NAME == "admission_portal" and not args.force:
+        sys.exit("Từ chối ghi dữ liệu thử vào database admission_portal. Đặt MONGO_DB_NAME (hoặc thêm --force).")
+    asyncio.run(run_script(seed, args))
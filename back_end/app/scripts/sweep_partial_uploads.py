@@ -0,0 +1,21 @@
+# app/scripts/sweep_partial_uploads.py
+"""
+Dọn các phiên tải tệp bị bỏ dở: bản ghi upload_sessions quá hạn và tệp uploads/partial/*.part tương ứng
+(xem app/utils/partial_uploads.py). Nên chạy định kỳ, ví dụ cron mỗi giờ.
+
+Chạy từ thư mục back_end:
+    python -m app.scripts.sweep_partial_uploads
+"""
+import asyncio
+
+from app.database.database import run_script
+from app.utils.partial_uploads import sweep_partial_uploads
+
+
+async def sweep():
+    removed = await sweep_partial_uploads()
+    print(f"Hoàn tất: xóa {removed} tệp tải dở")
+
+
+if __name__ == "__main__":
+    asyncio.run(run_script(sweep))
@@ -1,21 +1,43 @@
-from passlib.context import CryptContext
+import os
 from jose import jwt,JWTError
 from datetime import datetime, timedelta
 from app.core.config import JWT_SECRET
 from app.crud.user_crud import get_user_by_username
+from app.utils.principal_cache import get_principal, set_principal
+from app.utils.password_hashing import hash_password, verify_and_update_password
+from app.utils.process_pool import BoundedProcessPool, PoolSaturatedError
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60*24
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+# bcrypt tốn ~200ms CPU mỗi lần nên chạy trong process pool riêng, tránh chặn event loop
+# và để nhiều lượt đăng nhập được xử lý song song trên nhiều nhân
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", str(PASSWORD_HASH_WORKERS * 8)))
+password_pool = BoundedProcessPool("password", PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING)
 
-def verify_password(password: str, password_hash: str) -> bool:
-    return pwd_context.verify(password, password_hash)
+def _server_busy():
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Hệ thống đang bận, vui lòng thử lại sau ít phút",
+        headers={"Retry-After": "1"},
+    )
+
+async def hash_password_async(password: str) -> str:
+    try:
+        return await password_pool.run(hash_password, password)
+    except PoolSaturatedError:
+        raise _server_busy()
+
+async def verify_password_async(password: str, password_hash: str):
+    """Trả về (mật khẩu đúng?, hash mới cần lưu lại hoặc None)."""
+    try:
+        return await password_pool.run(verify_and_update_password, password, password_hash)
+    except PoolSaturatedError:
+        raise _server_busy()
 
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
@@ -26,7 +48,7 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
 def decode_access_token(token: str):
     return jwt.decode(token, JWT_SECRET, algorithms=[ALGORITHM])
 
-def get_current_user(token: str = Depends(oauth2_scheme)):
+async def get_current_user(token: str = Depends(oauth2_scheme)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Vui lòng đăng nhập",  # ✅ Đã sửa
@@ -37,19 +59,24 @@ def get_current_user(token: str = Depends(oauth2_scheme)):
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
-        user = get_user_by_username(username)
+        # Dùng cache để không phải truy vấn `users` ở mỗi request
+        user = get_principal(username)
+        if user is not None:
+            return user
+        user = await get_user_by_username(username)
         if not user:
             raise credentials_exception
         user.pop("password_hash", None)
         user.pop("verification_token", None)
         if "_id" in user:
             user["_id"] = str(user["_id"])
+        set_principal(username, user)
         return user
     except JWTError:
         raise credentials_exception
 
 def Auth(required_role=None):
-    def auth_dep(current_user=Depends(get_current_user)):
+    async def auth_dep(current_user=Depends(get_current_user)):
         if required_role and current_user["role"] != required_role:
             raise HTTPException(status_code=403, detail="Not enough permissions")
         return current_user
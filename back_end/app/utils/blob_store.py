@@ -0,0 +1,189 @@
+# app/utils/blob_store.py
+import base64
+import binascii
+import hashlib
+import os
+import re
+import tempfile
+
+from app.core.config import UPLOAD_DIR
+
+# Tệp được lưu theo địa chỉ nội dung: uploads/blobs/ab/cd/<sha256>.<ext>
+# Cùng một tệp tải lên nhiều lần chỉ được lưu một lần.
+BLOB_DIR = os.path.join(UPLOAD_DIR, "blobs")
+BLOB_URL_PREFIX = "/uploads/blobs/"
+
+CONTENT_TYPE_EXTENSIONS = {
+    "image/jpeg": "jpg",
+    "image/jpg": "jpg",
+    "image/png": "png",
+    "image/webp": "webp",
+    "application/pdf": "pdf",
+}
+
+_DATA_URL_RE = re.compile(r"^data:(?P<content_type>[\w.+-]+/[\w.+-]+)?[^,]*;base64,", re.IGNORECASE)
+
+
+def extension_for(content_type: str) -> str:
+    return CONTENT_TYPE_EXTENSIONS.get((content_type or "").lower(), "bin")
+
+
+def blob_relative_path(digest: str, ext: str) -> str:
+    return f"{digest[:2]}/{digest[2:4]}/{digest}.{ext}"
+
+
+def blob_path(digest: str, ext: str) -> str:
+    return os.path.join(BLOB_DIR, *blob_relative_path(digest, ext).split("/"))
+
+
+def blob_url(digest: str, ext: str) -> str:
+    return BLOB_URL_PREFIX + blob_relative_path(digest, ext)
+
+
+def is_blob_ref(value) -> bool:
+    return isinstance(value, str) and value.startswith(BLOB_URL_PREFIX)
+
+
+def save_blob(data: bytes, content_type: str) -> str:
+    """
+    Lưu nội dung vào blob store và trả về URL tham chiếu.
+    Hàm đồng bộ (ghi đĩa) - gọi qua threadpool khi dùng trong endpoint.
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    ext = extension_for(content_type)
+    path = blob_path(digest, ext)
+    if not os.path.exists(path):
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        # Ghi ra tệp tạm rồi đổi tên để không bao giờ để lại blob ghi dở
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as buffer:
+                buffer.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    return blob_url(digest, ext)
+
+
+def adopt_file(tmp_path: str, digest: str, content_type: str) -> str:
+    """
+    Đưa một tệp đã ghi sẵn trên đĩa (cùng ổ với BLOB_DIR) vào blob store mà không đọc lại nội dung.
+    `digest` là sha256 của tệp do nơi gọi đã tính.
+    """
+    ext = extension_for(content_type)
+    path = blob_path(digest, ext)
+    if os.path.exists(path):
+        os.remove(tmp_path)
+    else:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(tmp_path, path)
+    return blob_url(digest, ext)
+
+
+def store_attachment(value: str) -> str:
+    """
+    Chuyển một giá trị tài liệu (data URL base64) thành tham chiếu blob.
+    Giá trị đã là tham chiếu hoặc URL thông thường được giữ nguyên.
+    """
+    match = _DATA_URL_RE.match(value)
+    if not match:
+        return value
+    try:
+        data = base64.b64decode(value[match.end():], validate=True)
+    except (binascii.Error, ValueError) as e:
+        raise ValueError(f"Dữ liệu tệp đính kèm không hợp lệ: {e}")
+    return save_blob(data, match.group("content_type"))
+
+
+def map_attachments(application: dict, fn) -> dict:
+    """
+    Áp dụng `fn` cho từng giá trị tệp đính kèm của hồ sơ (cccdFront, cccdBack, transcript,
+    priorityProof, extraDocuments[].files).
+    Trả về dict chỉ gồm các trường đã thay đổi, dùng trực tiếp cho `$set` hoặc để ghép vào response.
+    """
+    changes = {}
+
+    for field in ("cccdFront", "cccdBack", "priorityProof"):
+        value = application.get(field)
+        if isinstance(value, str):
+            ref = fn(value)
+            if ref != value:
+                changes[field] = ref
+
+    transcript = application.get("transcript")
+    if isinstance(transcript, list):
+        refs = [fn(v) if isinstance(v, str) else v for v in transcript]
+        if refs != transcript:
+            changes["transcript"] = refs
+
+    extra_documents = application.get("extraDocuments")
+    if isinstance(extra_documents, list):
+        new_documents = []
+        for doc in extra_documents:
+            if isinstance(doc, dict) and isinstance(doc.get("files"), list):
+                doc = {**doc, "files": [fn(v) if isinstance(v, str) else v for v in doc["files"]]}
+            new_documents.append(doc)
+        if new_documents != extra_documents:
+            changes["extraDocuments"] = new_documents
+
+    return changes
+
+
+def externalize_attachments(application: dict) -> dict:
+    """Thay các chuỗi base64 trong hồ sơ bằng tham chiếu blob; trả về các trường đã thay đổi."""
+    return map_attachments(application, store_attachment)
+
+
+def attachment_refs(application: dict) -> list:
+    """Tất cả tham chiếu blob trong các trường đính kèm của hồ sơ."""
+    refs = []
+
+    def collect(value):
+        if is_blob_ref(value):
+            refs.append(value)
+        return value
+
+    map_attachments(application, collect)
+    return refs
+
+
+# --- Phiên bản ảnh đã chuẩn hóa (app/utils/image_processing.py) ---
+# Lưu cạnh tệp gốc: <sha256>.review.jpg (ảnh xem hồ sơ), <sha256>.thumb.jpg (ảnh thu nhỏ)
+IMAGE_VARIANTS = ("review", "thumb")
+IMAGE_EXTENSIONS = ("jpg", "png", "webp")
+VARIANT_EXTENSION = "jpg"
+
+# ext là phần mở rộng của tệp gốc (jpg, pdf...) hoặc của phiên bản ảnh (review.jpg, thumb.jpg)
+_BLOB_REF_RE = re.compile(r"^/uploads/blobs/([0-9a-f]{2})/([0-9a-f]{2})/([0-9a-f]{64})\.(\w+(?:\.\w+)?)$")
+
+
+def parse_blob_ref(ref: str):
+    """Tách tham chiếu blob (kể cả phiên bản ảnh) thành (digest, ext); None nếu không phải tham chiếu hợp lệ."""
+    match = _BLOB_REF_RE.match(ref) if isinstance(ref, str) else None
+    if not match or match.group(3)[:2] != match.group(1) or match.group(3)[2:4] != match.group(2):
+        return None
+    return match.group(3), match.group(4)
+
+
+def is_image_ref(ref: str) -> bool:
+    parsed = parse_blob_ref(ref)
+    return parsed is not None and parsed[1] in IMAGE_EXTENSIONS
+
+
+def variant_ext(variant: str) -> str:
+    return f"{variant}.{VARIANT_EXTENSION}"
+
+
+def variant_path(digest: str, variant: str) -> str:
+    return blob_path(digest, variant_ext(variant))
+
+
+def variant_ref(ref: str, variant: str) -> str:
+    """Tham chiếu tới phiên bản `variant` của ảnh nếu đã được tạo, ngược lại giữ tham chiếu gốc."""
+    if variant == "original" or not is_image_ref(ref):
+        return ref
+    digest, _ = parse_blob_ref(ref)
+    return blob_url(digest, variant_ext(variant)) if os.path.exists(variant_path(digest, variant)) else ref
@@ -0,0 +1,133 @@
+# app/utils/catalog_cache.py
+"""
+Cache trong bộ nhớ cho dữ liệu danh mục: trường -> ngành -> tổ hợp môn -> môn học.
+
+Danh mục chỉ thay đổi vài lần mỗi mùa tuyển sinh nhưng được đọc mỗi lần thí sinh mở form,
+nên được nạp một lần khi khởi động và phục vụ hoàn toàn từ bộ nhớ.
+Mỗi lần ghi (create/update/delete school) tăng `version` trong collection `catalog_meta`;
+mỗi worker so sánh version này định kỳ để nạp lại khi danh mục bị worker khác thay đổi.
+
+Version cũng là ETag của các API danh mục: trình duyệt gửi lại `If-None-Match`
+và nhận 304 trực tiếp từ ảnh chụp trong bộ nhớ (`not_modified`, `set_cache_headers`).
+"""
+import asyncio
+import os
+import time
+
+from fastapi import Request, Response
+
+from app.crud import school_crud
+
+# Khoảng thời gian tối đa một worker có thể phục vụ danh mục cũ sau khi worker khác ghi
+VERSION_CHECK_INTERVAL_SECONDS = 5
+# Các API danh mục /api/v1 yêu cầu đăng nhập nên mặc định chỉ trình duyệt được lưu ("private");
+# proxy dùng chung không được trả response đã xác thực cho người khác.
+# Muốn proxy / CDN dùng lại response thì phải mở API danh mục không cần đăng nhập rồi mới đặt "public".
+CATALOG_CACHE_CONTROL = os.getenv("CATALOG_CACHE_CONTROL", "private, max-age=60, stale-while-revalidate=30")
+# API admin: luôn hỏi lại server (rẻ nhờ 304) để admin thấy ngay thay đổi vừa ghi
+ADMIN_CATALOG_CACHE_CONTROL = "private, no-cache"
+
+
+class CatalogSnapshot:
+    """Ảnh chụp bất biến của danh mục tại một version. Không sửa các dict trả ra."""
+
+    def __init__(self, version: int, schools: list, subject_combinations: list, subjects: list):
+        self.version = version
+        # ETag mạnh: dữ liệu trả ra chỉ thay đổi khi version tăng
+        self.etag = f'"catalog-{version}"'
+        self.schools = {school["code"]: school for school in schools}
+        # Dữ liệu cho GET /api/v1/schools: trường không kèm danh sách ngành
+        self.school_summaries = [
+            {**{k: v for k, v in school.items() if k != "majors"}, "_id": str(school["_id"])}
+            for school in schools
+        ]
+        # Dữ liệu cho GET /api/v1/schools/{code}/majors
+        self.majors_by_school = {
+            school["code"]: [
+                {
+                    "code": major.get("code"),
+                    "name": major.get("name"),
+                    # API tạo / cập nhật / nhập trường lưu subjectGroupIds; dữ liệu cũ lưu subject_group_ids
+                    "subject_group_ids": major.get("subjectGroupIds", major.get("subject_group_ids"))
+                }
+                for major in school.get("majors", [])
+            ]
+            for school in schools
+        }
+        self.subjects = {
+            subject["code"]: {k: v for k, v in subject.items() if k != "_id"}
+            for subject in subjects
+        }
+        # Dữ liệu cho GET /api/v2/schools/subject-combinations
+        self.subject_combination_list = [
+            {k: v for k, v in combination.items() if k != "_id"}
+            for combination in subject_combinations
+        ]
+        # Dữ liệu cho GET /api/v1/subject-combinations/{code}: tổ hợp kèm chi tiết từng môn
+        self.subject_combination_details = {}
+        for combination in self.subject_combination_list:
+            full_subjects = [self.subjects[code] for code in combination.get("subjects", []) if code in self.subjects]
+            self.subject_combination_details[combination["code"]] = {**combination, "subjects": full_subjects}
+
+
+_snapshot = None
+_last_version_check = 0.0
+_lock = asyncio.Lock()
+
+
+async def load_catalog() -> CatalogSnapshot:
+    """Nạp lại toàn bộ danh mục từ MongoDB."""
+    global _snapshot, _last_version_check
+    async with _lock:
+        # Đọc version trước dữ liệu: nếu có ghi xen giữa, lần kiểm tra sau sẽ thấy version mới và nạp lại
+        version = await school_crud.get_catalog_version()
+        schools, subject_combinations, subjects = await asyncio.gather(
+            school_crud.find_schools(),
+            school_crud.find_subject_combinations(),
+            school_crud.find_subjects(),
+        )
+        _snapshot = CatalogSnapshot(version, schools, subject_combinations, subjects)
+        _last_version_check = time.monotonic()
+        return _snapshot
+
+
+async def get_catalog() -> CatalogSnapshot:
+    """Trả về danh mục hiện tại, nạp lại nếu worker khác đã tăng version."""
+    global _last_version_check
+    if _snapshot is None:
+        return await load_catalog()
+    if time.monotonic() - _last_version_check > VERSION_CHECK_INTERVAL_SECONDS:
+        _last_version_check = time.monotonic()
+        if await school_crud.get_catalog_version() != _snapshot.version:
+            return await load_catalog()
+    return _snapshot
+
+
+async def invalidate_catalog() -> CatalogSnapshot:
+    """Gọi sau mỗi lần ghi vào danh mục: tăng version chung rồi nạp lại trên worker hiện tại."""
+    await school_crud.bump_catalog_version()
+    return await load_catalog()
+
+
+def not_modified(request: Request, snapshot: CatalogSnapshot) -> bool:
+    """True nếu `If-None-Match` của request khớp ETag của ảnh chụp (so sánh yếu như RFC 9110 quy định)."""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return snapshot.etag in tags
+
+
+def set_cache_headers(response: Response, snapshot: CatalogSnapshot, cache_control: str = CATALOG_CACHE_CONTROL):
+    response.headers["ETag"] = snapshot.etag
+    response.headers["Cache-Control"] = cache_control
+    # Response phụ thuộc người gọi (API cần đăng nhập): cache nào bỏ qua "private" cũng phải tách theo token
+    response.headers["Vary"] = "Authorization"
+
+
+def not_modified_response(snapshot: CatalogSnapshot, cache_control: str = CATALOG_CACHE_CONTROL) -> Response:
+    response = Response(status_code=304)
+    set_cache_headers(response, snapshot, cache_control)
+    return response
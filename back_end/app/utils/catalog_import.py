@@ -0,0 +1,234 @@
+# app/utils/catalog_import.py
+"""
+Nhập hàng loạt danh mục tuyển sinh (trường, ngành, tổ hợp môn) từ tệp CSV hoặc JSON.
+
+Định dạng được hỗ trợ:
+- JSON: danh sách trường `[{"code", "name", "majors": [{"code", "name", "subjectGroupIds"}]}]`
+  hoặc object `{"schools": [...], "subjectCombinations": [{"code", "name", "subjects": [...]}]}`.
+- CSV: mỗi dòng một ngành, các cột `school_code, school_name, major_code, major_name, subject_group_ids`
+  (các mã tổ hợp cách nhau bởi `;`). Trường chưa có ngành thì để trống các cột ngành.
+
+Quy trình: `parse_catalog_file` -> `diff_catalog` (báo cáo thêm / sửa / xóa, dùng cho dry-run)
+-> `apply_catalog_diff` (ghi bằng bulk_write theo lô, làm mới cache danh mục).
+"""
+import csv
+import io
+import json
+
+from pydantic import ValidationError
+from pymongo import DeleteOne, UpdateOne
+
+from app.crud import school_crud
+from app.schemas.school_management_schema import SchoolCreateSchema, SubjectCombinationImportSchema
+from app.utils.catalog_cache import invalidate_catalog
+
+# Số thao tác mỗi lệnh bulk_write
+IMPORT_BATCH_SIZE = 500
+
+
+class CatalogImportError(ValueError):
+    """Tệp nhập không hợp lệ; `errors` là danh sách lỗi theo từng dòng / phần tử."""
+
+    def __init__(self, errors: list):
+        super().__init__(f"Tệp nhập có {len(errors)} lỗi")
+        self.errors = errors
+
+
+def _validation_errors(where: str, error: ValidationError) -> list:
+    return [f"{where}: {'.'.join(str(p) for p in e['loc'])} - {e['msg']}" for e in error.errors()]
+
+
+def _parse_csv(text: str) -> dict:
+    schools, errors = {}, []
+    for line, row in enumerate(csv.DictReader(io.StringIO(text)), start=2):
+        row = {k.strip(): (v or "").strip() for k, v in row.items() if k}
+        code = row.get("school_code")
+        if not code:
+            errors.append(f"Dòng {line}: thiếu school_code")
+            continue
+        school = schools.setdefault(code, {"code": code, "name": row.get("school_name"), "majors": []})
+        if row.get("school_name") and row["school_name"] != school["name"]:
+            errors.append(f"Dòng {line}: tên trường '{code}' khác với dòng trước")
+        if row.get("major_code"):
+            school["majors"].append({
+                "code": row["major_code"],
+                "name": row.get("major_name"),
+                "subjectGroupIds": [g.strip() for g in row.get("subject_group_ids", "").split(";") if g.strip()],
+            })
+    if errors:
+        raise CatalogImportError(errors)
+    return {"schools": list(schools.values()), "subjectCombinations": []}
+
+
+def parse_catalog_file(content: bytes, filename: str) -> dict:
+    """Đọc và kiểm tra tệp nhập. Trả về {"schools": [SchoolCreateSchema], "subjectCombinations": [...]}."""
+    try:
+        text = content.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise CatalogImportError(["Tệp phải được mã hóa UTF-8"])
+
+    if filename.lower().endswith(".csv"):
+        raw = _parse_csv(text)
+    else:
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise CatalogImportError([f"JSON không hợp lệ: {e}"])
+        raw = {"schools": data, "subjectCombinations": []} if isinstance(data, list) else data
+        if not isinstance(raw, dict):
+            raise CatalogImportError(["JSON phải là danh sách trường hoặc object có khóa schools / subjectCombinations"])
+
+    errors, schools, combinations = [], [], []
+    for index, item in enumerate(raw.get("schools") or []):
+        try:
+            schools.append(SchoolCreateSchema.model_validate(item))
+        except ValidationError as e:
+            errors.extend(_validation_errors(f"schools[{index}]", e))
+    for index, item in enumerate(raw.get("subjectCombinations") or []):
+        try:
+            combinations.append(SubjectCombinationImportSchema.model_validate(item))
+        except ValidationError as e:
+            errors.extend(_validation_errors(f"subjectCombinations[{index}]", e))
+
+    for label, items in (("Trường", schools), ("Tổ hợp môn", combinations)):
+        seen = set()
+        for item in items:
+            if item.code in seen:
+                errors.append(f"{label} '{item.code}' bị lặp trong tệp")
+            seen.add(item.code)
+    for school in schools:
+        major_codes = [major.code for major in school.majors]
+        for code in {c for c in major_codes if major_codes.count(c) > 1}:
+            errors.append(f"Ngành '{code}' bị lặp trong trường '{school.code}'")
+
+    if errors:
+        raise CatalogImportError(errors)
+    return {"schools": schools, "subjectCombinations": combinations}
+
+
+def _school_document(school: SchoolCreateSchema) -> dict:
+    # Ngành được lưu theo alias (subjectGroupIds), giống API tạo / cập nhật trường
+    return {"code": school.code, "name": school.name, "majors": [major.model_dump(by_alias=True) for major in school.majors]}
+
+
+def _normalize_majors(majors: list) -> list:
+    # Dữ liệu cũ có thể lưu subject_group_ids thay cho subjectGroupIds
+    return [
+        {
+            "code": major.get("code"),
+            "name": major.get("name"),
+            "subjectGroupIds": major.get("subjectGroupIds", major.get("subject_group_ids")) or [],
+        }
+        for major in majors or []
+    ]
+
+
+def _diff_school(current: dict, new: dict) -> list:
+    changes = []
+    if current.get("name") != new["name"]:
+        changes.append(f"name: '{current.get('name')}' -> '{new['name']}'")
+    current_majors = {m["code"]: m for m in _normalize_majors(current.get("majors"))}
+    new_majors = {m["code"]: m for m in new["majors"]}
+    for code in new_majors.keys() - current_majors.keys():
+        changes.append(f"thêm ngành {code}")
+    for code in current_majors.keys() - new_majors.keys():
+        changes.append(f"xóa ngành {code}")
+    for code in new_majors.keys() & current_majors.keys():
+        if new_majors[code] != current_majors[code]:
+            changes.append(f"sửa ngành {code}")
+    if not changes and _normalize_majors(current.get("majors")) != new["majors"]:
+        changes.append("đổi thứ tự ngành")
+    return changes
+
+
+async def diff_catalog(parsed: dict, delete_missing: bool = False) -> dict:
+    """So sánh tệp nhập với danh mục hiện tại trong DB. Không ghi gì."""
+    current_schools = {s["code"]: s for s in await school_crud.find_schools({}, {"_id": 0})}
+    current_combinations = {c["code"]: c for c in await school_crud.find_subject_combinations({"_id": 0})}
+
+    # Mọi mã tổ hợp được ngành tham chiếu phải tồn tại (trong DB hoặc trong chính tệp nhập)
+    known_groups = current_combinations.keys() | {c.code for c in parsed["subjectCombinations"]}
+    errors = [
+        f"Trường '{school.code}', ngành '{major.code}': tổ hợp '{group}' không tồn tại"
+        for school in parsed["schools"]
+        for major in school.majors
+        for group in major.subject_group_ids
+        if group not in known_groups
+    ]
+    if errors:
+        raise CatalogImportError(errors)
+
+    report = {
+        "schools": {"inserted": [], "updated": [], "unchanged": 0, "deleted": []},
+        "subjectCombinations": {"inserted": [], "updated": [], "unchanged": 0, "deleted": []},
+    }
+    documents = {"schools": {}, "subjectCombinations": {}}
+
+    for school in parsed["schools"]:
+        document = _school_document(school)
+        current = current_schools.get(school.code)
+        if current is None:
+            report["schools"]["inserted"].append(school.code)
+        else:
+            changes = _diff_school(current, document)
+            if not changes:
+                report["schools"]["unchanged"] += 1
+                continue
+            report["schools"]["updated"].append({"code": school.code, "changes": changes})
+        documents["schools"][school.code] = document
+
+    for combination in parsed["subjectCombinations"]:
+        document = combination.model_dump()
+        current = current_combinations.get(combination.code)
+        if current is None:
+            report["subjectCombinations"]["inserted"].append(combination.code)
+        elif {k: current.get(k) for k in document} == document:
+            report["subjectCombinations"]["unchanged"] += 1
+            continue
+        else:
+            report["subjectCombinations"]["updated"].append({"code": combination.code, "changes": [
+                k for k in document if current.get(k) != document[k]
+            ]})
+        documents["subjectCombinations"][combination.code] = document
+
+    if delete_missing:
+        imported_schools = {s.code for s in parsed["schools"]}
+        report["schools"]["deleted"] = sorted(current_schools.keys() - imported_schools)
+        if parsed["subjectCombinations"]:
+            imported_combinations = {c.code for c in parsed["subjectCombinations"]}
+            report["subjectCombinations"]["deleted"] = sorted(current_combinations.keys() - imported_combinations)
+
+    return {"report": report, "documents": documents}
+
+
+async def _bulk_write_in_batches(write_fn, operations: list):
+    for start in range(0, len(operations), IMPORT_BATCH_SIZE):
+        await write_fn(operations[start:start + IMPORT_BATCH_SIZE])
+
+
+async def apply_catalog_diff(diff: dict) -> list:
+    """
+    Ghi kết quả `diff_catalog` vào DB bằng bulk_write (upsert theo code) rồi làm mới cache danh mục.
+    Trả về danh sách (mã trường, tên trường, danh sách ngành) cần đồng bộ tên sang hồ sơ.
+    """
+    report, documents = diff["report"], diff["documents"]
+
+    combination_ops = [
+        UpdateOne({"code": code}, {"$set": document}, upsert=True)
+        for code, document in documents["subjectCombinations"].items()
+    ] + [DeleteOne({"code": code}) for code in report["subjectCombinations"]["deleted"]]
+    await _bulk_write_in_batches(school_crud.bulk_write_subject_combinations, combination_ops)
+
+    school_ops = [
+        UpdateOne({"code": code}, {"$set": document}, upsert=True)
+        for code, document in documents["schools"].items()
+    ] + [DeleteOne({"code": code}) for code in report["schools"]["deleted"]]
+    await _bulk_write_in_batches(school_crud.bulk_write_schools, school_ops)
+
+    if combination_ops or school_ops:
+        await invalidate_catalog()
+
+    return [
+        (item["code"], documents["schools"][item["code"]]["name"], documents["schools"][item["code"]]["majors"])
+        for item in report["schools"]["updated"]
+    ]
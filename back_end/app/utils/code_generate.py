@@ -1,10 +1,58 @@
 # app/utils/code_generate.py
-import uuid
+"""
+Cấp mã hồ sơ duy nhất dạng HS-0000001 (hoặc HS-2026-0000001 khi cấu hình mùa tuyển sinh).
 
-def generate_application_code():
-    """
-    Tạo một mã hồ sơ duy nhất có định dạng HS-XXXXXXXX.
-    Bạn có thể tùy chỉnh logic tạo mã ở đây nếu muốn.
-    """
-    return f"HS-{uuid.uuid4().hex[:8].upper()}"
+Mỗi worker giữ chỗ một khối số liên tiếp trong collection `counters` bằng một lệnh $inc
+nguyên tử rồi phát dần từ bộ nhớ, nên việc nộp hồ sơ không cần đọc-rồi-ghi để kiểm tra trùng.
+Số thuộc khối chưa dùng hết khi worker dừng sẽ bị bỏ qua (mã có thể không liên tục).
+Index unique trên `applicationCode` vẫn là chốt chặn cuối (ví dụ trùng với mã ngẫu nhiên cũ).
+"""
+import asyncio
+import os
 
+from app.crud.counter_crud import reserve_sequence_block
+
+CODE_PREFIX = "HS"
+# Ví dụ APPLICATION_CODE_SEASON=2026; để trống thì không gắn mùa vào mã
+APPLICATION_CODE_SEASON = os.getenv("APPLICATION_CODE_SEASON", "")
+# true: mỗi trường có dãy số riêng, mã có dạng HS-2026-BKA-0000001
+APPLICATION_CODE_SCHOOL_PREFIX = os.getenv("APPLICATION_CODE_SCHOOL_PREFIX", "false").lower() == "true"
+# Số mã một worker giữ chỗ mỗi lần truy cập DB
+APPLICATION_CODE_BLOCK_SIZE = int(os.getenv("APPLICATION_CODE_BLOCK_SIZE", "50"))
+SEQUENCE_DIGITS = 7
+
+
+class ApplicationCodeAllocator:
+    def __init__(self, block_size: int = APPLICATION_CODE_BLOCK_SIZE):
+        self.block_size = block_size
+        # Tên bộ đếm -> [số kế tiếp, số cuối của khối đang giữ]
+        self._blocks = {}
+        self._lock = asyncio.Lock()
+
+    async def next_value(self, counter_name: str) -> int:
+        async with self._lock:
+            block = self._blocks.get(counter_name)
+            if block is None or block[0] > block[1]:
+                block = list(await reserve_sequence_block(counter_name, self.block_size))
+                self._blocks[counter_name] = block
+            value = block[0]
+            block[0] += 1
+            return value
+
+    async def allocate(self, school_code: str = None) -> str:
+        parts = [CODE_PREFIX]
+        if APPLICATION_CODE_SEASON:
+            parts.append(APPLICATION_CODE_SEASON)
+        if APPLICATION_CODE_SCHOOL_PREFIX and school_code:
+            parts.append(school_code.upper())
+        counter_name = "applicationCode:" + "-".join(parts)
+        value = await self.next_value(counter_name)
+        return "-".join(parts + [str(value).zfill(SEQUENCE_DIGITS)])
+
+
+application_code_allocator = ApplicationCodeAllocator()
+
+
+async def generate_application_code(school_code: str = None):
+    """Tạo một mã hồ sơ duy nhất (xem docstring của module về định dạng)."""
+    return await application_code_allocator.allocate(school_code)
@@ -0,0 +1,48 @@
+# app/utils/export.py
+"""
+Chuyển luồng document (async iterator) thành các khối CSV / NDJSON để trả bằng StreamingResponse.
+Dữ liệu được gom thành khối khoảng CHUNK_SIZE byte rồi gửi đi, không giữ toàn bộ kết quả trong bộ nhớ.
+"""
+import csv
+import io
+from datetime import datetime
+
+import orjson
+
+CHUNK_SIZE = 64 * 1024
+
+
+def _cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+async def csv_chunks(documents, columns: list):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # BOM để Excel nhận đúng tiếng Việt (UTF-8)
+    buffer.write("\ufeff")
+    writer.writerow(columns)
+    async for document in documents:
+        writer.writerow([_cell(document.get(column)) for column in columns])
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+async def ndjson_chunks(documents, columns: list):
+    chunk = bytearray()
+    async for document in documents:
+        chunk += orjson.dumps({column: document.get(column) for column in columns})
+        chunk += b"\n"
+        if len(chunk) >= CHUNK_SIZE:
+            yield bytes(chunk)
+            chunk.clear()
+    if chunk:
+        yield bytes(chunk)
@@ -0,0 +1,51 @@
+# app/utils/file_access.py
+"""
+Quyền truy cập tệp đính kèm (ảnh CCCD, học bạ...): thư mục uploads không còn được phục vụ công khai.
+
+Endpoint chi tiết hồ sơ (đã kiểm tra chủ hồ sơ / quyền admin) đổi mỗi tham chiếu blob thành một URL
+ký HMAC có hạn dùng tới endpoint GET /api/v1/file/download/..., nên thẻ <img> / link PDF dùng được
+mà không cần gửi header Authorization.
+
+Hạn dùng được làm tròn lên theo cửa sổ FILE_URL_TTL_SECONDS: cùng một tệp nhận cùng một URL trong
+suốt cửa sổ, nhờ đó trình duyệt dùng lại bản đã cache khi mở lại hồ sơ.
+"""
+import base64
+import hashlib
+import hmac
+import math
+import time
+from urllib.parse import quote
+
+from app.core.config import FILE_URL_SECRET, FILE_URL_TTL_SECONDS
+from app.utils.blob_store import BLOB_URL_PREFIX, parse_blob_ref
+
+DOWNLOAD_URL_PREFIX = "/api/v1/file/download/"
+
+
+def _signature(relative_path: str, expires: int) -> str:
+    digest = hmac.new(FILE_URL_SECRET.encode(), f"{relative_path}:{expires}".encode(), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+
+def _expires_at(now: float = None) -> int:
+    now = time.time() if now is None else now
+    # Còn hiệu lực ít nhất FILE_URL_TTL_SECONDS, tối đa gấp đôi
+    return (math.floor(now / FILE_URL_TTL_SECONDS) + 2) * FILE_URL_TTL_SECONDS
+
+
+def signed_url(ref: str, now: float = None) -> str:
+    """
+    URL tải có chữ ký cho tham chiếu blob `ref` (kể cả phiên bản review / thumb).
+    Giá trị không phải tham chiếu blob (URL ngoài, dữ liệu cũ) được giữ nguyên.
+    """
+    if parse_blob_ref(ref) is None:
+        return ref
+    relative_path = ref[len(BLOB_URL_PREFIX):]
+    expires = _expires_at(now)
+    return f"{DOWNLOAD_URL_PREFIX}{relative_path}?expires={expires}&sig={quote(_signature(relative_path, expires))}"
+
+
+def verify_signed_path(relative_path: str, expires: int, signature: str) -> bool:
+    if expires < time.time():
+        return False
+    return hmac.compare_digest(_signature(relative_path, expires), signature)
@@ -0,0 +1,99 @@
+# app/utils/image_processing.py
+"""
+Chuẩn hóa ảnh tải lên (CCCD, học bạ): ảnh chụp điện thoại 8-12 MB được giải mã, xoay đúng chiều
+theo EXIF rồi bỏ EXIF (vị trí GPS, thông tin máy), thu nhỏ và nén lại thành hai phiên bản lưu cạnh tệp gốc:
+- review: cạnh dài tối đa REVIEW_MAX_SIDE, dùng khi admin xem hồ sơ;
+- thumb: cạnh dài tối đa THUMB_MAX_SIDE, dùng cho danh sách / ô xem trước.
+Tệp gốc được giữ nguyên để tải về khi cần.
+
+Giải mã / nén ảnh tốn CPU nên chạy trong process pool riêng (`image_pool`).
+"""
+import os
+import tempfile
+
+from PIL import Image, ImageOps
+
+from app.utils.blob_store import is_image_ref, parse_blob_ref, blob_path, variant_path, IMAGE_VARIANTS
+from app.utils.process_pool import BoundedProcessPool, PoolSaturatedError
+
+REVIEW_MAX_SIDE = int(os.getenv("IMAGE_REVIEW_MAX_SIDE", "1600"))
+THUMB_MAX_SIDE = int(os.getenv("IMAGE_THUMB_MAX_SIDE", "320"))
+VARIANT_SETTINGS = {
+    "review": {"max_side": REVIEW_MAX_SIDE, "quality": 82},
+    "thumb": {"max_side": THUMB_MAX_SIDE, "quality": 70},
+}
+# Từ chối ảnh quá lớn khi giải mã (chống "decompression bomb")
+MAX_IMAGE_PIXELS = 60_000_000
+
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+IMAGE_MAX_PENDING = int(os.getenv("IMAGE_MAX_PENDING", str(IMAGE_WORKERS * 16)))
+image_pool = BoundedProcessPool("image", IMAGE_WORKERS, IMAGE_MAX_PENDING)
+
+
+def _save_jpeg(image: Image.Image, path: str, quality: int) -> int:
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as buffer:
+            # Không truyền exif=... nên ảnh đầu ra không mang EXIF
+            image.save(buffer, "JPEG", quality=quality, optimize=True, progressive=True)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return os.path.getsize(path)
+
+
+def make_variants(source_path: str, digest: str) -> dict:
+    """
+    Tạo các phiên bản review / thumb cho ảnh `source_path`. Chạy trong tiến trình con.
+    Trả về kích thước (byte) của tệp gốc và từng phiên bản.
+    """
+    Image.MAX_IMAGE_PIXELS = MAX_IMAGE_PIXELS
+    sizes = {"original": os.path.getsize(source_path)}
+    with Image.open(source_path) as image:
+        # JPEG: giải mã thẳng ở độ phân giải nhỏ hơn (nhanh hơn nhiều so với giải mã đầy đủ rồi thu nhỏ)
+        image.draft("RGB", (REVIEW_MAX_SIDE, REVIEW_MAX_SIDE))
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "L"):
+            background = Image.new("RGB", image.size, "white")
+            background.paste(image, mask=image.convert("RGBA").getchannel("A"))
+            image = background
+        for variant in IMAGE_VARIANTS:
+            settings = VARIANT_SETTINGS[variant]
+            resized = image.copy()
+            resized.thumbnail((settings["max_side"], settings["max_side"]), Image.Resampling.LANCZOS)
+            sizes[variant] = _save_jpeg(resized, variant_path(digest, variant), settings["quality"])
+            image = resized  # thumb được thu nhỏ tiếp từ review
+    return sizes
+
+
+def _has_variants(digest: str) -> bool:
+    return all(os.path.exists(variant_path(digest, variant)) for variant in IMAGE_VARIANTS)
+
+
+async def ensure_image_variants(ref: str):
+    """
+    Tạo phiên bản review / thumb cho ảnh `ref` nếu chưa có. Trả về kích thước các tệp, None nếu bỏ qua.
+    Không bao giờ báo lỗi: ảnh hỏng hoặc pool quá tải thì giữ nguyên ảnh gốc (có thể tạo lại bằng
+    python -m app.scripts.generate_image_variants).
+    """
+    if not is_image_ref(ref):
+        return None
+    digest, ext = parse_blob_ref(ref)
+    source_path = blob_path(digest, ext)
+    if _has_variants(digest) or not os.path.exists(source_path):
+        return None
+    try:
+        return await image_pool.run(make_variants, source_path, digest)
+    except PoolSaturatedError:
+        print(f"[image] Pool ảnh quá tải, bỏ qua chuẩn hóa {ref}")
+    except Exception as e:
+        print(f"[image] Không chuẩn hóa được ảnh {ref}: {e}")
+    return None
+
+
+async def ensure_variants_for_refs(refs: list):
+    for ref in dict.fromkeys(refs):
+        await ensure_image_variants(ref)
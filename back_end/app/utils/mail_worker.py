@@ -0,0 +1,146 @@
+# app/utils/mail_worker.py
+"""
+Worker nền gửi email từ collection `email_outbox`.
+
+- Nhận email theo lô (claim có thời hạn giữ, nhiều worker có thể chạy song song).
+- Gửi qua một kết nối SMTP đã STARTTLS + đăng nhập, dùng lại giữa các lô.
+- Lỗi thì thử lại với thời gian chờ tăng dần; quá MAX_ATTEMPTS lần chuyển sang trạng thái `dead`.
+
+Thử nghiệm cục bộ: chạy một SMTP giả lập (ví dụ `python -m aiosmtpd -n -l localhost:1025`)
+và đặt SMTP_HOST=localhost SMTP_PORT=1025 SMTP_STARTTLS=false, để trống SMTP_USER / SMTP_PASS
+(địa chỉ người gửi lấy từ SMTP_FROM).
+"""
+import asyncio
+import smtplib
+import time
+from datetime import datetime, timedelta
+
+from app.core.config import SMTP_HOST, SMTP_PORT, SMTP_STARTTLS, SMTP_USER, SMTP_PASS, SMTP_FROM
+from app.crud.outbox_crud import claim_emails, mark_emails_sent, mark_email_failed
+from app.utils.mailer import build_mime_message
+
+BATCH_SIZE = 20
+POLL_INTERVAL_SECONDS = 2
+LEASE_SECONDS = 120
+MAX_ATTEMPTS = 6
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 3600
+# Đóng kết nối SMTP nếu không dùng trong khoảng này (máy chủ thường tự ngắt sau vài phút)
+IDLE_DISCONNECT_SECONDS = 60
+
+
+def retry_time(attempts: int):
+    """Thời điểm thử lại sau lần thử thứ `attempts` bị lỗi, None nếu đã hết lượt (dead-letter)."""
+    if attempts >= MAX_ATTEMPTS:
+        return None
+    delay = min(BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), BACKOFF_MAX_SECONDS)
+    return datetime.utcnow() + timedelta(seconds=delay)
+
+
+class SMTPConnection:
+    """Kết nối SMTP dùng lại; mọi phương thức đều chặn nên được gọi qua asyncio.to_thread."""
+
+    def __init__(self, host: str, port: int, starttls: bool, user: str, password: str, sender: str):
+        self.host = host
+        self.port = port
+        self.starttls = starttls
+        self.user = user
+        self.password = password
+        self.sender = sender
+        self._server = None
+        self._last_used = 0.0
+
+    def _connect(self):
+        server = smtplib.SMTP(self.host, self.port, timeout=30)
+        if self.starttls:
+            server.starttls()
+        if self.user:
+            server.login(self.user, self.password)
+        self._server = server
+
+    def _ensure_connected(self):
+        if self._server is not None and time.monotonic() - self._last_used > IDLE_DISCONNECT_SECONDS:
+            try:
+                self._server.noop()
+            except smtplib.SMTPException:
+                self.close()
+        if self._server is None:
+            self._connect()
+
+    def send_batch(self, messages: list) -> list:
+        """
+        Gửi lần lượt trên cùng kết nối. Trả về danh sách lỗi tương ứng (None nếu gửi thành công).
+        Lỗi của một email (kể cả lỗi dựng nội dung) chỉ đánh dấu email đó, các email còn lại vẫn được gửi.
+        """
+        errors = []
+        for message in messages:
+            try:
+                self._ensure_connected()
+                self._server.sendmail(self.sender, message["to"], build_mime_message(message).as_string())
+                errors.append(None)
+            except (smtplib.SMTPServerDisconnected, OSError) as e:
+                # Mất kết nối: lần gửi sau sẽ kết nối lại
+                self.close()
+                errors.append(str(e) or e.__class__.__name__)
+            except Exception as e:
+                errors.append(str(e) or e.__class__.__name__)
+            self._last_used = time.monotonic()
+        return errors
+
+    def close(self):
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._server = None
+
+
+class OutboxWorker:
+    def __init__(self):
+        self.connection = SMTPConnection(SMTP_HOST, SMTP_PORT, SMTP_STARTTLS, SMTP_USER, SMTP_PASS, SMTP_FROM)
+        self._task = None
+        self._stopping = asyncio.Event()
+
+    def start(self):
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._stopping.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        await asyncio.to_thread(self.connection.close)
+
+    async def drain_once(self) -> int:
+        """Gửi một lô email đến hạn, trả về số email đã nhận xử lý."""
+        lease_token, batch = await claim_emails(BATCH_SIZE, LEASE_SECONDS, MAX_ATTEMPTS)
+        if not batch:
+            return 0
+        errors = await asyncio.to_thread(self.connection.send_batch, batch)
+        await mark_emails_sent([m["_id"] for m, error in zip(batch, errors) if error is None], lease_token)
+        for message, error in zip(batch, errors):
+            if error is not None:
+                # `attempts` đã được tăng khi nhận email
+                retry_at = retry_time(message["attempts"])
+                await mark_email_failed(message, error, retry_at, lease_token)
+                if retry_at is None:
+                    print(f"[mail] Email {message['_id']} tới {message['to']} chuyển sang dead-letter: {error}")
+        return len(batch)
+
+    async def _run(self):
+        while not self._stopping.is_set():
+            try:
+                processed = await self.drain_once()
+            except Exception as e:
+                print(f"[mail] Lỗi worker gửi email: {e}")
+                processed = 0
+            if processed < BATCH_SIZE:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=POLL_INTERVAL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+
+
+outbox_worker = OutboxWorker()
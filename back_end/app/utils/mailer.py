@@ -1,49 +1,47 @@
 # app/utils/mailer.py
-import smtplib
+# Các hàm ở đây không gửi email trực tiếp: chúng tạo nội dung và đưa vào hàng đợi `email_outbox`.
+# Worker nền (app/utils/mail_worker.py) gửi email qua một kết nối SMTP dùng lại, có thử lại và dead-letter.
 from email.mime.text import MIMEText
-# --- THÊM DÒNG IMPORT NÀY ---
 from email.mime.multipart import MIMEMultipart
-# -----------------------------
-import os
 
-# Lấy thông tin cấu hình từ biến môi trường
-SMTP_USER = os.getenv("SMTP_USER")
-SMTP_PASS = os.getenv("SMTP_PASS")
-SMTP_HOST = "smtp.gmail.com"
-SMTP_PORT = 587
+from app.core.config import SMTP_FROM
+from app.crud.outbox_crud import enqueue_email, enqueue_emails
 
-# --- CÁC HÀM GỬI EMAIL CŨ (Giữ nguyên nếu có) ---
+def build_mime_message(message: dict):
+    """Dựng email MIME từ một bản ghi trong outbox."""
+    if message.get("subtype") == "html":
+        msg = MIMEMultipart('alternative')
+        msg.attach(MIMEText(message["body"], 'html'))
+    else:
+        msg = MIMEText(message["body"])
+    msg['Subject'] = message["subject"]
+    msg['From'] = message.get("from") or SMTP_FROM
+    msg['To'] = message["to"]
+    return msg
 
-def send_verify_email(to_email: str, verify_link: str):
-    subject = "Xác nhận đăng ký tài khoản"
-    body = f"Vui lòng xác nhận tài khoản bằng cách click vào link: {verify_link}"
-    msg = MIMEText(body)
-    msg['Subject'] = subject
-    msg['From'] = SMTP_USER
-    msg['To'] = to_email
-    with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
-      server.starttls()
-      server.login(SMTP_USER, SMTP_PASS)
-      server.sendmail(SMTP_USER, to_email, msg.as_string())
+# --- EMAIL TÀI KHOẢN ---
 
-def send_reset_password_email(to_email: str, reset_link: str):
-    subject = "Đặt lại mật khẩu"
-    body = f"Bạn đã yêu cầu đặt lại mật khẩu. Vui lòng click vào link sau để đổi mật khẩu (có hiệu lực trong 1h): {reset_link}"
-    msg = MIMEText(body)
-    msg['Subject'] = subject
-    msg['From'] = SMTP_USER
-    msg['To'] = to_email
-    with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
+async def send_verify_email(to_email: str, verify_link: str):
+    await enqueue_email({
+        "type": "verify_email",
+        "to": to_email,
+        "subject": "Xác nhận đăng ký tài khoản",
+        "body": f"Vui lòng xác nhận tài khoản bằng cách click vào link: {verify_link}",
+        "subtype": "plain",
+    })
 
-      server.starttls()
+async def send_reset_password_email(to_email: str, reset_link: str):
+    await enqueue_email({
+        "type": "reset_password",
+        "to": to_email,
+        "subject": "Đặt lại mật khẩu",
+        "body": f"Bạn đã yêu cầu đặt lại mật khẩu. Vui lòng click vào link sau để đổi mật khẩu (có hiệu lực trong 1h): {reset_link}",
+        "subtype": "plain",
+    })
 
-      server.login(SMTP_USER, SMTP_PASS)
+# --- EMAIL THÔNG BÁO TRẠNG THÁI HỒ SƠ ---
 
-      server.sendmail(SMTP_USER, to_email, msg.as_string())
-
-# --- HÀM GỬI EMAIL THÔNG BÁO TRẠNG THÁI HỒ SƠ ---
-
-def send_application_status_email(
+def build_application_status_email(
     to_email: str, 
     full_name: str, 
     application_code: str, 
@@ -51,7 +49,7 @@ def send_application_status_email(
     detail_link: str
 ):
     """
-    Gửi email thông báo cho thí sinh khi trạng thái hồ sơ thay đổi.
+    Tạo nội dung email thông báo cho thí sinh khi trạng thái hồ sơ thay đổi.
     """
     subject = f"Thông báo kết quả hồ sơ tuyển sinh mã số {application_code}"
     
@@ -85,21 +83,27 @@ def send_application_status_email(
     </html>
     """
 
-    # Tạo đối tượng email
-    msg = MIMEMultipart('alternative')
-    msg['Subject'] = subject
-    msg['From'] = f"Hệ thống tuyển sinh <{SMTP_USER}>"
-    msg['To'] = to_email
-    
-    # Đính kèm phần HTML vào email
-    msg.attach(MIMEText(html_body, 'html'))
+    return {
+        "type": "application_status",
+        "to": to_email,
+        "from": f"Hệ thống tuyển sinh <{SMTP_FROM}>",
+        "subject": subject,
+        "body": html_body,
+        "subtype": "html",
+    }
+
+async def send_application_status_email(
+    to_email: str, 
+    full_name: str, 
+    application_code: str, 
+    new_status_display: str,
+    detail_link: str
+):
+    await enqueue_email(build_application_status_email(
+        to_email, full_name, application_code, new_status_display, detail_link
+    ))
 
-    try:
-        with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
-            server.starttls()
-            server.login(SMTP_USER, SMTP_PASS)
-            server.sendmail(SMTP_USER, to_email, msg.as_string())
-        print(f"Đã gửi email thông báo trạng thái đến {to_email} thành công.")
-    except Exception as e:
-        print(f"Lỗi khi gửi email đến {to_email}: {e}")
 
+async def send_application_status_emails(messages: list):
+    """Đưa nhiều email (tạo bởi build_application_status_email) vào hàng đợi trong một lần ghi."""
+    await enqueue_emails(messages)
@@ -0,0 +1,156 @@
+# app/utils/metrics.py
+"""
+Số liệu HTTP theo route ở định dạng text của Prometheus, không cần thư viện ngoài.
+
+- `MetricsMiddleware` (ASGI thuần) ghi cho mỗi request: số request theo mã trạng thái,
+  histogram thời gian xử lý, histogram kích thước response và số request đang xử lý.
+  Nhãn `route` là đường dẫn mẫu của route (ví dụ /api/v2/application/{application_code}),
+  không phải đường dẫn thật, để số chuỗi thời gian không tăng theo mã hồ sơ.
+- `render_metrics()` trả về nội dung cho endpoint /metrics.
+
+Số liệu nằm trong bộ nhớ của từng worker; khi chạy nhiều worker, Prometheus cần scrape từng worker
+(hoặc cộng dồn ở phía Prometheus).
+"""
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+# Request không khớp route nào (404, static files...) được gộp chung một nhãn
+UNMATCHED_ROUTE = "unmatched"
+
+# Scope ASGI của request đang xử lý; các phần khác (ví dụ giám sát lệnh MongoDB) đọc route từ đây
+current_scope: ContextVar = ContextVar("current_scope", default=None)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{str(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, label_names: tuple):
+        self.name, self.documentation, self.label_names = name, documentation, label_names
+        self._values = {}
+
+    def inc(self, labels: tuple, amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    def dec(self, labels: tuple, amount: float = 1):
+        self.inc(labels, -amount)
+
+    def render(self) -> list:
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, label_names: tuple, buckets: tuple):
+        self.name, self.documentation, self.label_names = name, documentation, label_names
+        self.buckets = tuple(buckets)
+        # labels -> [số lần rơi vào từng bucket (không cộng dồn, phần tử cuối là +Inf), tổng, số lần]
+        self._values = {}
+
+    def observe(self, labels: tuple, value: float):
+        state = self._values.get(labels)
+        if state is None:
+            state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0, 0]
+        state[0][bisect_left(self.buckets, value)] += 1
+        state[1] += value
+        state[2] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total, count) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += bucket_count
+                le = 'le="+Inf"' if bound == "+Inf" else f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, labels)} {count}")
+        return lines
+
+
+REQUESTS_TOTAL = Counter("http_requests_total", "Số request HTTP đã xử lý.", ("method", "route", "status"))
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "Thời gian xử lý request HTTP (giây).", ("method", "route"), LATENCY_BUCKETS
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes", "Kích thước body của response HTTP (byte).", ("method", "route"), SIZE_BUCKETS
+)
+REQUESTS_IN_PROGRESS = Gauge("http_requests_in_progress", "Số request HTTP đang xử lý.", ("method",))
+
+REGISTRY = [REQUESTS_TOTAL, REQUEST_DURATION, RESPONSE_SIZE, REQUESTS_IN_PROGRESS]
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def route_template(scope) -> str:
+    """Đường dẫn mẫu của route FastAPI đã xử lý request (router ghi `route` vào scope khi khớp)."""
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+def current_route():
+    """Route mẫu của request hiện tại, None nếu không chạy trong một request (worker nền, script)."""
+    scope = current_scope.get()
+    return route_template(scope) if scope is not None else None
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        response_size = 0
+
+        async def send_wrapper(message):
+            nonlocal status_code, response_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+
+        REQUESTS_IN_PROGRESS.inc((method,))
+        token = current_scope.set(scope)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_scope.reset(token)
+            duration = time.perf_counter() - started
+            REQUESTS_IN_PROGRESS.dec((method,))
+            route = route_template(scope)
+            REQUESTS_TOTAL.inc((method, route, status_code))
+            REQUEST_DURATION.observe((method, route), duration)
+            RESPONSE_SIZE.observe((method, route), response_size)
@@ -0,0 +1,49 @@
+# app/utils/pagination.py
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from bson import ObjectId, json_util
+from bson.errors import InvalidId
+from cachetools import TTLCache
+
+# Tổng số bản ghi ở chế độ con trỏ chỉ là số liệu tham khảo nên được cache ngắn hạn
+COUNT_CACHE_TTL_SECONDS = 30
+_count_cache = TTLCache(maxsize=1024, ttl=COUNT_CACHE_TTL_SECONDS)
+
+
+def encode_cursor(updated_at: datetime, object_id: ObjectId) -> str:
+    """Mã hóa vị trí (updated_at, _id) của bản ghi cuối trang thành chuỗi con trỏ."""
+    raw = json.dumps({"t": updated_at.isoformat(), "id": str(object_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """Giải mã con trỏ, ném ValueError nếu con trỏ không hợp lệ."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(data["t"]), ObjectId(data["id"])
+    except (binascii.Error, ValueError, KeyError, TypeError, InvalidId):
+        raise ValueError("Con trỏ phân trang không hợp lệ")
+
+
+def keyset_condition(updated_at: datetime, object_id: ObjectId) -> dict:
+    """Điều kiện lấy các bản ghi đứng sau (updated_at, _id) theo thứ tự giảm dần."""
+    return {
+        "$or": [
+            {"updated_at": {"$lt": updated_at}},
+            {"updated_at": updated_at, "_id": {"$lt": object_id}},
+        ]
+    }
+
+
+async def cached_count(match_stage: dict, count):
+    """Đếm số bản ghi khớp bộ lọc, dùng lại kết quả trong COUNT_CACHE_TTL_SECONDS giây."""
+    key = json_util.dumps(match_stage, sort_keys=True)
+    total = _count_cache.get(key)
+    if total is None:
+        total = await count(match_stage)
+        _count_cache[key] = total
+    return total
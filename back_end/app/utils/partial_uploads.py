@@ -0,0 +1,78 @@
+# app/utils/partial_uploads.py
+"""
+Tệp tải dở của API tải theo từng phần (uploads/partial/<uploadId>.part) và việc dọn phiên bị bỏ dở.
+
+`sweep_partial_uploads` xóa bản ghi `upload_sessions` không được dùng quá UPLOAD_SESSION_TTL_SECONDS,
+mọi tệp tải dở cũ hơn thời hạn đó, và tệp .part không còn bản ghi phiên tương ứng.
+Chạy định kỳ (ví dụ cron mỗi giờ) bằng app/scripts/sweep_partial_uploads.py.
+"""
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta
+
+from app.core.config import UPLOAD_DIR
+from app.crud.upload_crud import delete_upload_sessions_before, find_upload_session_ids
+
+# Cùng ổ đĩa với blob store để đổi tên nguyên tử khi hoàn tất
+PARTIAL_DIR = os.path.join(UPLOAD_DIR, "partial")
+PARTIAL_SUFFIX = ".part"
+# Tệp tạm của API /upload (tải một lần), không thuộc phiên nào
+DIRECT_UPLOAD_SUFFIX = ".tmp"
+# Phiên tải không hoạt động quá thời gian này bị coi là bỏ dở
+UPLOAD_SESSION_TTL_SECONDS = 2 * 24 * 3600
+# Số uploadId kiểm tra trong một truy vấn
+SWEEP_BATCH_SIZE = 1000
+
+os.makedirs(PARTIAL_DIR, exist_ok=True)
+
+
+def partial_path(upload_id: str) -> str:
+    return os.path.join(PARTIAL_DIR, f"{upload_id}{PARTIAL_SUFFIX}")
+
+
+def remove_partial(path: str) -> bool:
+    try:
+        os.remove(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def _list_partial_files() -> list:
+    """(tên tệp, đường dẫn, mtime) của các tệp tải dở."""
+    files = []
+    with os.scandir(PARTIAL_DIR) as entries:
+        for entry in entries:
+            if entry.is_file() and entry.name.endswith((PARTIAL_SUFFIX, DIRECT_UPLOAD_SUFFIX)):
+                try:
+                    files.append((entry.name, entry.path, entry.stat().st_mtime))
+                except FileNotFoundError:
+                    pass  # Vừa được hoàn tất / hủy
+    return files
+
+
+async def sweep_partial_uploads(ttl_seconds: int = UPLOAD_SESSION_TTL_SECONDS) -> int:
+    """Dọn phiên tải bỏ dở, trả về số tệp đã xóa."""
+    await delete_upload_sessions_before(datetime.utcnow() - timedelta(seconds=ttl_seconds))
+
+    cutoff = time.time() - ttl_seconds
+    expired, sessions = [], {}
+    for name, path, mtime in await asyncio.to_thread(_list_partial_files):
+        if mtime < cutoff:
+            expired.append(path)
+        elif name.endswith(PARTIAL_SUFFIX):
+            sessions[name[:-len(PARTIAL_SUFFIX)]] = path
+
+    # Bản ghi phiên được tạo trước tệp .part, nên tệp không còn bản ghi là của phiên đã hết hạn / bị xóa
+    orphaned = []
+    upload_ids = list(sessions)
+    for start in range(0, len(upload_ids), SWEEP_BATCH_SIZE):
+        batch = upload_ids[start:start + SWEEP_BATCH_SIZE]
+        existing = await find_upload_session_ids(batch)
+        orphaned.extend(sessions[upload_id] for upload_id in batch if upload_id not in existing)
+
+    removed = 0
+    for path in expired + orphaned:
+        removed += await asyncio.to_thread(remove_partial, path)
+    return removed
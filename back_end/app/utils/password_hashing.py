@@ -0,0 +1,26 @@
+# app/utils/password_hashing.py
+# Các hàm băm mật khẩu chạy trong tiến trình con của process pool,
+# vì vậy module này không được import database hay FastAPI.
+import os
+from passlib.context import CryptContext
+
+# Đổi BCRYPT_ROUNDS sẽ khiến mật khẩu cũ được băm lại với chi phí mới ở lần đăng nhập kế tiếp
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
+
+def hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+def verify_password(password: str, password_hash: str) -> bool:
+    return pwd_context.verify(password, password_hash)
+
+def verify_and_update_password(password: str, password_hash: str):
+    """Trả về (mật khẩu đúng?, hash mới nếu hash cũ dùng chi phí khác BCRYPT_ROUNDS, ngược lại None)."""
+    return pwd_context.verify_and_update(password, password_hash)
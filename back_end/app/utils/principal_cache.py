@@ -0,0 +1,48 @@
+# app/utils/principal_cache.py
+"""
+Cache người dùng đã xác thực, theo username.
+
+`get_current_user` chạy ở mọi request có đăng nhập; thay vì truy vấn `users` mỗi lần,
+thông tin người dùng (đã bỏ password_hash, verification_token) được giữ tối đa
+PRINCIPAL_CACHE_TTL_SECONDS giây. Các hàm ghi trong user_crud gọi `invalidate_principal`
+để worker hiện tại thấy thay đổi ngay; worker khác thấy sau tối đa một TTL.
+"""
+import os
+
+from cachetools import TTLCache
+
+PRINCIPAL_CACHE_TTL_SECONDS = int(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+PRINCIPAL_CACHE_MAX_SIZE = int(os.getenv("PRINCIPAL_CACHE_MAX_SIZE", "10000"))
+
+_cache = TTLCache(maxsize=PRINCIPAL_CACHE_MAX_SIZE, ttl=PRINCIPAL_CACHE_TTL_SECONDS)
+_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+
+def get_principal(username: str):
+    user = _cache.get(username)
+    if user is None:
+        _stats["misses"] += 1
+        return None
+    _stats["hits"] += 1
+    # Trả bản sao để endpoint có sửa dict cũng không làm hỏng cache
+    return dict(user)
+
+
+def set_principal(username: str, user: dict):
+    _cache[username] = dict(user)
+
+
+def invalidate_principal(username: str):
+    if username is not None and _cache.pop(username, None) is not None:
+        _stats["invalidations"] += 1
+
+
+def principal_cache_stats() -> dict:
+    lookups = _stats["hits"] + _stats["misses"]
+    return {
+        **_stats,
+        "size": len(_cache),
+        "maxSize": PRINCIPAL_CACHE_MAX_SIZE,
+        "ttlSeconds": PRINCIPAL_CACHE_TTL_SECONDS,
+        "hitRatio": round(_stats["hits"] / lookups, 4) if lookups else None,
+    }
@@ -0,0 +1,46 @@
+# app/utils/process_pool.py
+import asyncio
+import functools
+from concurrent.futures import ProcessPoolExecutor
+
+
+class PoolSaturatedError(Exception):
+    """Hàng đợi của pool đã đầy, nơi gọi nên trả lỗi 503 thay vì xếp hàng vô hạn."""
+
+
+class BoundedProcessPool:
+    """
+    Process pool dùng cho các tác vụ nặng CPU (bcrypt, xử lý ảnh) để không chặn event loop
+    và chạy song song thật sự trên nhiều nhân. Số tác vụ đang chờ / chạy bị giới hạn bởi `max_pending`.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_pending: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = None
+        self._pending = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Tạo khi dùng lần đầu để import module không sinh tiến trình con
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    async def run(self, fn, *args, **kwargs):
+        if self._pending >= self.max_pending:
+            raise PoolSaturatedError(f"Pool '{self.name}' đang có {self._pending} tác vụ chờ xử lý")
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), functools.partial(fn, *args, **kwargs))
+        finally:
+            self._pending -= 1
+
+    def stats(self) -> dict:
+        return {"name": self.name, "workers": self.max_workers, "pending": self._pending, "maxPending": self.max_pending}
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
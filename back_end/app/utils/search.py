@@ -0,0 +1,48 @@
+# app/utils/search.py
+"""
+Khóa tìm kiếm không dấu cho hồ sơ.
+
+Mỗi hồ sơ lưu `searchKeys`: các token (bỏ dấu, chữ thường) của họ tên và mã hồ sơ
+cùng mọi tiền tố của từng token. Trường này có index multikey nên tìm kiếm
+"nguyen van" hay "hs-ab12" trở thành so khớp chính xác trên index
+(`{"searchKeys": {"$all": [...]}}`) thay vì $regex quét toàn bộ collection.
+"""
+import re
+import unicodedata
+
+# Tiền tố ngắn hơn không đủ chọn lọc; token dài hơn chỉ lưu đến độ dài này
+MIN_PREFIX_LENGTH = 2
+MAX_PREFIX_LENGTH = 20
+# Giới hạn số token trong một câu tìm kiếm
+MAX_QUERY_TOKENS = 6
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def fold_text(text: str) -> str:
+    """Bỏ dấu tiếng Việt và chuyển về chữ thường: "Đặng Thị Ánh" -> "dang thi anh"."""
+    text = unicodedata.normalize("NFD", text.replace("đ", "d").replace("Đ", "D"))
+    return "".join(ch for ch in text if unicodedata.category(ch) != "Mn").lower()
+
+
+def tokenize(text: str) -> list:
+    return _TOKEN_RE.findall(fold_text(text or ""))
+
+
+def build_search_keys(application: dict) -> list:
+    """Tính `searchKeys` từ họ tên và mã hồ sơ; gọi lại mỗi khi một trong hai trường thay đổi."""
+    keys = set()
+    for field in ("fullname", "applicationCode"):
+        for token in tokenize(application.get(field)):
+            token = token[:MAX_PREFIX_LENGTH]
+            keys.update(token[:end] for end in range(MIN_PREFIX_LENGTH, len(token) + 1))
+            keys.add(token)  # token một ký tự vẫn tìm được nếu gõ đúng cả token
+    return sorted(keys)
+
+
+def search_filter(query: str):
+    """Điều kiện lọc cho chuỗi tìm kiếm của admin, None nếu chuỗi không có token nào dùng được."""
+    terms = [token[:MAX_PREFIX_LENGTH] for token in tokenize(query)][:MAX_QUERY_TOKENS]
+    if not terms:
+        return None
+    return {"searchKeys": {"$all": list(dict.fromkeys(terms))}}
@@ -0,0 +1,49 @@
+# app/utils/serialization.py
+"""
+Đường tắt tuần tự hóa cho dữ liệu đọc từ DB (đã hợp lệ khi ghi).
+
+Thay vì model_validate từng dòng rồi để FastAPI validate + serialize lại lần nữa theo
+`response_model`, các endpoint danh sách / chi tiết dựng thẳng dict đúng các khóa của schema
+(theo alias) và trả `ORJSONResponse`. `response_model` vẫn được khai báo để sinh tài liệu OpenAPI.
+"""
+from functools import lru_cache
+from types import UnionType
+from typing import Union, get_args, get_origin
+
+from pydantic import BaseModel
+
+
+def _is_float_field(annotation) -> bool:
+    """float hoặc Optional[float]."""
+    if annotation is float:
+        return True
+    return get_origin(annotation) in (Union, UnionType) and float in get_args(annotation)
+
+
+@lru_cache(maxsize=None)
+def _field_keys(schema: type) -> tuple:
+    """
+    (khóa đầu ra, tên trường, là float?) của schema; khóa đầu ra là alias nếu có, giống response_model.
+    """
+    return tuple(
+        (field.alias or name, name, _is_float_field(field.annotation))
+        for name, field in schema.model_fields.items()
+    )
+
+
+def dump_trusted(schema: type[BaseModel], data: dict) -> dict:
+    """
+    Dựng dict đầu ra của `schema` từ `data` mà không validate.
+    Chỉ dùng cho dữ liệu tin cậy; giá trị được lấy theo alias trước rồi đến tên trường,
+    trường thiếu trả None như khi serialize model.
+    Trường float (điểm số) lưu dưới dạng số nguyên được đổi sang float, để JSON giống hệt đường validate (8 -> 8.0).
+    """
+    result = {}
+    for key, name, is_float in _field_keys(schema):
+        value = data.get(key)
+        if value is None and name != key:
+            value = data.get(name)
+        if is_float and type(value) is int:
+            value = float(value)
+        result[key] = value
+    return result
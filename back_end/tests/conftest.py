@@ -0,0 +1,91 @@
+# tests/conftest.py
+"""
+Cấu hình chung cho test. Chạy từ thư mục back_end:
+
+    python -m pytest -q tests
+
+Test đánh dấu `mongo_db` cần một mongod thật (MONGO_TEST_URI, mặc định mongodb://localhost:27017)
+và dùng database riêng admission_portal_test (bị xóa sau mỗi test); không có mongod thì được bỏ qua.
+Các test còn lại thay database bằng đối tượng giả trong bộ nhớ (`use_db`).
+"""
+import os
+import tempfile
+
+# Phải đặt trước khi import app (config đọc biến môi trường khi import)
+os.environ["MONGO_URI"] = os.getenv("MONGO_TEST_URI", "mongodb://localhost:27017")
+os.environ["MONGO_DB_NAME"] = "admission_portal_test"
+os.environ.setdefault("JWT_SECRET", "test-secret")
+os.environ.setdefault("MONGO_SERVER_SELECTION_TIMEOUT_MS", "1000")
+os.environ.setdefault("MONGO_COMPRESSORS", "")
+# Tệp tải lên trong test được ghi vào thư mục tạm, không đụng tới uploads/ của repo
+os.environ["UPLOAD_DIR"] = tempfile.mkdtemp(prefix="admission-portal-test-uploads-")
+
+import pytest
+from pymongo.errors import PyMongoError
+
+from app.database import database
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def use_db():
+    """Thay database mà get_db() trả về bằng `fake` trong phạm vi một test."""
+    previous = database._db
+
+    def install(fake):
+        database._db = fake
+        return fake
+
+    yield install
+    database._db = previous
+
+
+@pytest.fixture
+async def mongo_db():
+    try:
+        db = await database.connect(warmup_connections=1)
+    except PyMongoError as e:
+        await database.close()
+        pytest.skip(f"Không kết nối được MongoDB để test: {e}")
+    await db.client.drop_database(db.name)
+    try:
+        yield db
+    finally:
+        await db.client.drop_database(db.name)
+        await database.close()
+
+
+@pytest.fixture
+def admin_user():
+    return {"_id": "64b000000000000000000001", "username": "admin", "role": "admin"}
+
+
+@pytest.fixture
+def candidate_user():
+    return {"_id": "64b000000000000000000002", "username": "candidate", "role": "candidate"}
+
+
+@pytest.fixture
+async def client_as():
+    """`await client_as(user)` trả về httpx.AsyncClient gọi thẳng ứng dụng ASGI với người dùng `user` đã đăng nhập."""
+    import httpx
+
+    from app.main import app
+    from app.utils.auth import get_current_user
+
+    clients = []
+
+    async def make(user: dict):
+        app.dependency_overrides[get_current_user] = lambda: user
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+        clients.append(client)
+        return client
+
+    yield make
+    app.dependency_overrides.clear()
+    for client in clients:
+        await client.aclose()
@@ -0,0 +1,179 @@
+# tests/fake_mongo.py
+"""
+Collection MongoDB giả trong bộ nhớ cho test không cần mongod.
+Chỉ hỗ trợ các toán tử mà code trong app/crud dùng; toán tử lạ báo NotImplementedError thay vì bỏ qua.
+"""
+from types import SimpleNamespace
+
+from bson import ObjectId
+
+
+def _compare(value, operator: str, operand) -> bool:
+    if operator == "$in":
+        return value in operand
+    if operator == "$ne":
+        return value != operand
+    if operator == "$exists":
+        return (value is not None) == operand
+    if value is None:
+        return False
+    if operator == "$lt":
+        return value < operand
+    if operator == "$lte":
+        return value <= operand
+    if operator == "$gt":
+        return value > operand
+    if operator == "$gte":
+        return value >= operand
+    raise NotImplementedError(operator)
+
+
+def matches(document: dict, query: dict) -> bool:
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(matches(document, branch) for branch in condition):
+                return False
+        elif key == "$and":
+            if not all(matches(document, branch) for branch in condition):
+                return False
+        elif isinstance(condition, dict) and condition and all(op.startswith("$") for op in condition):
+            if not all(_compare(document.get(key), op, operand) for op, operand in condition.items()):
+                return False
+        elif document.get(key) != condition:
+            return False
+    return True
+
+
+def apply_update(document: dict, update: dict):
+    for operator, fields in update.items():
+        for key, value in fields.items():
+            if operator == "$set":
+                document[key] = value
+            elif operator == "$inc":
+                document[key] = document.get(key, 0) + value
+            elif operator == "$unset":
+                document.pop(key, None)
+            else:
+                raise NotImplementedError(operator)
+
+
+def _project(document: dict, projection: dict) -> dict:
+    if not projection:
+        return dict(document)
+    included = {key for key, value in projection.items() if value}
+    if included - {"_id"}:
+        result = {key: document[key] for key in included if key in document}
+        if projection.get("_id", 1) and "_id" in document:
+            result["_id"] = document["_id"]
+        return result
+    return {key: value for key, value in document.items() if projection.get(key, 1)}
+
+
+def _sorted(documents: list, sort) -> list:
+    for key, direction in reversed(list(sort.items() if isinstance(sort, dict) else sort)):
+        documents = sorted(documents, key=lambda d: (d.get(key) is not None, d.get(key)), reverse=direction < 0)
+    return documents
+
+
+class FakeCursor:
+    def __init__(self, documents: list):
+        self.documents = documents
+
+    def sort(self, sort, direction=None):
+        self.documents = _sorted(self.documents, [(sort, direction)] if direction is not None else sort)
+        return self
+
+    def skip(self, count: int):
+        self.documents = self.documents[count:]
+        return self
+
+    def limit(self, count: int):
+        if count:
+            self.documents = self.documents[:count]
+        return self
+
+    def batch_size(self, size: int):
+        return self
+
+    async def to_list(self, length=None):
+        return self.documents
+
+    def __aiter__(self):
+        async def iterate():
+            for document in self.documents:
+                yield document
+        return iterate()
+
+    async def close(self):
+        pass
+
+
+class FakeCollection:
+    def __init__(self, documents: list = None):
+        self.documents = [dict(d) for d in documents or []]
+
+    def _matching(self, query: dict) -> list:
+        return [d for d in self.documents if matches(d, query or {})]
+
+    async def insert_one(self, document: dict):
+        document.setdefault("_id", ObjectId())
+        self.documents.append(dict(document))
+        return SimpleNamespace(inserted_id=document["_id"])
+
+    async def insert_many(self, documents: list, ordered: bool = True):
+        return SimpleNamespace(inserted_ids=[(await self.insert_one(d)).inserted_id for d in documents])
+
+    async def find_one(self, query: dict = None, projection: dict = None):
+        found = self._matching(query)
+        return _project(found[0], projection) if found else None
+
+    def find(self, query: dict = None, projection: dict = None):
+        return FakeCursor([_project(d, projection) for d in self._matching(query)])
+
+    async def count_documents(self, query: dict):
+        return len(self._matching(query))
+
+    async def find_one_and_update(self, query: dict, update: dict, sort=None, return_document=False, **kwargs):
+        found = self._matching(query)
+        if sort:
+            found = _sorted(found, sort)
+        if not found:
+            return None
+        before = dict(found[0])
+        apply_update(found[0], update)
+        return dict(found[0]) if return_document else before
+
+    async def update_one(self, query: dict, update: dict):
+        found = self._matching(query)[:1]
+        for document in found:
+            apply_update(document, update)
+        return SimpleNamespace(matched_count=len(found), modified_count=len(found))
+
+    async def update_many(self, query: dict, update: dict):
+        found = self._matching(query)
+        for document in found:
+            apply_update(document, update)
+        return SimpleNamespace(matched_count=len(found), modified_count=len(found))
+
+    async def delete_one(self, query: dict):
+        found = self._matching(query)[:1]
+        for document in found:
+            self.documents.remove(document)
+        return SimpleNamespace(deleted_count=len(found))
+
+    async def delete_many(self, query: dict):
+        found = self._matching(query)
+        for document in found:
+            self.documents.remove(document)
+        return SimpleNamespace(deleted_count=len(found))
+
+
+class FakeDB:
+    """Database giả: mỗi thuộc tính là một FakeCollection, tạo khi truy cập lần đầu."""
+
+    def __getattr__(self, name: str) -> FakeCollection:
+        if name.startswith("__"):
+            raise AttributeError(name)
+        collection = FakeCollection()
+        setattr(self, name, collection)
+        return collection
@@ -0,0 +1,63 @@
+# tests/test_admin_attachments.py
+"""Chi tiết hồ sơ cho admin: trả URL ảnh thumb cùng với phiên bản ảnh được yêu cầu."""
+import hashlib
+import os
+
+import pytest
+from test_serialization import _stored_application
+
+import app.api.api_v2.endpoints.admin_application as admin_application
+from app.utils.blob_store import blob_path, blob_url, variant_path
+
+pytestmark = pytest.mark.anyio
+
+
+def _write(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+@pytest.fixture
+def application_with_image(monkeypatch):
+    image = b"\x89PNG\r\n\x1a\nadmin-attachments-test"
+    digest = hashlib.sha256(image).hexdigest()
+    _write(blob_path(digest, "png"), image)
+    for variant in ("review", "thumb"):
+        _write(variant_path(digest, variant), variant.encode())
+
+    application = _stored_application()
+    application["cccdFront"] = blob_url(digest, "png")
+    application.pop("status")
+
+    async def get_application_detail(query):
+        return dict(application) if query == {"applicationCode": application["applicationCode"]} else None
+
+    monkeypatch.setattr(admin_application, "get_application_detail", get_application_detail)
+    return application
+
+
+async def test_detail_returns_thumbnails_alongside_review_images(application_with_image, client_as, admin_user):
+    client = await client_as(admin_user)
+
+    response = await client.get(f"/api/v2/application/{application_with_image['applicationCode']}")
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert ".review.jpg?" in body["cccdFront"]
+    assert ".thumb.jpg?" in body["thumbnails"]["cccdFront"]
+    # Tệp không phải ảnh blob (PDF, URL cũ) được giữ nguyên nên không có trong thumbnails
+    assert set(body["thumbnails"]) == {"cccdFront"}
+
+
+async def test_original_variant_keeps_thumbnails(application_with_image, client_as, admin_user):
+    client = await client_as(admin_user)
+
+    response = await client.get(
+        f"/api/v2/application/{application_with_image['applicationCode']}", params={"variant": "original"}
+    )
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert ".png?" in body["cccdFront"]
+    assert ".thumb.jpg?" in body["thumbnails"]["cccdFront"]
@@ -0,0 +1,33 @@
+# tests/test_catalog_cache.py
+"""API danh mục cần đăng nhập: chỉ cache riêng của trình duyệt, ETag vẫn cho 304."""
+import pytest
+from fake_mongo import FakeDB
+
+from app.utils import catalog_cache
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def catalog_db(use_db, monkeypatch):
+    monkeypatch.setattr(catalog_cache, "_snapshot", None)
+    db = use_db(FakeDB())
+    db.schools.documents.append({"_id": "school-1", "code": "BKA", "name": "Trường A", "majors": []})
+    db.catalog_meta.documents.append({"_id": "catalog", "version": 3})
+    return db
+
+
+async def test_authenticated_catalog_is_not_shared_by_proxies(catalog_db, client_as, candidate_user):
+    client = await client_as(candidate_user)
+
+    response = await client.get("/api/v1/schools")
+
+    assert response.status_code == 200, response.text
+    assert response.headers["cache-control"].startswith("private")
+    assert response.headers["vary"] == "Authorization"
+
+    revalidated = await client.get("/api/v1/schools", headers={"If-None-Match": response.headers["etag"]})
+
+    assert revalidated.status_code == 304
+    assert revalidated.headers["cache-control"].startswith("private")
+    assert revalidated.headers["vary"] == "Authorization"
@@ -0,0 +1,81 @@
+# tests/test_code_generate.py
+"""Cấp mã hồ sơ đồng thời: không trùng mã, không hụt số ngoài phần còn lại của các khối đã giữ chỗ."""
+import asyncio
+import random
+
+import pytest
+
+from app.utils import code_generate
+from app.utils.code_generate import CODE_PREFIX, ApplicationCodeAllocator
+
+pytestmark = pytest.mark.anyio
+
+WORKERS = 4
+BLOCK_SIZE = 7
+CODES_PER_WORKER = 150
+
+
+class _MemoryCounters:
+    """Bộ đếm trong bộ nhớ có cùng ngữ nghĩa $inc nguyên tử với counter_crud.reserve_sequence_block."""
+
+    def __init__(self):
+        self.values = {}
+
+    async def reserve_sequence_block(self, name: str, size: int):
+        await asyncio.sleep(0)  # nhường event loop như một lần gọi DB thật
+        self.values[name] = self.values.get(name, 0) + size
+        return self.values[name] - size + 1, self.values[name]
+
+
+async def _allocate_concurrently() -> tuple:
+    # Mỗi allocator mô phỏng một worker; các lời gọi xen kẽ ngẫu nhiên
+    allocators = [ApplicationCodeAllocator(block_size=BLOCK_SIZE) for _ in range(WORKERS)]
+    rng = random.Random(14)
+
+    async def allocate(allocator):
+        await asyncio.sleep(rng.random() / 1000)
+        return await allocator.allocate()
+
+    codes = await asyncio.gather(*(
+        allocate(allocator) for allocator in allocators for _ in range(CODES_PER_WORKER)
+    ))
+    return codes, allocators
+
+
+def _current_blocks(allocators: list) -> list:
+    # Không truyền school_code nên mọi mã dùng chung một bộ đếm
+    return [next(iter(allocator._blocks.values())) for allocator in allocators]
+
+
+def _assert_no_duplicates_or_unexplained_gaps(codes: list, allocators: list):
+    assert len(codes) == len(set(codes)), "Có mã hồ sơ bị trùng"
+    numbers = {int(code.rsplit("-", 1)[1]) for code in codes}
+    # Số chưa cấp chỉ có thể là phần còn lại của khối mà mỗi worker đang giữ
+    reserved_tail = set()
+    for next_value, last_value in _current_blocks(allocators):
+        # Khối chỉ được giữ khi cần cấp mã nên ít nhất một số của nó đã được dùng
+        assert last_value - next_value + 1 < BLOCK_SIZE
+        reserved_tail.update(range(next_value, last_value + 1))
+    highest = max(numbers | reserved_tail)
+    assert set(range(1, highest + 1)) - numbers == reserved_tail
+
+
+async def test_concurrent_allocation_has_no_duplicates_or_gaps(monkeypatch):
+    counters = _MemoryCounters()
+    monkeypatch.setattr(code_generate, "reserve_sequence_block", counters.reserve_sequence_block)
+
+    codes, allocators = await _allocate_concurrently()
+
+    assert len(codes) == WORKERS * CODES_PER_WORKER
+    _assert_no_duplicates_or_unexplained_gaps(codes, allocators)
+    assert all(code.startswith(f"{CODE_PREFIX}-") for code in codes)
+
+
+async def test_concurrent_allocation_against_mongo(mongo_db):
+    # Dùng counter_crud.reserve_sequence_block thật ($inc nguyên tử trên collection counters)
+    codes, allocators = await _allocate_concurrently()
+
+    _assert_no_duplicates_or_unexplained_gaps(codes, allocators)
+    counter_name = next(iter(allocators[0]._blocks))
+    counter = await mongo_db.counters.find_one({"_id": counter_name})
+    assert counter["value"] == max(last for _, last in _current_blocks(allocators))
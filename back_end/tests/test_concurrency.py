@@ -0,0 +1,69 @@
+# tests/test_concurrency.py
+"""Một truy vấn MongoDB chậm không được chặn event loop: request khác vẫn được xử lý trong lúc chờ."""
+import asyncio
+import time
+
+import pytest
+
+import app.api.api_v2.endpoints.admin_application as admin_application
+
+pytestmark = pytest.mark.anyio
+
+SLOW_QUERY_MS = 800
+
+
+class _GatedCollection:
+    """Collection giả: find_one chỉ trả kết quả khi test cho phép (mô phỏng truy vấn chậm)."""
+
+    def __init__(self):
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def find_one(self, query, *args, **kwargs):
+        self.started.set()
+        await self.release.wait()
+        return None
+
+
+class _FakeDB:
+    def __init__(self):
+        self.applications = _GatedCollection()
+
+
+async def test_pending_query_does_not_block_other_requests(use_db, client_as, admin_user):
+    fake = use_db(_FakeDB())
+    client = await client_as(admin_user)
+
+    slow_request = asyncio.create_task(client.get("/api/v2/application/HS-0000001"))
+    await asyncio.wait_for(fake.applications.started.wait(), timeout=5)
+
+    # Request thứ hai hoàn tất trong khi truy vấn của request đầu vẫn đang chờ
+    response = await asyncio.wait_for(client.get("/openapi.json"), timeout=5)
+    assert response.status_code == 200
+    assert not slow_request.done()
+
+    fake.applications.release.set()
+    assert (await slow_request).status_code == 404
+
+
+async def test_slow_mongo_query_does_not_block_other_requests(mongo_db, client_as, admin_user, monkeypatch):
+    await mongo_db.applications.insert_one({"applicationCode": "HS-0000001", "status": "PENDING"})
+    original = admin_application.get_application_detail
+
+    async def slow_detail(query):
+        # $where chạy phía server: truy vấn thật mất ít nhất SLOW_QUERY_MS
+        return await original({**query, "$where": f"sleep({SLOW_QUERY_MS}) || true"})
+
+    monkeypatch.setattr(admin_application, "get_application_detail", slow_detail)
+    client = await client_as(admin_user)
+
+    started = time.perf_counter()
+    slow_request = asyncio.create_task(client.get("/api/v2/application/HS-0000001"))
+    await asyncio.sleep(0.05)
+    response = await client.get("/openapi.json")
+    fast_elapsed_ms = (time.perf_counter() - started) * 1000
+
+    assert response.status_code == 200
+    assert not slow_request.done()
+    assert fast_elapsed_ms < SLOW_QUERY_MS / 2
+    await slow_request
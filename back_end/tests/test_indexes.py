@@ -0,0 +1,69 @@
+# tests/test_indexes.py
+"""Các truy vấn thường gặp phải dùng index (IXSCAN), không quét toàn collection (COLLSCAN). Cần mongod."""
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from app.crud.application_crud import LIST_SORT
+from app.crud.application_query import LIST_PROJECTION, build_application_filter
+from app.database.indexes import ensure_indexes
+from app.database.monitoring import summarize_plan
+from app.utils.search import build_search_keys
+
+pytestmark = pytest.mark.anyio
+
+USER_ID = ObjectId()
+
+# (tên, collection, filter, sort) — filter dựng bằng đúng hàm mà các endpoint dùng
+HOT_QUERIES = [
+    ("user_list", "applications", build_application_filter(user_id=str(USER_ID)), LIST_SORT),
+    ("admin_list", "applications", build_application_filter(), LIST_SORT),
+    ("admin_filter_school", "applications", build_application_filter(school_code="S001", major_code="M01"), None),
+    ("admin_search", "applications", build_application_filter(search="nguyen van"), None),
+    ("application_detail", "applications", {"applicationCode": "HS-0000001"}, None),
+    ("login", "users", {"username": "candidate"}, None),
+    ("register_email", "users", {"email": "user1@example.com"}, None),
+    ("verify_email", "users", {"verification_token": "token"}, None),
+    ("reset_password", "users", {"reset_token": "token"}, None),
+    ("catalog_school", "schools", {"code": "S001"}, None),
+    ("statistics_range", "application_stats", {"day": {"$gte": "2026-01-01", "$lte": "2026-01-31"}}, None),
+    ("outbox_claim", "email_outbox", {"status": "pending", "next_attempt_at": {"$lte": datetime.utcnow()}}, [("next_attempt_at", 1)]),
+]
+
+
+async def _seed(db):
+    now = datetime.utcnow()
+    applications = []
+    for i in range(50):
+        application = {
+            "applicationCode": f"HS-{i + 1:07d}",
+            "userId": USER_ID if i % 5 == 0 else ObjectId(),
+            "fullname": "Nguyễn Văn An" if i % 2 else "Trần Thị Bình",
+            "school": f"S{i % 3:03d}",
+            "major": f"M{i % 4:02d}",
+            "status": "PENDING",
+            "created_at": now - timedelta(days=i),
+            "updated_at": now - timedelta(hours=i),
+        }
+        application["searchKeys"] = build_search_keys(application)
+        applications.append(application)
+    await db.applications.insert_many(applications)
+    await db.users.insert_many([{"username": f"user{i}", "email": f"user{i}@example.com"} for i in range(20)])
+    await db.schools.insert_many([{"code": f"S{i:03d}", "name": f"Trường {i}"} for i in range(5)])
+
+
+@pytest.mark.parametrize("name,collection,query,sort", HOT_QUERIES, ids=[q[0] for q in HOT_QUERIES])
+async def test_hot_query_uses_index(mongo_db, name, collection, query, sort):
+    await ensure_indexes(mongo_db)
+    await _seed(mongo_db)
+
+    command = {"find": collection, "filter": query}
+    if sort:
+        command["sort"] = dict(sort)
+    if collection == "applications":
+        command["projection"] = LIST_PROJECTION
+    plan = summarize_plan(await mongo_db.command({"explain": command, "verbosity": "queryPlanner"}))
+
+    assert "IXSCAN" in plan, f"{name}: {plan}"
+    assert "COLLSCAN" not in plan, f"{name}: {plan}"
@@ -0,0 +1,182 @@
+# tests/test_mail_worker.py
+"""Outbox email và worker gửi email, chạy với một máy chủ SMTP giả trong tiến trình test."""
+import socketserver
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from fake_mongo import FakeDB
+
+from app.crud import outbox_crud
+from app.crud.outbox_crud import claim_emails, enqueue_email, enqueue_emails, mark_emails_sent
+from app.utils import mail_worker
+from app.utils.mail_worker import OutboxWorker, SMTPConnection
+
+pytestmark = pytest.mark.anyio
+
+REJECTED_RECIPIENT = "rejected@example.com"
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """Đủ giao thức SMTP cho smtplib: EHLO, MAIL, RCPT, DATA, NOOP, RSET, QUIT."""
+
+    def _reply(self, line: str):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        self._reply("220 fake-smtp")
+        recipients = []
+        while line := self.rfile.readline():
+            command = line.decode().strip()
+            verb = command.split(" ", 1)[0].upper()
+            if verb in ("EHLO", "HELO"):
+                self._reply("250 fake-smtp")
+            elif verb in ("MAIL", "NOOP"):
+                self._reply("250 OK")
+            elif verb == "RSET":
+                recipients = []
+                self._reply("250 OK")
+            elif verb == "RCPT":
+                recipient = command.split(":", 1)[1].strip(" <>")
+                if recipient == REJECTED_RECIPIENT:
+                    self._reply("550 Mailbox unavailable")
+                else:
+                    recipients.append(recipient)
+                    self._reply("250 OK")
+            elif verb == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                data = b""
+                while (chunk := self.rfile.readline()) and chunk != b".\r\n":
+                    data += chunk
+                with server.lock:
+                    server.messages.append((recipients, data))
+                recipients = []
+                self._reply("250 OK queued")
+            elif verb == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Command not implemented")
+
+
+class _FakeSMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _SMTPHandler)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.messages = []
+
+
+@pytest.fixture
+def smtp_server():
+    server = _FakeSMTPServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def outbox(use_db):
+    return use_db(FakeDB()).email_outbox
+
+
+@pytest.fixture
+def worker(smtp_server):
+    worker = OutboxWorker()
+    worker.connection = SMTPConnection("127.0.0.1", smtp_server.server_address[1], False, None, None, "no-reply@example.com")
+    yield worker
+    worker.connection.close()
+
+
+def _message(to: str, subject: str = "Thông báo") -> dict:
+    return {"to": to, "subject": subject, "body": "Nội dung", "subtype": "plain"}
+
+
+async def _expire_leases(outbox):
+    await outbox.update_many({"status": outbox_crud.OUTBOX_SENDING}, {"$set": {"locked_until": datetime.utcnow() - timedelta(seconds=1)}})
+
+
+async def test_batch_reuses_one_connection(outbox, worker, smtp_server):
+    await enqueue_emails([_message(f"user{i}@example.com") for i in range(3)])
+    assert await worker.drain_once() == 3
+    await enqueue_email(_message("late@example.com"))
+    assert await worker.drain_once() == 1
+
+    assert smtp_server.connections == 1
+    assert [recipients for recipients, _ in smtp_server.messages] == [
+        ["user0@example.com"], ["user1@example.com"], ["user2@example.com"], ["late@example.com"],
+    ]
+    assert all(m["status"] == outbox_crud.OUTBOX_SENT and "lease_token" not in m for m in outbox.documents)
+
+
+async def test_stale_lease_cannot_mark_reclaimed_message_sent(outbox):
+    await enqueue_email(_message("user@example.com"))
+    stale_token, [message] = await claim_emails(10, 60, 5)
+
+    # Worker đầu treo quá thời hạn giữ; worker khác nhận lại email
+    await _expire_leases(outbox)
+    fresh_token, [reclaimed] = await claim_emails(10, 60, 5)
+    assert reclaimed["_id"] == message["_id"] and reclaimed["attempts"] == 2
+    assert fresh_token != stale_token
+
+    result = await mark_emails_sent([message["_id"]], stale_token)
+    assert result.modified_count == 0
+    assert (await outbox.find_one({"_id": message["_id"]}))["status"] == outbox_crud.OUTBOX_SENDING
+
+    await mark_emails_sent([message["_id"]], fresh_token)
+    assert (await outbox.find_one({"_id": message["_id"]}))["status"] == outbox_crud.OUTBOX_SENT
+
+
+async def test_failed_message_is_rescheduled_with_backoff_and_rest_of_batch_sent(outbox, worker, smtp_server):
+    await enqueue_emails([_message(REJECTED_RECIPIENT), _message("ok@example.com")])
+    before = datetime.utcnow()
+
+    assert await worker.drain_once() == 2
+
+    failed = await outbox.find_one({"to": REJECTED_RECIPIENT})
+    assert failed["status"] == outbox_crud.OUTBOX_PENDING
+    assert failed["attempts"] == 1 and "550" in failed["last_error"]
+    delay = (failed["next_attempt_at"] - before).total_seconds()
+    assert mail_worker.BACKOFF_BASE_SECONDS - 1 <= delay <= mail_worker.BACKOFF_BASE_SECONDS + 5
+    assert (await outbox.find_one({"to": "ok@example.com"}))["status"] == outbox_crud.OUTBOX_SENT
+    assert [recipients for recipients, _ in smtp_server.messages] == [["ok@example.com"]]
+    # Chưa đến hạn thử lại thì không được nhận
+    assert await worker.drain_once() == 0
+
+
+async def test_message_is_dead_lettered_after_max_attempts(outbox, worker, monkeypatch):
+    monkeypatch.setattr(mail_worker, "MAX_ATTEMPTS", 3)
+    await enqueue_email(_message(REJECTED_RECIPIENT))
+
+    for attempt in range(1, 4):
+        await outbox.update_many({}, {"$set": {"next_attempt_at": datetime.utcnow() - timedelta(seconds=1)}})
+        assert await worker.drain_once() == 1
+        message = await outbox.find_one({})
+        assert message["attempts"] == attempt
+
+    assert message["status"] == outbox_crud.OUTBOX_DEAD
+    await outbox.update_many({}, {"$set": {"next_attempt_at": datetime.utcnow() - timedelta(seconds=1)}})
+    assert await worker.drain_once() == 0
+
+
+async def test_message_crashing_the_worker_is_dead_lettered(outbox):
+    await enqueue_email(_message("user@example.com"))
+    # Mỗi lần nhận là một lần thử; worker chết trước khi ghi kết quả nên hết hạn giữ
+    for _ in range(3):
+        _, claimed = await claim_emails(10, 60, 3)
+        assert len(claimed) == 1
+        await _expire_leases(outbox)
+
+    _, claimed = await claim_emails(10, 60, 3)
+
+    assert claimed == []
+    message = await outbox.find_one({})
+    assert message["status"] == outbox_crud.OUTBOX_DEAD and message["attempts"] == 3
@@ -0,0 +1,34 @@
+# tests/test_monitoring.py
+"""Lệnh chậm: explain chạy nền và task của nó được giữ tham chiếu cho tới khi xong."""
+import asyncio
+
+import pytest
+
+from app.database.monitoring import CommandMonitor
+
+pytestmark = pytest.mark.anyio
+
+
+class _ExplainDB:
+    def __init__(self):
+        self.release = asyncio.Event()
+
+    async def command(self, command):
+        await self.release.wait()
+        return {"queryPlanner": {"winningPlan": {"stage": "COLLSCAN"}}}
+
+
+async def test_explain_task_is_kept_until_done():
+    monitor = CommandMonitor()
+    db = _ExplainDB()
+    monitor.bind(db)
+    key = ("/api/v2/application", "find", "applications", '{"filter": {"status": "?"}}')
+
+    monitor._record_slow(key, 500.0, "admission_portal_test", {"find": "applications", "filter": {"status": "PENDING"}, "lsid": {}})
+
+    assert len(monitor._tasks) == 1
+    db.release.set()
+    await asyncio.gather(*monitor._tasks)
+    await asyncio.sleep(0)
+    assert not monitor._tasks
+    assert "COLLSCAN" in monitor.slow_commands()[0]["plan"]
@@ -0,0 +1,109 @@
+# tests/test_projection.py
+"""Các route danh sách không bao giờ đọc tệp đính kèm (ảnh CCCD, học bạ...) từ MongoDB."""
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from app.crud.application_query import ATTACHMENT_FIELDS, LIST_PROJECTION, STATISTICS_PROJECTION, projection_for
+
+pytestmark = pytest.mark.anyio
+
+
+def _attachments_in(projection: dict) -> set:
+    return ATTACHMENT_FIELDS.intersection(field.split(".")[0] for field in projection or {})
+
+
+def test_list_and_statistics_projections_exclude_attachments():
+    assert not _attachments_in(LIST_PROJECTION)
+    assert not _attachments_in(STATISTICS_PROJECTION)
+    # Projection dạng bao gồm: trường không liệt kê (kể cả tệp đính kèm) không được trả về
+    assert all(value == 1 for field, value in LIST_PROJECTION.items() if field != "_id")
+
+
+@pytest.mark.parametrize("field", sorted(ATTACHMENT_FIELDS) + ["extraDocuments.0"])
+def test_projection_for_rejects_attachment_fields(field):
+    with pytest.raises(ValueError):
+        projection_for("applicationCode", field)
+
+
+class _RecordingCursor:
+    def __init__(self, documents: list):
+        self.documents = documents
+
+    def sort(self, *args, **kwargs):
+        return self
+
+    def skip(self, count: int):
+        self.documents = self.documents[count:]
+        return self
+
+    def limit(self, count: int):
+        if count:
+            self.documents = self.documents[:count]
+        return self
+
+    async def to_list(self, length=None):
+        return self.documents
+
+
+class _RecordingCollection:
+    """Collection giả: ghi lại projection của mỗi lệnh find và áp dụng nó lên hồ sơ đầy đủ."""
+
+    def __init__(self, documents: list):
+        self.documents = documents
+        self.projections = []
+
+    def find(self, query=None, projection=None, *args, **kwargs):
+        self.projections.append(projection)
+        if projection is None:
+            return _RecordingCursor([dict(doc) for doc in self.documents])
+        return _RecordingCursor([
+            {key: value for key, value in doc.items() if key in projection or key == "_id"}
+            for doc in self.documents
+        ])
+
+    async def count_documents(self, query, *args, **kwargs):
+        return len(self.documents)
+
+
+class _FakeDB:
+    def __init__(self, documents: list):
+        self.applications = _RecordingCollection(documents)
+
+
+def _full_application(user_id: str, index: int) -> dict:
+    document = {
+        "_id": ObjectId(),
+        "userId": ObjectId(user_id),
+        "applicationCode": f"HS-{index:07d}",
+        "fullname": "Nguyễn Văn A",
+        "schoolName": "Trường A",
+        "majorName": "Ngành A",
+        "status": "PENDING",
+        "updated_at": datetime(2026, 1, 1, 8, index),
+    }
+    document.update({field: "data:image/png;base64," + "A" * 1024 for field in ATTACHMENT_FIELDS})
+    return document
+
+
+@pytest.mark.parametrize("user_fixture, path, params", [
+    ("candidate_user", "/api/v1/application/applications", {}),
+    ("candidate_user", "/api/v1/application/applications", {"cursor": ""}),
+    ("admin_user", "/api/v2/application/", {}),
+    ("admin_user", "/api/v2/application/", {"cursor": ""}),
+])
+async def test_list_routes_do_not_read_attachments(request, use_db, client_as, user_fixture, path, params):
+    user = request.getfixturevalue(user_fixture)
+    fake = use_db(_FakeDB([_full_application(user["_id"], index) for index in range(3)]))
+    client = await client_as(user)
+
+    response = await client.get(path, params={"limit": 2, **params})
+
+    assert response.status_code == 200, response.text
+    assert fake.applications.projections, "Route không truy vấn collection applications"
+    for projection in fake.applications.projections:
+        assert projection is not None, "Truy vấn danh sách phải có projection"
+        assert not _attachments_in(projection)
+    for item in response.json()["applications"]:
+        assert not ATTACHMENT_FIELDS.intersection(item)
@@ -0,0 +1,68 @@
+# tests/test_serialization.py
+"""dump_trusted phải cho ra đúng JSON mà đường model_validate + response_model trả về."""
+from datetime import datetime
+
+import orjson
+from bson import ObjectId
+
+from app.schemas.application_schema import ApplicationDetailSchema, ApplicationListItemSchema
+from app.utils.serialization import dump_trusted
+
+
+def _stored_application() -> dict:
+    # Hồ sơ như trong DB: điểm có thể được lưu dưới dạng số nguyên
+    return {
+        "_id": ObjectId(),
+        "userId": ObjectId(),
+        "applicationCode": "HS-0000001",
+        "fullname": "Nguyễn Văn A",
+        "gender": "Nam",
+        "dob": "2008-01-01",
+        "idNumber": "001208000001",
+        "province": "Hà Nội",
+        "district": "Ba Đình",
+        "ward": "Điện Biên",
+        "addressDetail": "1 Điện Biên Phủ",
+        "mathScore": 8,
+        "literatureScore": 7.5,
+        "englishScore": 9,
+        "physicsScore": 10,
+        "chemistryScore": None,
+        "school": "BKA",
+        "schoolName": "Trường A",
+        "major": "CNTT",
+        "majorName": "Ngành A",
+        "subjectGroup": "A00",
+        "totalScore": 27,
+        "cccdFront": "/api/v1/file/download/a.jpg",
+        "cccdBack": "/api/v1/file/download/b.jpg",
+        "transcript": ["/api/v1/file/download/c.pdf"],
+        "priority": None,
+        "extraDocuments": [{"description": "Giấy khen", "files": ["/api/v1/file/download/d.pdf"]}],
+        "created_at": datetime(2026, 1, 1, 8, 30),
+        "status": {"code": "PENDING", "displayName": "Chờ duyệt"},
+    }
+
+
+def _validated_json(schema, data: dict) -> bytes:
+    return schema.model_validate(data).model_dump_json(by_alias=True).encode()
+
+
+def _trusted_json(schema, data: dict) -> bytes:
+    return orjson.dumps(dump_trusted(schema, data))
+
+
+def test_detail_matches_validated_output():
+    application = _stored_application()
+    trusted = _trusted_json(ApplicationDetailSchema, application)
+
+    # So sánh từng byte: cùng thứ tự khóa, cùng kiểu số (8 -> 8.0)
+    assert trusted == _validated_json(ApplicationDetailSchema, application)
+    assert b'"mathScore":8.0' in trusted and b'"totalScore":27.0' in trusted
+
+
+def test_list_item_matches_validated_output():
+    application = _stored_application()
+    application["status"] = "PENDING"
+
+    assert _trusted_json(ApplicationListItemSchema, application) == _validated_json(ApplicationListItemSchema, application)
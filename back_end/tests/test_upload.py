@@ -0,0 +1,99 @@
+# tests/test_upload.py
+"""API tải tệp theo từng phần: ghi đúng offset khi gửi lại trên worker khác, dọn tệp tải dở bị bỏ."""
+import asyncio
+import hashlib
+import os
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from fake_mongo import FakeDB
+
+import app.api.api_v1.endpoints.file as file_endpoints
+from app.utils import partial_uploads
+from app.utils.partial_uploads import partial_path, sweep_partial_uploads
+
+pytestmark = pytest.mark.anyio
+
+PNG_BYTES = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 64
+
+
+@pytest.fixture
+def upload_db(use_db, monkeypatch):
+    # Không tạo ảnh review / thumb trong test
+    async def no_variants(ref):
+        return None
+
+    monkeypatch.setattr(file_endpoints, "ensure_image_variants", no_variants)
+    return use_db(FakeDB())
+
+
+async def _init_upload(client, data: bytes) -> str:
+    response = await client.post("/api/v1/file/uploads", json={
+        "filename": "cccd.png", "contentType": "image/png", "totalSize": len(data),
+    })
+    assert response.status_code == 201, response.text
+    return response.json()["uploadId"]
+
+
+async def test_retried_chunk_on_another_worker_is_written_at_its_offset(upload_db, client_as, candidate_user):
+    client = await client_as(candidate_user)
+    upload_id = await _init_upload(client, PNG_BYTES)
+    first_half = len(PNG_BYTES) // 2
+    release = asyncio.Event()
+
+    async def slow_body():
+        yield PNG_BYTES[:first_half]
+        await release.wait()
+        yield PNG_BYTES[first_half:]
+
+    # Lần gửi đầu dừng giữa chừng khi đang giữ khóa của worker này
+    first = asyncio.create_task(client.put(f"/api/v1/file/uploads/{upload_id}", params={"offset": 0}, content=slow_body()))
+    while not (upload_id in file_endpoints._locks and file_endpoints._locks[upload_id].locked()):
+        await asyncio.sleep(0.01)
+    # Client hết thời gian chờ và gửi lại từ offset 0; request rơi vào worker khác (khóa riêng)
+    file_endpoints._locks.pop(upload_id)
+    retry = await client.put(f"/api/v1/file/uploads/{upload_id}", params={"offset": 0}, content=PNG_BYTES)
+    assert retry.status_code == 200, retry.text
+    release.set()
+    assert (await first).status_code == 200
+
+    assert os.path.getsize(partial_path(upload_id)) == len(PNG_BYTES)
+    completed = await client.post(f"/api/v1/file/uploads/{upload_id}/complete")
+    assert completed.status_code == 200, completed.text
+    assert completed.json()["sha256"] == hashlib.sha256(PNG_BYTES).hexdigest()
+    assert not os.path.exists(partial_path(upload_id))
+
+
+async def test_sweep_removes_expired_and_orphaned_partial_files(upload_db, client_as, candidate_user):
+    client = await client_as(candidate_user)
+    live_id = await _init_upload(client, PNG_BYTES)
+    expired_id = await _init_upload(client, PNG_BYTES)
+    # Phiên bỏ dở quá hạn: bản ghi và tệp đều cũ
+    stale = datetime.utcnow() - timedelta(seconds=partial_uploads.UPLOAD_SESSION_TTL_SECONDS + 60)
+    await upload_db.upload_sessions.update_one({"_id": expired_id}, {"$set": {"updated_at": stale}})
+    old = time.time() - partial_uploads.UPLOAD_SESSION_TTL_SECONDS - 60
+    os.utime(partial_path(expired_id), (old, old))
+    # Tệp còn mới nhưng bản ghi phiên đã bị xóa
+    orphan_path = partial_path("orphaned-session")
+    open(orphan_path, "wb").close()
+
+    removed = await sweep_partial_uploads()
+
+    assert removed == 2
+    assert os.path.exists(partial_path(live_id))
+    assert not os.path.exists(partial_path(expired_id))
+    assert not os.path.exists(orphan_path)
+    assert [session["_id"] for session in upload_db.upload_sessions.documents] == [live_id]
+
+
+async def test_missing_session_drops_its_partial_file(upload_db, client_as, candidate_user):
+    client = await client_as(candidate_user)
+    upload_id = await _init_upload(client, PNG_BYTES)
+    await upload_db.upload_sessions.delete_one({"_id": upload_id})
+
+    response = await client.get(f"/api/v1/file/uploads/{upload_id}")
+
+    assert response.status_code == 404
+    assert not os.path.exists(partial_path(upload_id))
+    assert upload_id not in file_endpoints._last_seen